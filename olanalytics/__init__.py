@@ -1,10 +1,15 @@
 from .dt import (
     DatetimeDescription,
+    DatetimeExpression,
+    RegularTimeline,
     dtloc2pos,
 )
 from .generators import (
+    CurveBatch,
+    CurveStream,
     CustomCurve,
     CustomTimedCurve,
+    itimeseries,
     timeseries,
 )
 from .search import (
@@ -0,0 +1,222 @@
+"""Benchmark of detection algorithms on labeled synthetic curves
+
+Example:
+    ```
+    from olanalytics.benchmark import benchmark_detection
+
+    rows = benchmark_detection(sizes=[10**3, 10**4, 10**5], verbose=True)
+    ```
+"""
+import numpy as np
+import tracemalloc
+from collections import OrderedDict
+from prettytable import PrettyTable
+from time import perf_counter as clock
+
+from olanalytics import detection
+from olanalytics.generators import (
+    CustomCurve,
+    inject_elbow,
+    inject_isolated,
+    inject_leaps,
+    inject_step_irregularities,
+)
+
+
+# --------------------------------------------------------------------------- #
+# Scoring
+
+
+def match_labels(detected, expected, tolerance=0):
+    """Return precision and recall of detected indexes
+
+    A detected index is right if an expected index is within tolerance,
+    an expected index is found if a detected index is within tolerance.
+
+    Args:
+        detected (int-array-like): detected indexes
+        expected (int-array-like): expected indexes
+        tolerance (int): max distance b/w detected and expected index
+
+    Return:
+        precision (float): ratio of right detections (nan if no detection)
+        recall (float): ratio of found expected indexes (nan if none)
+    """
+    detected = np.sort(np.asarray(detected, dtype=np.int64).ravel())
+    expected = np.sort(np.asarray(expected, dtype=np.int64).ravel())
+
+    def covered(indexes, references):
+        """Return whether each index is within tolerance of a reference"""
+        if len(references) == 0:
+            return np.zeros(len(indexes), dtype=bool)
+        pos = np.searchsorted(references, indexes - tolerance, side='left')
+        pos = np.minimum(pos, len(references) - 1)
+        return np.abs(references[pos] - indexes) <= tolerance
+
+    precision = (
+        covered(detected, expected).mean() if len(detected) else np.nan
+    )
+    recall = covered(expected, detected).mean() if len(expected) else np.nan
+    return precision, recall
+
+
+def step_bounds(labels):
+    """Return bounds expected from stepreg_bounds given labels
+
+    labels are True on indexes i where step from i-1 is irregular
+    """
+    steps = np.where(labels[1:])[0]  # irregular step indexes
+    bounds = set(steps) | set(steps + 1)
+    bounds -= {0, len(labels) - 1}
+    return sorted(bounds)
+
+
+# --------------------------------------------------------------------------- #
+# Corpus
+#   Each case returns (args of detector, expected indexes)
+
+
+def leap_case(size, rng, density=1e-3):
+    """Noisy curve with leaps of 5 (noise amplitude 1)"""
+    curve = CustomCurve(np.arange(size, dtype=float))
+    curve.Y += rng.uniform(0, 1, size)
+    number = max(1, int(density * size))
+    labels = inject_leaps(curve, number, delta=5, rng=rng)
+    return (curve.Xnum, curve.Y), np.where(labels)[0]
+
+
+def iso_case(size, rng, density=1e-3):
+    """Curve around 10 with isolated points of +5"""
+    curve = CustomCurve(np.arange(size, dtype=float))
+    curve.Y += rng.uniform(10, 10.5, size)
+    number = max(1, int(density * size))
+    labels = inject_isolated(curve, number, delta=5, rng=rng)
+    return (curve.Y,), np.where(labels)[0]
+
+
+def elbow_case(size, rng):
+    """Noisy flat curve followed by slope 20 (noise amplitude 1)"""
+    curve = CustomCurve(np.arange(size, dtype=float))
+    curve.Y += rng.uniform(0, 1, size)
+    labels = inject_elbow(curve, slope=20, rng=rng)
+    return (curve.Y,), np.where(labels)[0]
+
+
+def step_case(size, rng, density=1e-3):
+    """Regular X (step 1) with gaps of 5 steps"""
+    curve = CustomCurve(np.arange(size, dtype=float))
+    number = max(1, int(density * size))
+    labels = inject_step_irregularities(curve, number, gap=5, rng=rng)
+    return (curve.Xnum,), step_bounds(labels)
+
+
+DETECTORS = OrderedDict([
+    # name: (corpus case, detection function)
+    ('leap', (leap_case, lambda X, Y: detection.detect_leap(X, Y, thld=3))),
+    ('iso', (
+        iso_case,
+        lambda Y: detection.detect_iso(Y, lvlref=float(np.median(Y))),
+    )),
+    ('elbow', (elbow_case, lambda Y: [detection.detect_elbow(Y)])),
+    ('stepreg', (
+        step_case,
+        lambda X: detection.stepreg_bounds(X, bot_thld=0.5, top_thld=1.5),
+    )),
+])
+
+
+# --------------------------------------------------------------------------- #
+# Benchmark
+
+
+def run_detector(func, args):
+    """Run func on args and return (output, time, peak memory)
+
+    Time is measured on a first call, peak memory (in bytes, allocations
+    traced by tracemalloc) on a second one.
+    """
+    t = clock()
+    output = func(*args)
+    duration = clock() - t
+
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return output, duration, peak
+
+
+def benchmark_detection(sizes=(10**3, 10**4, 10**5), detectors=None,
+                        repeat=1, tolerance=1, seed=None, verbose=False):
+    """Benchmark detectors on labeled synthetic curves of growing sizes
+
+    Args:
+        sizes (list[int])       : number of points of curves
+        detectors (list[str])   : names of detectors (dft is all DETECTORS)
+        repeat (int)            : number of curves for each detector & size
+        tolerance (int)         : max distance b/w detected and true index
+        seed (None|int|np.random.SeedSequence): seed of corpus
+        verbose (bool)          : print result table
+
+    Return:
+        (list[OrderedDict]) one row for each detector & size:
+            {
+                'detector': (str),
+                'size': (int),
+                'points_per_s': (float),
+                'peak_memory': (int),   # max on curves, in bytes
+                'precision': (float),
+                'recall': (float),
+            }
+    """
+    detectors = list(DETECTORS) if detectors is None else detectors
+    nan = np.nan
+    rng = np.random.default_rng(seed)
+
+    rows = []
+    for name in detectors:
+        case, func = DETECTORS[name]
+        for size in sizes:
+            duration, peak = 0, 0
+            detected_nb, right_nb, expected_nb, found_nb = 0, 0, 0, 0
+            for _ in range(repeat):
+                args, expected = case(size, rng)
+                detected, run_time, run_peak = run_detector(func, args)
+                duration += run_time
+                peak = max(peak, run_peak)
+                precision, recall = match_labels(
+                    detected, expected, tolerance=tolerance
+                )
+                detected_nb += len(detected)
+                right_nb += 0 if np.isnan(precision) else (
+                    precision * len(detected)
+                )
+                expected_nb += len(expected)
+                found_nb += 0 if np.isnan(recall) else recall * len(expected)
+
+            rows.append(OrderedDict([
+                ('detector', name),
+                ('size', size),
+                ('points_per_s', repeat * size / duration),
+                ('peak_memory', peak),
+                ('precision', right_nb / detected_nb if detected_nb else nan),
+                ('recall', found_nb / expected_nb if expected_nb else nan),
+            ]))
+
+    if verbose:
+        table = PrettyTable()
+        table.field_names = list(rows[0]) if rows else []
+        for row in rows:
+            table.add_row([
+                row['detector'],
+                row['size'],
+                "%.3e" % row['points_per_s'],
+                row['peak_memory'],
+                "%.3f" % row['precision'],
+                "%.3f" % row['recall'],
+            ])
+        print(table)
+
+    return rows
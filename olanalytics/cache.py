@@ -0,0 +1,225 @@
+"""On-disk cache of results keyed by content hash of arguments
+
+Example:
+    ```
+    from olanalytics.cache import DiskCache, cached
+    from olanalytics.smoothing import savgol_smooth
+
+    cache = DiskCache("/tmp/olanalytics", max_size=2**30)
+    smooth = cached(cache)(savgol_smooth)
+    smooth(X, Y, 11)    # computed and stored
+    smooth(X, Y, 11)    # read from disk
+    print(cache)        # hits / misses
+    ```
+"""
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+# --------------------------------------------------------------------------- #
+# Content hash
+
+
+def content_hash(*objects):
+    """Return hex digest of content of objects
+
+    Arrays are hashed on their bytes with dtype and shape, pandas objects on
+    their values (names and index aside, but column names of DataFrame),
+    containers on their items and other objects on their pickle.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    for obj in objects:
+        _update_hash(hasher, obj)
+    return hasher.hexdigest()
+
+
+def _update_hash(hasher, obj):
+    """Update hasher with content of obj (@see content_hash)"""
+    hasher.update(type(obj).__name__.encode())
+    if isinstance(obj, np.ndarray):
+        hasher.update(f"{obj.dtype.str}{obj.shape}".encode())
+        if obj.dtype == object:
+            # hash_array stringifies values, so that 1 and '1' need types
+            values = obj.ravel()
+            _update_hash(hasher, pd.util.hash_array(
+                np.frompyfunc(type, 1, 1)(values)
+            ))
+            obj = pd.util.hash_array(values)
+        hasher.update(np.ascontiguousarray(obj).view(np.uint8).data)
+    elif isinstance(obj, pd.DataFrame):
+        _update_hash(hasher, list(obj.columns))
+        for pos in range(obj.shape[1]):
+            _update_hash(hasher, obj.iloc[:, pos])
+    elif isinstance(obj, (pd.Series, pd.Index)):
+        hasher.update(str(obj.dtype).encode())
+        if isinstance(obj.dtype, pd.CategoricalDtype):
+            _update_hash(hasher, obj.cat.codes.to_numpy())
+            _update_hash(hasher, obj.cat.categories.to_numpy())
+        else:
+            _update_hash(hasher, obj.to_numpy())
+    elif isinstance(obj, (list, tuple)):
+        hasher.update(str(len(obj)).encode())
+        for item in obj:
+            _update_hash(hasher, item)
+    elif isinstance(obj, dict):
+        items = sorted(obj.items(), key=lambda item: repr(item[0]))
+        _update_hash(hasher, items)
+    elif obj is None or isinstance(obj, (bool, int, float, complex, str)):
+        hasher.update(repr(obj).encode())
+    else:
+        hasher.update(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+
+
+# --------------------------------------------------------------------------- #
+# Store
+
+
+class DiskCache:
+    """Store of pickled values in a directory, with size-based LRU eviction
+
+    Each value is a file named by its key. Reading a value refreshes its
+    modification time, least recently used values are removed once total
+    size exceeds max_size.
+
+    Args:
+        directory (str): where to store values (created if missing)
+        max_size (int): max total size of values in bytes
+    """
+
+    SUFFIX = ".pkl"
+
+    def __init__(self, directory, max_size=2**30):
+        self.directory = str(directory)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+        self._size = sum(entry.stat().st_size for entry in self._entries())
+
+    def path(self, key):
+        """Return path of file storing value of key"""
+        return os.path.join(self.directory, f"{key}{self.SUFFIX}")
+
+    def get(self, key, default=None):
+        """Return value of key, default if missing (counted as miss)"""
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as file:
+                value = pickle.load(file)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return default
+        self.hits += 1
+        try:
+            os.utime(path)
+        except FileNotFoundError:  # evicted meanwhile
+            pass
+        return value
+
+    def set(self, key, value):
+        """Store value of key, then evict values if cache is too big"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, 'wb') as file:
+            pickle.dump(value, file, pickle.HIGHEST_PROTOCOL)
+        try:  # overwritten value
+            self._size -= os.path.getsize(self.path(key))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, self.path(key))
+        self._size += os.path.getsize(self.path(key))
+        if self._size > self.max_size:
+            self.evict()
+
+    def __contains__(self, key):
+        return os.path.exists(self.path(key))
+
+    def __len__(self):
+        return sum(1 for _ in self._entries())
+
+    def _entries(self):
+        """Iterate over os.DirEntry of stored values"""
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.SUFFIX):
+                yield entry
+
+    def evict(self):
+        """Remove least recently used values until size is below max_size"""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+    def clear(self):
+        """Remove all values"""
+        for entry in list(self._entries()):
+            os.remove(entry.path)
+        self._size = 0
+
+    def stats(self):
+        """Return hits, misses, hit ratio, number of values and size"""
+        calls = self.hits + self.misses
+        return OrderedDict([
+            ('hits', self.hits),
+            ('misses', self.misses),
+            ('hit_ratio', self.hits / calls if calls else np.nan),
+            ('entries', len(self)),
+            ('size', self._size),
+        ])
+
+    def __str__(self):
+        stats = self.stats()
+        return (
+            f"{stats['hits']} hits, {stats['misses']} misses"
+            f" ({stats['hit_ratio']:.1%}), {stats['entries']} values"
+            f" in {stats['size']} bytes"
+        )
+
+
+# --------------------------------------------------------------------------- #
+# Decorator
+
+
+def cached(cache):
+    """Decorator caching results of a pure function in cache (DiskCache)
+
+    Key is the content hash of function name and arguments (@see
+    content_hash), so that a call with same content reads stored result.
+    """
+
+    def decorator(func):
+        funcname = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def func_wrapper(*args, **kwargs):
+            key = content_hash(funcname, args, kwargs)
+            output = cache.get(key, _MISSING)
+            if output is _MISSING:
+                output = func(*args, **kwargs)
+                cache.set(key, output)
+            return output
+
+        func_wrapper.cache = cache
+        return func_wrapper
+
+    return decorator
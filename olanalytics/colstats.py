@@ -1,12 +1,64 @@
-from collections import defaultdict, OrderedDict
+import copy
+import multiprocessing
+import numpy as np
+import os
+import pandas as pd
+import pickle
+import tempfile
+import zlib
+from collections import OrderedDict
 from olutils import countiter, display
 from warnings import warn
 
+from olanalytics.cache import content_hash
+from olanalytics.sketches import HyperLogLog, MisraGries
+
+try:
+    import pyarrow as pa
+except ModuleNotFoundError:
+    pa = None
+
 EMPTY_VAL = None
+HLL_PRECISION = 12  # 4KB of registers per column, ~1.6% error on uniq_val_nb
+MG_COUNTERS = 256  # heavy hitters tracked per column in approximate mode
+BINCOUNT_SPAN = 2**20  # max span of integer columns counted by bincount
+STATS_VERSION = 1  # of root stats computation, part of keys of cached stats
+BOOL_STRINGS = {
+    # Booleans parsed by pandas.read_csv
+    'True': True, 'TRUE': True, 'true': True,
+    'False': False, 'FALSE': False, 'false': False,
+}
+FRAME_DTYPES = OrderedDict([
+    # Columns of stats DataFrame (@see colstats_frame) and their dtype
+    ('order', 'int64'),
+    ('column', object),
+    ('empty_row_nb', 'int64'),
+    ('total_usage', 'int64'),
+    ('filling_ratio', 'float64'),
+    ('uniq_val_nb', 'int64'),
+    ('95prc_usage_val_nb', 'int64'),
+    ('sufficient_quality', 'int8'),
+    ('comment', object),
+    ('max_occurrences_value', object),
+    ('max_occurrences_count', 'Int64'),  # unknown (None) in approx mode
+    ('min_occurrences_value', object),
+    ('min_occurrences_count', 'Int64'),
+    ('max_value', object),
+    ('min_value', object),
+])
+SAMPLED_INDICATORS = (
+    # Indicators estimated when stats are computed on a sample of rows
+    'empty_row_nb', 'total_usage', 'filling_ratio', 'uniq_val_nb',
+    '95prc_usage_val_nb', 'sufficient_quality', 'comment',
+    'max_occurrences_value', 'max_occurrences_count',
+    'min_occurrences_value', 'min_occurrences_count',
+    'max_value', 'min_value',
+)
 
 
 def compute_colstats(data, fill_thld=0.1, empty_val=EMPTY_VAL, as_list=False,
-                      verbose=False):
+                     verbose=False, workers=None, approx=False,
+                     as_frame=False, cache=None, sample=None, seed=None):
     """Compute statistics for each column of dataframe
 
     Args:
@@ -17,9 +69,22 @@ def compute_colstats(data, fill_thld=0.1, empty_val=EMPTY_VAL, as_list=False,
         verbose (int)               : level of verbose
             0 for None
             n>0, some display (update iteration counter every n iteration)
+        workers (int)               : number of processes computing root
+            stats, @see parallel_root_colstats (requires pyarrow)
+        approx (bool)               : compute approximate stats in bounded
+            memory per column, @see sketch_series_colstats
+        as_frame (bool)             : get result as DataFrame (over as_list)
+        cache (olanalytics.cache.DiskCache): cache of root stats of columns,
+            only columns with new content are computed
+        sample (int|float)          : profile a uniform sample of rows,
+            number of rows (int) or ratio of rows (float) @see
+            sampled_root_colstats, can't be used with approx
+        seed (None|int|np.random.SeedSequence): seed of sample
 
     Return:
-        if as_list:
+        if as_frame:
+            (pandas.DataFrame) one row per column, @see colstats_frame
+        elif as_list:
             (list[OrderedDict])
         else:
             (dict): stats of each column in OrderedDict
@@ -40,20 +105,65 @@ def compute_colstats(data, fill_thld=0.1, empty_val=EMPTY_VAL, as_list=False,
                 'max_value': (scalar-object),
                 'min_value': (scalar-object),
             }
+            with sample, also
+                'filling_ratio_ci': (float, float),  # 95% confidence
+                'estimated': (tuple[str]),  # names of estimated indicators
     """
     vbatch = None if not verbose else verbose
-    display(". compute root column stats", v=verbose)
-    stats_by_col = root_colstats(data, empty_val=empty_val, vbatch=vbatch)
     row_n = len(data)
+    if sample is not None:
+        if approx:
+            raise ValueError("can't compute approximate stats on a sample")
+        display(". sample rows", v=verbose)
+        data = sample_rows(data, sample, np.random.default_rng(seed))
+    display(". compute root column stats", v=verbose)
+    if cache is not None:
+        stats_by_col = cached_root_colstats(
+            data, cache, empty_val=empty_val, vbatch=vbatch, workers=workers,
+            approx=approx,
+        )
+    elif workers:
+        stats_by_col = parallel_root_colstats(
+            data, workers, empty_val=empty_val, vbatch=vbatch, approx=approx
+        )
+    else:
+        stats_by_col = root_colstats(
+            data, empty_val=empty_val, vbatch=vbatch, approx=approx
+        )
+    if sample is not None:
+        stats_by_col = sampled_root_colstats(
+            stats_by_col, len(data), row_n, empty_val=empty_val
+        )
+    return format_colstats(
+        stats_by_col, row_n, fill_thld=fill_thld, as_list=as_list,
+        as_frame=as_frame, verbose=verbose,
+    )
+
+
+def format_colstats(stats_by_col, row_n, fill_thld=0.1, as_list=False,
+                    as_frame=False, verbose=False):
+    """Enrich root stats and return them as dict, list or DataFrame
+
+    DataFrame is built from indicators (@see enrich_colstats_columns),
+    without stats dictionary of each column.
+    """
     display(". enrich column stats", v=verbose)
+    if as_frame:
+        columns = enrich_colstats_columns(
+            stats_by_col, row_n, fill_thld=fill_thld, verbose=verbose
+        )
+        return colstats_frame(list(stats_by_col), columns)
     stats_by_col = enrich_colstats(
         stats_by_col, row_n, fill_thld=fill_thld, verbose=verbose
     )
-
     if not as_list:
         return stats_by_col
-
     display(". convert stats dictionary to list", v=verbose)
+    return colstats_rows(stats_by_col)
+
+
+def colstats_rows(stats_by_col):
+    """Convert stats dictionary to list of OrderedDict with order and column"""
     rows = []
     for i, (col, colstats) in enumerate(stats_by_col.items(), 1):
         row = OrderedDict([('order', i), ('column', col)])
@@ -63,37 +173,1076 @@ def compute_colstats(data, fill_thld=0.1, empty_val=EMPTY_VAL, as_list=False,
     return rows
 
 
-def root_colstats(data, empty_val=EMPTY_VAL, vbatch=1):
+def colstats_frame(columns_names, indicators):
+    """Return DataFrame of stats with one row per column of data
+
+    DataFrame is built column by column with dtypes of FRAME_DTYPES,
+    values of any type (max_value, ...) are kept in object columns.
+
+    Args:
+        columns_names (list): columns of data
+        indicators (OrderedDict): values of each indicator, @see
+            enrich_colstats_columns
+    """
+    columns = OrderedDict([
+        ('order', np.arange(1, len(columns_names) + 1)),
+        ('column', columns_names),
+    ])
+    columns.update(indicators)
+    return pd.DataFrame({
+        name: pd.Series(values, dtype=FRAME_DTYPES.get(name, object))
+        for name, values in columns.items()
+    })
+
+
+def write_colstats(frame, path):
+    """Write stats DataFrame to Parquet (.parquet, .pq) or Arrow file
+
+    Object columns with values of several types (max_value, ...) are written
+    as strings. Requires pyarrow.
+
+    Args:
+        frame (pandas.DataFrame): @see colstats_frame
+        path (str): path of file, Arrow IPC (feather) unless Parquet suffix
+    """
+    if pa is None:
+        raise ModuleNotFoundError("pyarrow is required to write stats")
+    frame = frame.copy()
+    for name in frame.columns[frame.dtypes == object]:
+        try:
+            pa.array(frame[name], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            values = frame[name]
+            frame[name] = values.map(str).where(values.notna(), None)
+    if str(path).endswith(('.parquet', '.pq')):
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_feather(path)
+
+
+def compute_file_colstats(path, chunksize=10**6, fill_thld=0.1,
+                          empty_val=EMPTY_VAL, as_list=False, verbose=False,
+                          approx=False, as_frame=False, sample=None,
+                          seed=None, **kwargs):
+    """Compute statistics for each column of a CSV or Parquet file by chunks
+
+    Root statistics are computed on each chunk of rows and merged, memory is
+    bounded by chunk size and the occurrences of distinct values.
+    Result is the one of compute_colstats on the whole file (CSV values are
+    counted as strings, then parsed once, @see parse_str_colstats; unless
+    dtype is given or stats are approximate).
+
+    Args:
+        path (str): path to CSV file, or Parquet file (.parquet, .pq)
+        chunksize (int): number of rows per chunk
+        fill_thld, empty_val, as_list, verbose, approx, as_frame, seed:
+            @see compute_colstats
+        sample (int|float): profile a uniform sample of rows, @see
+            sample_chunks
+        **kwargs: @see pandas.read_csv (CSV files only)
+
+    Return:
+        @see compute_colstats
+    """
+    vbatch = None if not verbose else verbose
+    # CSV chunks would each infer their dtypes (1 in a chunk, '1' in
+    # another): exact stats are computed on strings then parsed once
+    parse = not (
+        approx or 'dtype' in kwargs or str(path).endswith(('.parquet', '.pq'))
+    )
+    if parse:
+        kwargs = dict(kwargs, dtype=str)
+    if sample is not None:
+        if approx:
+            raise ValueError("can't compute approximate stats on a sample")
+        display(". sample rows by chunks", v=verbose)
+        chunks = iter_file_chunks(path, chunksize, **kwargs)
+        data, row_n = sample_chunks(
+            countiter(chunks, vbatch=vbatch), sample,
+            np.random.default_rng(seed),
+        )
+        display(". compute root column stats", v=verbose)
+        stats_by_col = root_colstats(data, empty_val=empty_val, vbatch=vbatch)
+        if parse:
+            stats_by_col = parse_str_colstats(stats_by_col, empty_val)
+        stats_by_col = sampled_root_colstats(
+            stats_by_col, len(data), row_n, empty_val=empty_val,
+        )
+        return format_colstats(
+            stats_by_col, row_n, fill_thld=fill_thld, as_list=as_list,
+            as_frame=as_frame, verbose=verbose,
+        )
+
+    display(". compute root column stats by chunks", v=verbose)
+    root = RootColstats(empty_val=empty_val, approx=approx)
+    chunks = iter_file_chunks(path, chunksize, **kwargs)
+    for chunk in countiter(chunks, vbatch=vbatch):
+        root.update(chunk)
+    if parse:
+        root.stats_by_col = parse_str_colstats(root.stats_by_col, empty_val)
+    return root.enrich(
+        fill_thld=fill_thld, as_list=as_list, as_frame=as_frame,
+        verbose=verbose,
+    )
+
+
+def sample_rows(data, sample, rng):
+    """Return uniform sample of rows of data, without replacement
+
+    Args:
+        data (pandas.DataFrame)
+        sample (int|float): number of rows (int) or ratio of rows (float)
+        rng (np.random.Generator)
+
+    Return:
+        (pandas.DataFrame) sampled rows, in their original order
+    """
+    row_n = len(data)
+    size = sample
+    if isinstance(sample, float):
+        size = int(np.ceil(sample * row_n))
+    if size >= row_n:
+        return data
+    positions = np.sort(rng.choice(row_n, size=size, replace=False))
+    return data.iloc[positions]
+
+
+def sample_chunks(chunks, sample, rng):
+    """Return uniform sample of rows read by chunks, and number of rows
+
+    A number of rows (int) is sampled with a reservoir: rows with the
+    smallest random keys are kept. A ratio of rows (float) is sampled
+    row by row (Bernoulli sampling).
+
+    Args:
+        chunks (iterable[pandas.DataFrame]): rows by chunks
+        sample (int|float): number of rows (int) or ratio of rows (float)
+        rng (np.random.Generator)
+
+    Return:
+        sample (pandas.DataFrame): sampled rows in their original order
+        row_n (int): number of rows
+    """
+    parts, keys, row_n = [], np.array([]), 0
+    for chunk in chunks:
+        chunk = chunk.set_axis(np.arange(row_n, row_n + len(chunk)))
+        row_n += len(chunk)
+        chunk_keys = rng.random(len(chunk))
+        if isinstance(sample, float):
+            parts.append(chunk[chunk_keys < sample])
+            continue
+        if len(keys) >= sample:  # full reservoir, only smaller keys enter
+            kept = chunk_keys < keys.max()
+            chunk, chunk_keys = chunk[kept], chunk_keys[kept]
+        parts = [pd.concat(parts + [chunk])] if parts else [chunk]
+        keys = np.concatenate([keys, chunk_keys])
+        if len(keys) > sample:
+            kept = np.sort(np.argpartition(keys, sample)[:sample])
+            parts, keys = [parts[0].iloc[kept]], keys[kept]
+    data = pd.concat(parts) if parts else pd.DataFrame()
+    return data.sort_index().reset_index(drop=True), row_n
+
+
+def sampled_root_colstats(stats_by_col, sample_n, row_n, empty_val=EMPTY_VAL,
+                          z=1.96):
+    """Extrapolate root statistics of a sample of rows to all rows
+
+    Counts of values seen more than once are scaled by row_n / sample_n,
+    values seen once are left to the tail of occurrences (@see usage_val_nb).
+    Number of distinct values is estimated by distinct_estimate, filling
+    ratio comes with its Wilson confidence interval, least frequent value
+    is unknown.
+
+    Args:
+        stats_by_col (dict): root stats of sample, @see root_colstats
+        sample_n (int): number of rows of sample
+        row_n (int): number of rows
+        empty_val (scalar-object): default value when no number can be computed
+        z (float): quantile of confidence interval (1.96 for 95%)
+
+    Return:
+        (dict): stats of each column in OrderedDict with 'sample' as
+            {'filling_ratio_ci': (low, high), 'estimated': (tuple[str])}
+    """
+    exact = sample_n >= row_n
+    ratio = row_n / sample_n if sample_n else 0
+    res = OrderedDict()
+    for col, stats in stats_by_col.items():
+        stats = OrderedDict(stats)
+        filled = sample_n - stats['empty']
+        stats['sample'] = OrderedDict([
+            ('filling_ratio_ci', wilson_interval(
+                filled, sample_n, z=z, population=row_n
+            )),
+            ('estimated', () if exact else SAMPLED_INDICATORS),
+        ])
+        if not exact:
+            values = distinct_estimate(stats['occ_counts'], sample_n, row_n)
+            empty = int(round(stats['empty'] * ratio))
+            seen = stats['occ_counts'] > 1
+            occ_counts = np.rint(stats['occ_counts'][seen] * ratio)
+            stats['empty'] = empty
+            stats['occ_values'] = stats['occ_values'][seen]
+            stats['occ_counts'] = occ_counts.astype(np.int64)
+            stats['values'] = min(values, row_n - empty)
+            stats['val_occ_max'] = (empty_val, empty_val)
+            if len(occ_counts):
+                stats['val_occ_max'] = (
+                    stats['occ_values'][0], stats['occ_counts'][0]
+                )
+            stats['val_occ_min'] = (empty_val, empty_val)
+        res[col] = stats
+    return res
+
+
+def distinct_estimate(occ_counts, sample_n, row_n):
+    """Estimate number of distinct values of rows from a uniform sample
+
+    Max of 2 estimators, both under-estimating on their weak side:
+        - GEE (Charikar et al., 2000), suited to skewed data:
+            sqrt(row_n / sample_n) * f1 + d - f1
+        - Duj1 (Haas et al., 1995), suited to uniform data:
+            d * sample_n / (sample_n - f1 + f1 * sample_n / row_n)
+    with d the number of values in sample and f1 those seen once.
+
+    Args:
+        occ_counts (int-np.ndarray): counts of values in sample
+        sample_n (int): number of rows of sample
+        row_n (int): number of rows
+    """
+    d = len(occ_counts)
+    f1 = int(np.count_nonzero(occ_counts == 1))
+    if not d:
+        return 0
+    gee = np.sqrt(row_n / sample_n) * f1 + d - f1
+    duj1 = d * sample_n / (sample_n - f1 + f1 * sample_n / row_n)
+    return int(round(max(gee, duj1)))
+
+
+def wilson_interval(successes, n, z=1.96, population=None):
+    """Return Wilson score interval (low, high) of a proportion
+
+    Args:
+        successes (int): number of successes in sample
+        n (int): size of sample
+        z (float): quantile of confidence interval (1.96 for 95%)
+        population (int): size of sampled population, to apply finite
+            population correction (interval is a point when n == population)
+    """
+    if not n:
+        return (0.0, 1.0)
+    p = successes / n
+    if population is not None:
+        if n >= population:
+            return (p, p)
+        z = z * np.sqrt((population - n) / (population - 1))
+    denom = 1 + z**2 / n
+    center = (p + z**2 / (2 * n)) / denom
+    half = z * np.sqrt(p * (1 - p) / n + z**2 / (4 * n**2)) / denom
+    return (max(0.0, center - half), min(1.0, center + half))
+
+
+class RootColstats:
+    """Mergeable root statistics of columns, updated with new rows
+
+    Example:
+        ```
+        root = RootColstats.from_bytes(previous_state)
+        root.update(new_rows)
+        stats = root.enrich()  # same as compute_colstats on all rows
+        new_state = root.to_bytes()
+        ```
+
+    Args:
+        empty_val (scalar-object): default value when no number can be computed
+        approx (bool): approximate stats, @see sketch_series_colstats
+
+    Attributes:
+        row_n (int): number of rows
+        stats_by_col (OrderedDict): root stats of each column,
+            @see root_colstats
+    """
+
+    VERSION = 1  # of serialized state
+
+    def __init__(self, empty_val=EMPTY_VAL, approx=False):
+        self.empty_val = empty_val
+        self.approx = approx
+        self.row_n = 0
+        # Exact stats are merged in RunningColstats, approximate ones in
+        # sketches (of fixed size)
+        self._running = OrderedDict()
+        self._stats_by_col = OrderedDict()
+
+    @property
+    def stats_by_col(self):
+        """Root stats of each column (OrderedDict), @see root_colstats"""
+        if not self.approx:
+            self._stats_by_col = OrderedDict(
+                (col, running.stats())
+                for col, running in self._running.items()
+            )
+        return self._stats_by_col
+
+    @stats_by_col.setter
+    def stats_by_col(self, stats_by_col):
+        """Set root stats of each column, built on row_n rows"""
+        row_n, self.row_n = self.row_n, 0
+        self._running = OrderedDict()
+        self._stats_by_col = OrderedDict()
+        self._merge_stats(stats_by_col, row_n)
+
+    @classmethod
+    def from_data(cls, data, empty_val=EMPTY_VAL, approx=False, vbatch=None):
+        """Build root statistics of data (pandas.DataFrame)"""
+        root = cls(empty_val=empty_val, approx=approx)
+        return root.update(data, vbatch=vbatch)
+
+    def update(self, data, vbatch=None):
+        """Add rows of data (pandas.DataFrame) to statistics
+
+        Cost only depends on data (and its distinct values for exact stats)
+        """
+        self._merge_stats(root_colstats(
+            data, empty_val=self.empty_val, vbatch=vbatch, approx=self.approx
+        ), len(data))
+        return self
+
+    def merge(self, other):
+        """Merge statistics of other rows in self (rows of self first)
+
+        A column missing from one side counts as empty on its rows
+        """
+        if other.approx != self.approx:
+            raise ValueError("can't merge exact and approximate column stats")
+        self._merge_stats(other.stats_by_col, other.row_n)
+        return self
+
+    def _merge_stats(self, stats_by_col, row_n):
+        """Merge root stats of row_n next rows"""
+        if self.approx:
+            self._stats_by_col = merge_root_colstats(
+                self._aligned(self._stats_by_col, stats_by_col, self.row_n),
+                self._aligned(stats_by_col, self._stats_by_col, row_n),
+                empty_val=self.empty_val,
+            )
+        else:
+            for col, stats in stats_by_col.items():
+                if col not in self._running:
+                    self._running[col] = RunningColstats(
+                        self.empty_val, empty=self.row_n
+                    )
+                self._running[col].add(stats)
+            for col, running in self._running.items():
+                if col not in stats_by_col:
+                    running.empty += row_n
+        self.row_n += row_n
+
+    def _aligned(self, stats_by_col, other_stats_by_col, row_n):
+        """Return stats_by_col with empty stats for columns only in other"""
+        stats_by_col = OrderedDict(stats_by_col)
+        for col in other_stats_by_col:
+            if col not in stats_by_col:
+                stats_by_col[col] = series_colstats(
+                    pd.Series([], dtype=object), row_n,
+                    empty_val=self.empty_val, approx=self.approx,
+                )
+        return stats_by_col
+
+    def enrich(self, fill_thld=0.1, as_list=False, as_frame=False,
+               verbose=False):
+        """Return stats of each column, @see compute_colstats"""
+        return format_colstats(
+            self.stats_by_col, self.row_n, fill_thld=fill_thld,
+            as_list=as_list, as_frame=as_frame, verbose=verbose,
+        )
+
+    def to_bytes(self):
+        """Return state as compressed bytes"""
+        state = {
+            'version': self.VERSION,
+            'empty_val': self.empty_val,
+            'approx': self.approx,
+            'row_n': self.row_n,
+            'stats_by_col': self.stats_by_col,
+        }
+        return zlib.compress(pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Load state from bytes built by to_bytes
+
+        Bytes are unpickled: only load states from a trusted source
+        """
+        state = pickle.loads(zlib.decompress(data))
+        if state['version'] != cls.VERSION:
+            raise ValueError(
+                f"unsupported RootColstats state version {state['version']}"
+            )
+        root = cls(empty_val=state['empty_val'], approx=state['approx'])
+        root.row_n = state['row_n']
+        root.stats_by_col = state['stats_by_col']
+        return root
+
+    def save(self, path):
+        """Write state to file"""
+        with open(path, 'wb') as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        """Load state from file written by save"""
+        with open(path, 'rb') as file:
+            return cls.from_bytes(file.read())
+
+
+def parse_str_colstats(stats_by_col, empty_val=EMPTY_VAL):
+    """Parse values of root stats of columns read as strings
+
+    Values of a column are parsed as by pandas.read_csv on the whole column
+    (@see parse_str_values), counts of values with same parsed value summed.
+
+    Return:
+        (dict): stats of each column in OrderedDict, @see root_colstats
+    """
+    parsed_by_col = OrderedDict()
+    for col, stats in stats_by_col.items():
+        order = np.argsort(stats['occ_ranks'])  # first appearance order
+        values = stats['occ_values'][order]
+        parsed = parse_str_values(values)
+        if parsed is values:
+            parsed_by_col[col] = stats
+            continue
+        occurrences = pd.Series(
+            stats['occ_counts'][order], index=parsed
+        ).groupby(level=0, sort=False).sum()
+        occ_values = occurrences.index.to_numpy()
+        parsed_by_col[col] = build_root_stats(
+            occ_values,
+            occurrences.to_numpy(),
+            empty=stats['empty'],
+            bounds=(occ_values.min(), occ_values.max()),
+            empty_val=empty_val,
+        )
+    return parsed_by_col
+
+
+def parse_str_values(values):
+    """Return strings parsed as numbers or booleans if all of them are
+
+    Values (np.ndarray) are returned as they are otherwise
+    """
+    if not len(values) or not all(isinstance(val, str) for val in values):
+        return values
+    if set(values) <= BOOL_STRINGS.keys():
+        return np.array([BOOL_STRINGS[val] for val in values])
+    try:
+        return pd.to_numeric(values)
+    except (ValueError, TypeError):
+        return values
+
+
+def iter_file_chunks(path, chunksize, **kwargs):
+    """Iterate over chunks of rows of CSV or Parquet file as DataFrames
+
+    Args:
+        path (str): path to CSV file, or Parquet file (.parquet, .pq)
+            reading Parquet files requires pyarrow
+        chunksize (int): number of rows per chunk
+        **kwargs: @see pandas.read_csv (CSV files only)
+    """
+    if str(path).endswith(('.parquet', '.pq')):
+        if pa is None:
+            raise ModuleNotFoundError("pyarrow is required to read Parquet")
+        import pyarrow.parquet as pq
+
+        def biterator():
+            parquet = pq.ParquetFile(path)
+            for batch in parquet.iter_batches(batch_size=chunksize):
+                yield batch.to_pandas()
+
+        return biterator()
+    return pd.read_csv(path, chunksize=chunksize, **kwargs)
+
+
+def root_colstats(data, empty_val=EMPTY_VAL, vbatch=1, approx=False):
     """Build root statistics for column in data
 
     Args:
         data (pandas.DataFrame)
         empty_val (scalar-object): default value when no number can be computed
         vbatch (int): number of iteration on columns b/w each display
+        approx (bool): approximate stats, @see sketch_series_colstats
 
     Return:
         (dict): stats of each column in OrderedDict
+            occurrences are stored as arrays sorted by decreasing count:
+                'occ_values' (np.ndarray) and 'occ_counts' (int-np.ndarray)
+                with 'occ_ranks' (int-np.ndarray) their order of appearance
     """
     row_n = len(data)
     stats_by_col = OrderedDict()
     for column in countiter(data.columns.values, vbatch=vbatch):
-        series = data[column]
-
-        values_nb = series.count()
-        occurrences = list(series.value_counts().iteritems())
-        values = len(occurrences)
-
-        stats_by_col[column] = OrderedDict([
-            ('empty', row_n - values_nb),
-            ('occurrences', occurrences),
-            ('filling_ratio', values_nb / row_n),
-            ('values', values),
-            ('val_occ_max', occurrences[0] if occurrences else (empty_val, 0)),
-            ('val_occ_min', occurrences[-1] if occurrences else (empty_val, 0)),
-        ])
+        stats_by_col[column] = series_colstats(
+            data[column], row_n, empty_val=empty_val, approx=approx
+        )
     return stats_by_col
 
 
+def cached_root_colstats(data, cache, empty_val=EMPTY_VAL, vbatch=1,
+                         workers=None, approx=False):
+    """Build root statistics for column in data, reading cached ones
+
+    Stats of a column are keyed by content hash of its values, parameters
+    and STATS_VERSION (to bump when stats change), other columns are
+    computed then stored in cache.
+
+    Args:
+        data (pandas.DataFrame)
+        cache (olanalytics.cache.DiskCache): where stats are stored
+        empty_val, vbatch, approx: @see root_colstats
+        workers (int): number of processes, @see parallel_root_colstats
+
+    Return:
+        (dict): stats of each column in OrderedDict, @see root_colstats
+    """
+    columns = list(data.columns.values)
+    keys, stats_by_pos = [], {}
+    for pos in range(len(columns)):
+        keys.append(content_hash(
+            'root_colstats', STATS_VERSION, data.iloc[:, pos], empty_val,
+            approx,
+        ))
+        stats = cache.get(keys[-1])
+        if stats is not None:
+            stats_by_pos[pos] = stats
+
+    missing = [pos for pos in range(len(columns)) if pos not in stats_by_pos]
+    if missing:
+        subdata = data.iloc[:, missing]
+        if workers:
+            computed = parallel_root_colstats(
+                subdata, workers, empty_val=empty_val, vbatch=vbatch,
+                approx=approx,
+            )
+        else:
+            computed = root_colstats(
+                subdata, empty_val=empty_val, vbatch=vbatch, approx=approx
+            )
+        for pos, stats in zip(missing, computed.values()):
+            cache.set(keys[pos], stats)
+            stats_by_pos[pos] = stats
+
+    return OrderedDict(
+        (column, stats_by_pos[pos]) for pos, column in enumerate(columns)
+    )
+
+
+def parallel_root_colstats(data, workers, empty_val=EMPTY_VAL, vbatch=1,
+                           tmpdir=None, approx=False):
+    """Build root statistics for column in data with a pool of processes
+
+    Data is written once in a temporary Arrow file that workers memory-map,
+    so columns are not pickled to workers. Columns Arrow can't convert (for
+    instance with mixed types) are processed in the main process.
+
+    Args:
+        data (pandas.DataFrame)
+        workers (int): number of processes
+        empty_val (scalar-object): default value when no number can be computed
+        vbatch (int): number of processed columns b/w each display
+        tmpdir (str): directory where to write temporary Arrow file
+        approx (bool): approximate stats, @see sketch_series_colstats
+
+    Return:
+        (dict): stats of each column in OrderedDict, @see root_colstats
+    """
+    if pa is None:
+        raise ModuleNotFoundError(
+            "pyarrow is required to compute column stats with workers"
+        )
+    row_n = len(data)
+    columns = list(data.columns.values)
+
+    # Columns shared through Arrow file, named by position
+    arrays, names, local = [], [], []
+    arrow_errors = (
+        pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError
+    )
+    for pos, column in enumerate(columns):
+        try:
+            arrays.append(pa.array(data.iloc[:, pos], from_pandas=True))
+        except arrow_errors:
+            local.append(pos)
+        else:
+            names.append(str(pos))
+    tasks = [
+        [
+            (int(name), columns[int(name)], data.dtypes.iloc[int(name)])
+            for name in part
+        ]
+        for part in np.array_split(names, max(min(len(names), 4 * workers), 1))
+        if len(part)
+    ]
+
+    def iterstats(path):
+        """Yield (position, stats) of each column"""
+        for pos in local:
+            yield pos, series_colstats(
+                data.iloc[:, pos], row_n, empty_val=empty_val, approx=approx
+            )
+        if not tasks:
+            return
+        with multiprocessing.Pool(workers) as pool:
+            args = [
+                (path, task, row_n, empty_val, approx) for task in tasks
+            ]
+            for results in pool.imap_unordered(_file_colstats, args):
+                yield from results
+
+    stats_by_pos = {}
+    with tempfile.TemporaryDirectory(dir=tmpdir) as dirpath:
+        path = os.path.join(dirpath, "data.arrow")
+        table = pa.Table.from_arrays(arrays, names=names)
+        with pa.OSFile(path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        del table, arrays
+        iterator = countiter(
+            iterstats(path), vbatch=vbatch, dindicator=str(len(columns))
+        )
+        for pos, stats in iterator:
+            stats_by_pos[pos] = stats
+
+    return OrderedDict(
+        (column, stats_by_pos[pos]) for pos, column in enumerate(columns)
+    )
+
+
+def _file_colstats(args):
+    """Return [(position, stats)] of columns read from memory-mapped Arrow file
+
+    Args:
+        args (tuple): path, [(position, column, dtype)], row_n, empty_val,
+            approx
+    """
+    path, columns, row_n, empty_val, approx = args
+    res = []
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+        for pos, column, dtype in columns:
+            series = _arrow_series(table.column(str(pos)), dtype)
+            series.name = column
+            res.append(
+                (pos, series_colstats(series, row_n, empty_val, approx))
+            )
+    return res
+
+
+def _arrow_series(array, dtype):
+    """Convert Arrow array back to a Series of its original dtype
+
+    Default conversion turns nullable integers (and objects holding
+    integers) into floats, losing precision above 2**53.
+    """
+    if dtype == object:
+        return array.to_pandas(integer_object_nulls=True)
+    if (
+        isinstance(dtype, pd.api.extensions.ExtensionDtype)
+        and hasattr(dtype, '__from_arrow__')
+    ):
+        return pd.Series(dtype.__from_arrow__(array))
+    series = array.to_pandas()
+    if series.dtype != dtype:
+        series = series.astype(dtype)
+    return series
+
+
+def series_colstats(series, row_n, empty_val=EMPTY_VAL, approx=False):
+    """Build root statistics of a column (@see root_colstats)"""
+    if approx:
+        return sketch_series_colstats(series, row_n, empty_val=empty_val)
+    occ_values, occ_counts, bounds = series_occurrences(series)
+    return build_root_stats(
+        occ_values,
+        occ_counts,
+        empty=row_n - int(occ_counts.sum()),
+        bounds=bounds,
+        empty_val=empty_val,
+    )
+
+
+def series_occurrences(series):
+    """Return occurrences and bounds of values of column, null values aside
+
+    Counting is specialized on dtype: bincount on codes of categorical
+    columns, on values of integer columns with a span up to BINCOUNT_SPAN,
+    direct count of booleans. Other columns are counted by hashing values.
+
+    Return:
+        occ_values (np.ndarray): unique values in order of first appearance
+        occ_counts (int-np.ndarray): count of each value
+        bounds (tuple): (min, max) of values, @see column_bounds
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return categorical_occurrences(series)
+    # Fast paths on numpy dtypes only, extension dtypes hold null values
+    numpy_dtype = isinstance(dtype, np.dtype)
+    if numpy_dtype and dtype.kind == 'b':
+        return bool_occurrences(series.to_numpy())
+    if numpy_dtype and dtype.kind in 'iu' and len(series):
+        values = series.to_numpy()
+        low, high = values.min(), values.max()
+        offset = 0 if 0 <= low and high < BINCOUNT_SPAN else int(low)
+        if int(high) - offset < BINCOUNT_SPAN:
+            # Offset on 64 bits values, narrow ones would overflow
+            wide = np.int64 if dtype.kind == 'i' else np.uint64
+            codes = values.astype(wide, copy=False)
+            if offset:
+                codes = codes - wide(low)
+            occ_codes, occ_counts = bincount_occurrences(
+                codes.astype(np.intp, copy=False), int(high) - offset + 1
+            )
+            occ_values = (occ_codes.astype(wide) + wide(offset)).astype(dtype)
+            return occ_values, occ_counts, (low, high)
+
+    occurrences = series.value_counts(sort=False)  # first appearance order
+    occ_values = occurrences.index.to_numpy()
+    if numpy_dtype and dtype.kind == 'f':
+        bounds = (EMPTY_VAL, EMPTY_VAL)
+        if len(occ_values):  # NaN-aware reduction on values
+            values = series.to_numpy()
+            bounds = (np.nanmin(values), np.nanmax(values))
+    else:
+        bounds = column_bounds(series, occ_values)
+    return occ_values, occurrences.to_numpy(), bounds
+
+
+def bincount_occurrences(codes, size):
+    """Return (codes, counts) of codes in [0, size) by order of appearance"""
+    counts = np.bincount(codes, minlength=size)
+    present = np.flatnonzero(counts)
+    # First position of each code, scanning growing blocks until all codes
+    # are seen (usually in first block). With repeated indexes last
+    # assignment wins, so reversed assignment keeps first position.
+    n = len(codes)
+    first = np.full(size, n, dtype=np.intp)
+    seen, start, block = 0, 0, max(2**12, 8 * len(present))
+    while seen < len(present):
+        part = codes[start:start + block]
+        new = first[part] == n
+        first[part[new][::-1]] = np.flatnonzero(new)[::-1] + start
+        seen += len(np.unique(part[new]))
+        start, block = start + block, 2 * block
+    present = present[np.argsort(first[present], kind='stable')]
+    return present, counts[present]
+
+
+def categorical_occurrences(series):
+    """Return occurrences and bounds of categorical column"""
+    codes = series.cat.codes.to_numpy()
+    nulls = codes < 0  # -1 for null values
+    if nulls.any():
+        codes = codes[~nulls]
+    categories = series.cat.categories
+    occ_codes, occ_counts = bincount_occurrences(codes, len(categories))
+    occ_values = categories.to_numpy()[occ_codes]
+    if series.cat.ordered and len(occ_codes):
+        bounds = (categories[occ_codes.min()], categories[occ_codes.max()])
+    else:
+        bounds = column_bounds(series, occ_values)
+    return occ_values, occ_counts, bounds
+
+
+def bool_occurrences(values):
+    """Return occurrences and bounds of boolean values (np.ndarray)"""
+    if not len(values):
+        return values, np.array([], np.int64), (EMPTY_VAL, EMPTY_VAL)
+    trues = np.count_nonzero(values)
+    first = values[0]
+    occ_values = np.array([first, not first])
+    occ_counts = np.array(
+        [trues, len(values) - trues] if first else [len(values) - trues, trues]
+    )
+    kept = occ_counts > 0
+    occ_values, occ_counts = occ_values[kept], occ_counts[kept]
+    return occ_values, occ_counts, (occ_values.min(), occ_values.max())
+
+
+def build_root_stats(occ_values, occ_counts, empty, bounds,
+                     empty_val=EMPTY_VAL):
+    """Build root statistics of a column from its occurrences
+
+    Args:
+        occ_values (np.ndarray): unique values in order of first appearance
+        occ_counts (int-np.ndarray): count of each value
+        empty (int): number of empty rows
+        bounds (tuple): (min, max) of values
+        empty_val (scalar-object): default value when no number can be computed
+
+    Return:
+        (OrderedDict) root stats, occurrences sorted by decreasing count
+            (values with same count by order of first appearance, given by
+            'occ_ranks')
+    """
+    order = np.argsort(-occ_counts, kind='stable')
+    occ_values, occ_counts = occ_values[order], occ_counts[order]
+    values = len(occ_counts)
+    values_nb = int(occ_counts.sum())
+    row_n = values_nb + empty
+    return OrderedDict([
+        ('empty', empty),
+        ('occ_values', occ_values),
+        ('occ_counts', occ_counts),
+        ('occ_ranks', order),
+        ('filling_ratio', values_nb / row_n if row_n else 0),
+        ('values', values),
+        ('val_occ_max', (
+            (occ_values[0], occ_counts[0]) if values else (empty_val, 0)
+        )),
+        ('val_occ_min', (
+            (occ_values[-1], occ_counts[-1]) if values else (empty_val, 0)
+        )),
+        ('min_value', bounds[0]),
+        ('max_value', bounds[1]),
+    ])
+
+
+def merge_series_colstats(stats_a, stats_b, empty_val=EMPTY_VAL):
+    """Merge root statistics of 2 parts of a column (rows of a then of b)
+
+    Result is the one of series_colstats on the whole column
+    """
+    if ('sketches' in stats_a) != ('sketches' in stats_b):
+        raise ValueError("can't merge exact and approximate column stats")
+    if 'sketches' in stats_a:
+        hll, mg = copy.deepcopy(stats_a['sketches'])
+        hll.merge(stats_b['sketches'][0])
+        mg.merge(stats_b['sketches'][1])
+        return build_sketch_stats(
+            hll, mg,
+            empty=stats_a['empty'] + stats_b['empty'],
+            bounds=merge_bounds(stats_a, stats_b),
+            empty_val=empty_val,
+        )
+
+    # Occurrences in order of first appearance, a first
+    values, counts = [], []
+    for stats in [stats_a, stats_b]:
+        order = np.argsort(stats['occ_ranks'])
+        values.append(stats['occ_values'][order])
+        counts.append(stats['occ_counts'][order])
+    occurrences = pd.Series(
+        np.concatenate(counts), index=np.concatenate(values)
+    ).groupby(level=0, sort=False).sum()
+
+    return build_root_stats(
+        occurrences.index.to_numpy(),
+        occurrences.to_numpy(),
+        empty=stats_a['empty'] + stats_b['empty'],
+        bounds=merge_bounds(stats_a, stats_b),
+        empty_val=empty_val,
+    )
+
+
+class RunningColstats:
+    """Exact root statistics of a column, merged part after part
+
+    Merging a part only costs its number of distinct values: occurrences
+    are kept in a dict of positions by value (in order of first appearance)
+    and a growing array of counts, root stats are built when requested.
+
+    Args:
+        empty_val (scalar-object): default value when no number can be computed
+        empty (int): number of empty rows before first part
+    """
+
+    def __init__(self, empty_val=EMPTY_VAL, empty=0):
+        self.empty_val = empty_val
+        self.empty = empty
+        self._positions = {}
+        self._values = []  # arrays of new values of each part
+        self._counts = np.zeros(16, dtype=np.int64)
+        self._bounds = {'values': 0, 'min_value': None, 'max_value': None}
+
+    def add(self, stats):
+        """Merge root stats of next rows (@see series_colstats)"""
+        order = np.argsort(stats['occ_ranks'])
+        values = stats['occ_values'][order]
+        counts = stats['occ_counts'][order]
+        bounds = merge_bounds(self._bounds, stats)
+
+        positions = self._positions
+        known = len(positions)
+        indexes = np.fromiter(
+            (positions.setdefault(key, len(positions))
+             for key in values.tolist()),
+            dtype=np.int64, count=len(values),
+        )
+        if len(positions) > known:
+            self._values.append(values[indexes >= known])
+        if len(positions) > len(self._counts):
+            grown = np.zeros(2 * len(positions), dtype=np.int64)
+            grown[:known] = self._counts[:known]
+            self._counts = grown
+        self._counts[indexes] += counts
+
+        self.empty += stats['empty']
+        self._bounds = {
+            'values': len(positions),
+            'min_value': bounds[0],
+            'max_value': bounds[1],
+        }
+        return self
+
+    def stats(self):
+        """Return root stats of merged rows, @see build_root_stats"""
+        if len(self._values) > 1:
+            self._values = [np.concatenate(self._values)]
+        occ_values = (
+            self._values[0] if self._values else np.array([], dtype=object)
+        )
+        bounds = (self._bounds['min_value'], self._bounds['max_value'])
+        if not self._bounds['values']:
+            bounds = (self.empty_val, self.empty_val)
+        return build_root_stats(
+            occ_values,
+            self._counts[:len(self._positions)].copy(),
+            empty=self.empty,
+            bounds=bounds,
+            empty_val=self.empty_val,
+        )
+
+
+def sketch_series_colstats(series, row_n, empty_val=EMPTY_VAL):
+    """Build approximate root statistics of a column in bounded memory
+
+    Sketches use fixed memory whatever the number of distinct values
+    (about 4KB + MG_COUNTERS values per column) and are merged on chunks:
+        - uniq_val_nb is estimated with HyperLogLog, relative standard
+            error is about 1.04 / 2**(HLL_PRECISION/2), 1.6% by default
+        - occurrences are the MisraGries counters of most frequent values,
+            each count is under-estimated by at most n / (MG_COUNTERS + 1)
+            with n the number of values; 95prc_usage_val_nb is extrapolated
+            from upper bounds of these counts (@see usage_val_nb)
+        - min_occurrences_* are unknown (empty_val) unless counters are exact
+    When column has no more than MG_COUNTERS distinct values, stats are the
+    exact ones.
+
+    Return:
+        (OrderedDict) root stats, @see build_sketch_stats
+    """
+    values = series.dropna().to_numpy()
+    return build_sketch_stats(
+        HyperLogLog(HLL_PRECISION).update(values),
+        MisraGries(MG_COUNTERS).update(values),
+        empty=row_n - len(values),
+        bounds=column_bounds(series, values),
+        empty_val=empty_val,
+    )
+
+
+def build_sketch_stats(hll, mg, empty, bounds, empty_val=EMPTY_VAL):
+    """Build approximate root statistics of a column from its sketches
+
+    Args:
+        hll (HyperLogLog): distinct values estimator
+        mg (MisraGries): heavy hitters summary
+        empty (int): number of empty rows
+        bounds (tuple): (min, max) of values
+        empty_val (scalar-object): default value when no number can be computed
+
+    Return:
+        (OrderedDict) root stats with keys of build_root_stats but
+            'occ_ranks', and 'sketches' as (hll, mg)
+    """
+    occ_values, occ_counts = mg.top()
+    exact = mg.error == 0
+    values = len(occ_counts) if exact else max(hll.count(), len(occ_counts))
+    row_n = mg.n + empty
+    # Unknown occurrences (no counter left, least frequent value) are empty
+    unknown = (empty_val, 0) if exact else (empty_val, empty_val)
+    val_occ_max, val_occ_min = unknown, unknown
+    if len(occ_counts):
+        val_occ_max = (occ_values[0], occ_counts[0])
+    if exact and values:
+        val_occ_min = (occ_values[-1], occ_counts[-1])
+    return OrderedDict([
+        ('empty', empty),
+        ('occ_values', occ_values),
+        ('occ_counts', occ_counts),
+        ('filling_ratio', mg.n / row_n if row_n else 0),
+        ('values', values),
+        ('val_occ_max', val_occ_max),
+        ('val_occ_min', val_occ_min),
+        ('min_value', bounds[0]),
+        ('max_value', bounds[1]),
+        ('sketches', (hll, mg)),
+    ])
+
+
+def merge_bounds(stats_a, stats_b):
+    """Return (min, max) of values of 2 root stats"""
+    if not stats_a['values']:
+        return stats_b['min_value'], stats_b['max_value']
+    if not stats_b['values']:
+        return stats_a['min_value'], stats_a['max_value']
+    bounds = [stats_a['min_value'], stats_a['max_value']]
+    bounds += [stats_b['min_value'], stats_b['max_value']]
+    if any(bound is None for bound in bounds):
+        return None, None
+    try:
+        return min(bounds[0], bounds[2]), max(bounds[1], bounds[3])
+    except TypeError as err:
+        warn(f"TypeError when merging min, max value of columns: {err}")
+        return None, None
+
+
+def merge_root_colstats(stats_by_col_a, stats_by_col_b, empty_val=EMPTY_VAL):
+    """Merge root statistics built on 2 sets of rows (a then b)
+
+    Columns only in a or b keep their stats (empty rows of missing column
+    are not counted)
+
+    Return:
+        (dict): merged stats of each column in OrderedDict
+    """
+    stats_by_col = OrderedDict()
+    for col, stats in stats_by_col_a.items():
+        if col in stats_by_col_b:
+            stats = merge_series_colstats(
+                stats, stats_by_col_b[col], empty_val=empty_val
+            )
+        stats_by_col[col] = stats
+    for col, stats in stats_by_col_b.items():
+        if col not in stats_by_col:
+            stats_by_col[col] = stats
+    return stats_by_col
+
+
+def column_bounds(series, occ_values):
+    """Return (min, max) of column, (None, None) if values can't be compared
+
+    Computed by a reduction on the column, falling back on python comparison
+    of unique values (for instance with unordered categories)
+    """
+    if len(occ_values) == 0:
+        return EMPTY_VAL, EMPTY_VAL
+    try:
+        return series.min(), series.max()
+    except TypeError:
+        pass
+    try:
+        return min(occ_values), max(occ_values)
+    except TypeError as err:
+        warn(
+            "TypeError when building min, max value of column"
+            f" '{series.name}': {err}"
+        )
+        return None, None
+
+
 def enrich_colstats(stats_by_col, row_n, fill_thld=0.1, verbose=None):
     """Enrich stats created by root_colstats
 
@@ -105,79 +1254,272 @@ def enrich_colstats(stats_by_col, row_n, fill_thld=0.1, verbose=None):
     Return:
         (dict): enriched stats of each column in OrderedDict
     """
-    ind_by_col = OrderedDict()
-    counter = defaultdict(int)
-    for col, colstats in stats_by_col.items():
+    columns = enrich_colstats_columns(
+        stats_by_col, row_n, fill_thld=fill_thld, verbose=verbose
+    )
+    return OrderedDict(
+        (col, OrderedDict(
+            (indicator, values[pos]) for indicator, values in columns.items()
+        ))
+        for pos, col in enumerate(stats_by_col)
+    )
 
-        # Usage
-        total_usage = row_n - colstats['empty']
-        values = [val for val, _ in colstats['occurrences']]
-
-        # Group of values with same number of uses
-        val_grps = []  # List of [nb of vals, nb of usage per vals]
-        for _, val_usage in colstats['occurrences']:
-            if not val_grps:
-                val_grps.append([1, val_usage])
-                continue
-            lst_grp = val_grps[-1]
-            if val_usage == lst_grp[1]:
-                lst_grp[0] += 1
-            else:
-                val_grps.append([1, val_usage])
-
-        # val_95prc_usage is the number of values required to reach 95% usage,
-        # # when values of similar used they are all counted at once
-        val_95prc_usage = 0
-        usage = 0
-        for val_nb, val_usage in val_grps:
-            if usage >= (0.95 * total_usage):
-                break
-            usage += val_nb * val_usage
-            val_95prc_usage += val_nb
-
-        # Quality
+
+def enrich_colstats_columns(stats_by_col, row_n, fill_thld=0.1,
+                            verbose=None):
+    """Enrich stats created by root_colstats, indicator by indicator
+
+    Args: @see enrich_colstats
+
+    Return:
+        (OrderedDict): list of values of each indicator (one per column),
+            indicators of enrich_colstats
+    """
+    stats_list = list(stats_by_col.values())
+
+    # Filling
+    empties = [stats['empty'] for stats in stats_list]
+    total_usages = [row_n - empty for empty in empties]
+    filling_ratios = [stats['filling_ratio'] for stats in stats_list]
+
+    # Usage
+    usages_95prc = []
+    for stats, total_usage in zip(stats_list, total_usages):
+        occ_counts = stats['occ_counts']
+        if 'sketches' in stats:  # upper bounds of approximate counts
+            occ_counts = occ_counts + stats['sketches'][1].error
+        usages_95prc.append(usage_val_nb(
+            occ_counts, 0.95, total=total_usage, values=stats['values'],
+        ))
+
+    # Quality
+    reasons = []
+    for stats, filling_ratio in zip(stats_list, filling_ratios):
         reason = EMPTY_VAL
-        if colstats['filling_ratio'] < fill_thld:
+        if filling_ratio < fill_thld:
             reason = f"filling_ratio < {fill_thld}"
-        elif colstats['values'] == 1:
+        elif stats['values'] == 1:
             reason = "only one value"
-        is_sufficient = int(reason is None)
-        counter['insufficient'] += (1 - is_sufficient)
+        reasons.append(reason)
+    sufficient = [int(reason is None) for reason in reasons]
 
-        # Compute max, min
-        try:
-            max_value = max(values) if values else EMPTY_VAL
-            min_value = min(values) if values else EMPTY_VAL
-        except TypeError as err:
-            warn(f"TypeError when building min, max value of column '{col}': {err}")
-            min_value, max_value = None, None
-
-
-        # Filling stats
-        ind_by_col[col] = OrderedDict([
-            # Filling
-            ('empty_row_nb', colstats['empty']),
-            ('total_usage', total_usage),
-            ('filling_ratio', colstats['filling_ratio']),
-
-            # Usage
-            ('uniq_val_nb', colstats['values']),
-            #         ('uniq_val_95prc_usage_nb', uniq_val_95prc_usage),
-            ('95prc_usage_val_nb', val_95prc_usage),
-            ('sufficient_quality', is_sufficient),
-            ('comment', reason),
-            ('max_occurrences_value', colstats['val_occ_max'][0]),
-            ('max_occurrences_count', colstats['val_occ_max'][1]),
-            ('min_occurrences_value', colstats['val_occ_min'][0]),
-            ('min_occurrences_count', colstats['val_occ_min'][1]),
-            ('max_value', max_value),
-            ('min_value', min_value),
-        ])
+    columns = OrderedDict([
+        # Filling
+        ('empty_row_nb', empties),
+        ('total_usage', total_usages),
+        ('filling_ratio', filling_ratios),
+
+        # Usage
+        ('uniq_val_nb', [stats['values'] for stats in stats_list]),
+        ('95prc_usage_val_nb', usages_95prc),
+        ('sufficient_quality', sufficient),
+        ('comment', reasons),
+        ('max_occurrences_value', [
+            stats['val_occ_max'][0] for stats in stats_list
+        ]),
+        ('max_occurrences_count', [
+            stats['val_occ_max'][1] for stats in stats_list
+        ]),
+        ('min_occurrences_value', [
+            stats['val_occ_min'][0] for stats in stats_list
+        ]),
+        ('min_occurrences_count', [
+            stats['val_occ_min'][1] for stats in stats_list
+        ]),
+        ('max_value', [stats['max_value'] for stats in stats_list]),
+        ('min_value', [stats['min_value'] for stats in stats_list]),
+    ])
+    if stats_list and 'sample' in stats_list[0]:
+        for indicator in stats_list[0]['sample']:
+            columns[indicator] = [
+                stats['sample'][indicator] for stats in stats_list
+            ]
 
     if verbose:
-        col_nb = len(ind_by_col)
-        count = counter['insufficient']
+        col_nb = len(stats_list)
+        count = col_nb - sum(sufficient)
         prc = 100 * count / col_nb
         print(f"{prc:0.2f}% ({count}/{col_nb}) columns have not enough data")
 
-    return ind_by_col
+    return columns
+
+
+def usage_val_nb(occ_counts, ratio, total=None, values=None):
+    """Return number of values required to reach ratio of usage
+
+    Values with same number of uses are counted all at once.
+    When occurrences are only the most frequent values (occ_counts sum is
+    below total), values beyond them are assumed to share remaining usage
+    evenly.
+
+    Args:
+        occ_counts (int-np.ndarray): occurrences sorted by decreasing count
+        ratio (float): ratio of total usage to reach
+        total (int): total usage, dft is sum of occ_counts
+        values (int): number of distinct values, dft is len of occ_counts
+    """
+    counted = occ_counts.sum()
+    total = counted if total is None else total
+    values = len(occ_counts) if values is None else values
+    target = ratio * total
+    if target <= 0:
+        return 0
+    if target > counted and values > len(occ_counts):
+        tail_usage = (total - counted) / (values - len(occ_counts))
+        tail_nb = int(np.ceil((target - counted) / tail_usage))
+        return min(len(occ_counts) + tail_nb, values)
+    if len(occ_counts) == 0:
+        return 0
+    # Last index of each group of values with same count
+    grp_ends = np.append(
+        np.flatnonzero(occ_counts[1:] != occ_counts[:-1]), len(occ_counts) - 1
+    )
+    grp_usage = np.cumsum(occ_counts)[grp_ends]
+    grp = min(np.searchsorted(grp_usage, target), len(grp_ends) - 1)
+    return int(grp_ends[grp] + 1)
+
+
+# --------------------------------------------------------------------------- #
+# Memory footprint
+
+
+INT_DTYPES = [np.int8, np.int16, np.int32, np.int64]
+UINT_DTYPES = [np.uint8, np.uint16, np.uint32, np.uint64]
+
+
+def optimize_dtypes(data, stats_by_col=None, apply=False, cat_ratio=0.5,
+                    sparse_ratio=0.1, drop_constant=True):
+    """Recommend (and apply) dtypes reducing memory footprint of data
+
+    Recommendations are lossless, based on column stats (integer bounds and
+    constant columns are checked on data, stats may be sampled):
+        - constant column (one value, no empty row, or only empty rows):
+            dropped if drop_constant
+        - integer column: smallest integer dtype covering min and max value
+        - float column: nullable integer dtype if all values are integers,
+            else float32 if it keeps values unchanged
+        - object or string column: category if few distinct values
+        - mostly empty numeric column: sparse dtype
+    Bytes are measured with deep memory usage (index aside).
+
+    Args:
+        data (pandas.DataFrame)
+        stats_by_col (dict): stats of data columns, @see compute_colstats
+            (computed if not given)
+        apply (bool): also return data with recommended dtypes
+        cat_ratio (float): max ratio of distinct values over filled rows to
+            recommend category
+        sparse_ratio (float): max filling ratio to recommend sparse dtype
+        drop_constant (bool): recommend to drop constant columns
+
+    Return:
+        if apply:
+            (pandas.DataFrame, OrderedDict) optimized data and report
+        else:
+            (OrderedDict) report, for each column an OrderedDict:
+                {
+                    'dtype': (dtype),
+                    'new_dtype': (dtype) None if column is dropped,
+                    'action': (str) 'keep', 'astype' or 'drop',
+                    'bytes': (int),
+                    'new_bytes': (int),
+                }
+    """
+    if stats_by_col is None:
+        stats_by_col = compute_colstats(data)
+    report = OrderedDict()
+    columns = OrderedDict()
+    for pos, col in enumerate(data.columns):
+        series = data.iloc[:, pos]
+        new_series = optimized_series(
+            series, stats_by_col[col], cat_ratio=cat_ratio,
+            sparse_ratio=sparse_ratio, drop_constant=drop_constant,
+        )
+        old_bytes = int(series.memory_usage(index=False, deep=True))
+        if new_series is None:
+            action, new_dtype, new_bytes = 'drop', None, 0
+        else:
+            new_bytes = int(new_series.memory_usage(index=False, deep=True))
+            if new_bytes >= old_bytes:
+                new_series, new_bytes = series, old_bytes
+            action = 'keep' if new_series is series else 'astype'
+            new_dtype = new_series.dtype
+            if apply:
+                columns[col] = new_series
+        report[col] = OrderedDict([
+            ('dtype', series.dtype),
+            ('new_dtype', new_dtype),
+            ('action', action),
+            ('bytes', old_bytes),
+            ('new_bytes', new_bytes),
+        ])
+    if apply:
+        return pd.DataFrame(columns, index=data.index), report
+    return report
+
+
+def optimized_series(series, colstats, cat_ratio=0.5, sparse_ratio=0.1,
+                     drop_constant=True):
+    """Return series with dtype reducing memory, None to drop it
+
+    @see optimize_dtypes, colstats are the ones of compute_colstats
+    """
+    dtype = series.dtype
+    filled = colstats['total_usage']
+    # Stats may be sampled or approximate: dropping a column and integer
+    # bounds are checked on the column itself
+    if drop_constant and (
+        (colstats['uniq_val_nb'] == 1 and not colstats['empty_row_nb'])
+        or not filled
+    ) and series.nunique(dropna=False) <= 1:
+        return None
+    if isinstance(dtype, (pd.CategoricalDtype, pd.SparseDtype)):
+        return series
+
+    if dtype.kind in 'iu' and series.notna().any():
+        int_dtype = smallest_int_dtype(series.min(), series.max())
+        if isinstance(dtype, np.dtype):
+            return series.astype(int_dtype)
+        return series.astype(nullable_int_dtype(int_dtype))
+    if dtype.kind == 'f' and isinstance(dtype, np.dtype):
+        if colstats['filling_ratio'] < sparse_ratio:
+            return series.astype(pd.SparseDtype(dtype, np.nan))
+        values = series.to_numpy()
+        nulls = np.isnan(values)
+        filled_values = values[~nulls]
+        if (
+            len(filled_values)
+            and np.isfinite(filled_values).all()
+            and np.array_equal(filled_values, np.round(filled_values))
+        ):
+            int_dtype = smallest_int_dtype(
+                filled_values.min(), filled_values.max()
+            )
+            if int_dtype is not np.float64:
+                if not nulls.any():
+                    return series.astype(int_dtype)
+                return series.astype(nullable_int_dtype(int_dtype))
+        downcast = values.astype(np.float32)
+        if np.array_equal(downcast, values, equal_nan=True):
+            return series.astype(np.float32)
+        return series
+    if dtype.kind == 'O' or pd.api.types.is_string_dtype(dtype):
+        if colstats['uniq_val_nb'] <= cat_ratio * filled:
+            return series.astype('category')
+    return series
+
+
+def nullable_int_dtype(int_dtype):
+    """Return name of pandas nullable dtype of numpy integer dtype"""
+    name = np.dtype(int_dtype).name
+    return name.replace('u', 'U').replace('i', 'I')
+
+
+def smallest_int_dtype(min_value, max_value):
+    """Return smallest numpy integer dtype holding min and max value"""
+    min_value, max_value = int(min_value), int(max_value)
+    for int_dtype in (UINT_DTYPES if min_value >= 0 else INT_DTYPES):
+        info = np.iinfo(int_dtype)
+        if info.min <= min_value and max_value <= info.max:
+            return int_dtype
+    return np.float64  # out of int64 range
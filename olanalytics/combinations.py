@@ -1,6 +1,14 @@
 import itertools
+import math
+import multiprocessing
 import numpy as np
-import random as rd
+
+MAX_INT64_N = 2**31  # max number of items for int64 computations
+SAMPLE_BATCH = 2**16  # combinations computed at once when sampling
+HYPERGEOMETRIC_MAX = 10**9  # bound of good & bad items of numpy law
+PAIRWISE_BLOCK = 1024  # items by side of tiles in pairwise_reduce
+
+_pairwise_func = None  # block function of pairwise_reduce in pool processes
 
 
 def combinations_ij(n):
@@ -13,33 +21,308 @@ def combinations_nb(n):
     return (n * (n-1)) // 2
 
 
-def combinations_ij_sample(n, number):
-    """Return random sample of (i, j) combinations with 0 <= i < j < n"""
-    max_number = combinations_nb(n)
-    number = min(number, max_number)
-    sample_indexes = sorted(rd.sample(range(max_number), number))
-    for cindex in sample_indexes:
-        yield S_inv(cindex, n)
+def combinations_ij_sample(n, number, rng=None):
+    """Return random sample of (i, j) combinations with 0 <= i < j < n
+
+    Combinations are sorted, @see combinations_sample
+    """
+    for I, J in combinations_sample(n, number, rng=rng):
+        yield from zip(I.tolist(), J.tolist())
+
+
+def combinations_sample(n, number, rng=None, batch=SAMPLE_BATCH, part=0,
+                        parts=1):
+    """Yield batches I, J of a sorted uniform sample of combinations
+
+    @see sample_indexes, the sample is drawn on indexes of combinations in
+    combinations_ij iterator (n must be <= 4 * 10**9).
+
+    Args:
+        n (int): number of items
+        number (int): number of combinations (all of them if bigger)
+        rng (np.random.Generator): random generator (dft is a new one)
+        batch (int): max number of combinations of batches
+        part (int): index of yielded part of the sample, in [0, parts)
+        parts (int): number of parts of the sample
+    """
+    for cindexes in sample_indexes(
+        combinations_nb(n), number, rng=rng, batch=batch, part=part,
+        parts=parts,
+    ):
+        yield S_inv_array(cindexes, n)
+
+
+def sample_indexes(total, number, rng=None, batch=SAMPLE_BATCH, part=0,
+                   parts=1):
+    """Yield sorted batches of a uniform sample of indexes in [0, total)
+
+    Indexes are drawn without replacement in O(batch) memory: the range is
+    split in halves, number of sampled indexes in each of them following an
+    hypergeometric law, until there are at most batch indexes to draw in a
+    range. Beyond ranges of 10**9 indexes, hypergeometric laws are
+    approximated by binomial ones (of relative variance error number/total).
+
+    Sample is split in parts of contiguous indexes that can be drawn by
+    different workers: each of them yields its part given the same seed of
+    rng, which must be seeded as np.random.default_rng(seed).
+
+    Args:
+        total (int): number of indexes, < 2**63
+        number (int): number of sampled indexes (all of them if bigger)
+        rng (np.random.Generator): random generator (dft is a new one)
+        batch (int): max number of indexes of batches
+        part (int): index of yielded part of the sample, in [0, parts)
+        parts (int): number of parts of the sample, split into parts of
+            equal ranges of indexes
+
+    Yield:
+        (int64-np.ndarray) sorted indexes
+    """
+    if not 0 <= part < parts:
+        raise ValueError(f"part must be in [0, {parts}), got {part}")
+    rng = np.random.default_rng() if rng is None else rng
+    number = min(number, total)
+
+    # Number of indexes of each part, drawn the same way by all workers
+    bounds = [total * pos // parts for pos in range(parts + 1)]
+    counts, rest = [], number
+    for low, high in zip(bounds[:-1], bounds[1:]):
+        count = _hypergeometric(high - low, total - high, rest, rng)
+        counts.append(count)
+        rest -= count
+    part_rng = rng.spawn(parts)[part]
+
+    yield from _sample_range(
+        bounds[part], bounds[part + 1], counts[part], part_rng, batch
+    )
+
+
+def _sample_range(low, high, number, rng, batch):
+    """Yield sorted batches of number indexes drawn in [low, high)"""
+    if number == 0:
+        return
+    if number <= batch:
+        indexes = rng.choice(high - low, size=number, replace=False)
+        yield np.sort(indexes).astype(np.int64) + low
+        return
+    mid = low + (high - low) // 2
+    count = _hypergeometric(mid - low, high - mid, number, rng)
+    yield from _sample_range(low, mid, count, rng, batch)
+    yield from _sample_range(mid, high, number - count, rng, batch)
+
+
+def _hypergeometric(ngood, nbad, number, rng):
+    """Return number of good items in a sample of number items"""
+    if number == 0 or ngood == 0:
+        return 0
+    if nbad == 0:
+        return number
+    if max(ngood, nbad) < HYPERGEOMETRIC_MAX:
+        return int(rng.hypergeometric(ngood, nbad, number))
+    count = int(rng.binomial(number, ngood / (ngood + nbad)))
+    return min(max(count, number - nbad), ngood)
 
 
 def S_inv(cindex, n):
     """Return combination i, j given its index in combinations_ij iterator"""
-
-    # Solving S(i, i+1, n) = cindex
-    a = (-1/2)
-    b = (n - 1/2)
-    c = -cindex
-    delta = b**2 - 4*a*c
-    ix = (b-np.sqrt(delta)) / (-2*a)
+    # Reversed index r is in t-th row from the end, which holds t+1 indexes:
+    # t is the largest integer such as t(t+1)/2 <= r
+    r = combinations_nb(n) - 1 - cindex
+    t = (math.isqrt(8 * r + 1) - 1) // 2
 
     # Gathering i, j
-    i = int(ix)
+    i = n - 2 - t
     j = cindex - S(i, i+1, n) + i + 1
     return i, j
 
 
-
 def S(i, j, n):
     """Return index of combination i, j in combinations_ij iterator"""
-    res = (-1/2)*i**2 + (n - 3/2)*i + (j - 1)
-    return int(res)
+    # i (2n - 3 - i) is always even
+    return i * (2*n - 3 - i) // 2 + j - 1
+
+
+def S_inv_array(cindexes, n):
+    """Return arrays I, J of combinations given their indexes (@see S_inv)
+
+    Computations are exact: on int64 for n <= 2**31, on python integers
+    (object arrays) beyond.
+
+    Args:
+        cindexes (int-array-like): indexes in combinations_ij iterator
+        n (int): number of items
+
+    Return:
+        I, J (np.ndarray): combinations, 0 <= I < J < n
+    """
+    dtype = np.int64 if n <= MAX_INT64_N else object
+    cindexes = np.asarray(cindexes).astype(dtype)
+    R = (combinations_nb(n) - 1) - cindexes
+    T = _triangular_roots(R)
+    I = (n - 2) - T
+    J = cindexes - S_array(I, I + 1, n) + I + 1
+    return I, J
+
+
+def S_array(I, J, n):
+    """Return indexes of combinations in combinations_ij iterator (@see S)
+
+    Args:
+        I, J (int-array-like): combinations, 0 <= I < J < n
+        n (int): number of items, int64 computations for n <= 2**31
+    """
+    dtype = np.int64 if n <= MAX_INT64_N else object
+    I, J = np.asarray(I).astype(dtype), np.asarray(J).astype(dtype)
+    return I * (2*n - 3 - I) // 2 + J - 1
+
+
+def _triangular_roots(R):
+    """Return largest T such as T(T+1)/2 <= R, for each R of array"""
+    if R.dtype == object:
+        return (np.frompyfunc(math.isqrt, 1, 1)(8 * R + 1) - 1) // 2
+    # Float estimate is off by a few units at most, corrected on integers
+    T = ((np.sqrt(8.0 * R + 1) - 1) // 2).astype(np.int64)
+    while True:
+        above = T * (T + 1) // 2 > R
+        below = (T + 1) * (T + 2) // 2 <= R
+        if not (above.any() or below.any()):
+            return T
+        T = T - above + below
+
+
+def pairwise_tiles(n, block=PAIRWISE_BLOCK):
+    """Yield (rows, cols) slices of tiles covering the i < j triangle
+
+    Tiles are block x block (smaller on edges), with rows.start <= cols.start:
+    diagonal tiles (rows == cols) also cover pairs with i >= j.
+    """
+    for start_i in range(0, n - 1, block):
+        rows = slice(start_i, min(start_i + block, n))
+        for start_j in range(start_i, n, block):
+            yield rows, slice(start_j, min(start_j + block, n))
+
+
+def pairwise_reduce(func, n, top_k=None, threshold=None,
+                    block=PAIRWISE_BLOCK, workers=None):
+    """Return pairs (i, j) of n items with largest values of func
+
+    The i < j triangle is computed by tiles (@see pairwise_tiles), each one
+    reduced before the next one, so that the n x n matrix of values is never
+    materialized. To select smallest values (distances), negate them.
+
+    Example:
+        ```
+        def dot_block(X, rows, cols):
+            return X[rows] @ X[cols].T
+
+        # 100 most similar pairs of (normalized) columns of X
+        I, J, V = pairwise_reduce(
+            functools.partial(dot_block, X.T), X.shape[1], top_k=100
+        )
+        ```
+
+    Args:
+        func (callable): func(rows, cols) returns array of values of pairs
+            of items in rows and cols slices, of shape (len(rows), len(cols))
+        n (int): number of items
+        top_k (int): number of pairs to keep, of largest values
+        threshold (float): min value of kept pairs
+        block (int): number of items by side of tiles
+        workers (int): number of processes computing tiles, func is sent once
+            to each of them (it must be picklable)
+
+    Return:
+        I, J, V (np.ndarray): pairs and their values (nan values are never
+            kept), by decreasing value then (i, j) with top_k, else by (i, j)
+    """
+    if top_k is None and threshold is None:
+        raise ValueError("top_k or threshold is required")
+    tasks = (
+        (rows, cols, top_k, threshold)
+        for rows, cols in pairwise_tiles(n, block)
+    )
+    parts = []
+
+    def collect(results):
+        """Reduce results as they come, keeping at most top_k pairs"""
+        nonlocal parts
+        for result in results:
+            parts.append(result)
+            if top_k is not None:
+                parts = [_top_pairs(*_concat_pairs(parts), top_k)]
+
+    if workers:
+        with multiprocessing.Pool(
+            workers, initializer=_set_pairwise_func, initargs=(func,)
+        ) as pool:
+            collect(pool.imap_unordered(_pairwise_tile, tasks, chunksize=4))
+    else:
+        collect(_tile_pairs(func, *task) for task in tasks)
+
+    I, J, V = _concat_pairs(parts)
+    if top_k is not None:
+        return _top_pairs(I, J, V, top_k)
+    order = np.lexsort((J, I))
+    return I[order], J[order], V[order]
+
+
+def _set_pairwise_func(func):
+    """Set block function of pool processes (@see pairwise_reduce)"""
+    global _pairwise_func
+    _pairwise_func = func
+
+
+def _pairwise_tile(task):
+    """Return reduced pairs of tile with block function of pool process"""
+    return _tile_pairs(_pairwise_func, *task)
+
+
+def _tile_pairs(func, rows, cols, top_k, threshold):
+    """Return I, J, V of pairs i < j of tile kept by top_k and threshold"""
+    values = np.asarray(func(rows, cols))
+    shape = (rows.stop - rows.start, cols.stop - cols.start)
+    if values.shape != shape:
+        raise ValueError(
+            f"block function returned shape {values.shape}, expected {shape}"
+        )
+    mask = ~np.isnan(values) if values.dtype.kind == 'f' else None
+    if rows == cols:
+        triangle = np.triu(np.ones(shape, dtype=bool), k=1)
+        mask = triangle if mask is None else mask & triangle
+    if threshold is not None:
+        mask = values >= threshold if mask is None else mask & (
+            values >= threshold
+        )
+    if top_k is not None:
+        # Only values reaching k-th largest one are gathered
+        candidates = values.ravel() if mask is None else values[mask]
+        if len(candidates) > top_k > 0:
+            kth = np.partition(candidates, len(candidates) - top_k)[
+                len(candidates) - top_k
+            ]
+            mask = values >= kth if mask is None else mask & (values >= kth)
+    if mask is None:
+        mask = np.ones(shape, dtype=bool)
+    pos_i, pos_j = np.nonzero(mask)
+    I, J, V = pos_i + rows.start, pos_j + cols.start, values[pos_i, pos_j]
+    return _top_pairs(I, J, V, top_k) if top_k is not None else (I, J, V)
+
+
+def _concat_pairs(parts):
+    """Return I, J, V concatenated from list of (I, J, V)"""
+    if not parts:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([], dtype=np.float64)
+    return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+
+def _top_pairs(I, J, V, k):
+    """Return k pairs of largest values, ties by smallest (i, j)"""
+    if len(V) > k > 0:
+        # Pairs tied with k-th largest value are kept until sorted
+        kth = np.partition(V, len(V) - k)[len(V) - k]
+        kept = V >= kth
+        I, J, V = I[kept], J[kept], V[kept]
+    keys = -V.astype(np.int64) if V.dtype.kind in 'bu' else -V
+    order = np.lexsort((J, I, keys))[:k]
+    return I[order], J[order], V[order]
@@ -1,9 +1,29 @@
+import abc
 import bisect
+import math
+import numbers
 import numpy as np
+import warnings
 from collections.abc import Iterable
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from functools import partial
 
+EPOCH = datetime(1970, 1, 1)
+US = timedelta(microseconds=1)
+
+# Periodic attributes: (unit in us, period in us, first value)
+#   all periods divide a week, weeks starting on monday
+PERIODIC_ATTRIBUTES = {
+    'microsecond': (1, 10**6, 0),
+    'second': (10**6, 60 * 10**6, 0),
+    'minute': (60 * 10**6, 3600 * 10**6, 0),
+    'hour': (3600 * 10**6, 86400 * 10**6, 0),
+    'weekday': (86400 * 10**6, 7 * 86400 * 10**6, 0),
+    'isoweekday': (86400 * 10**6, 7 * 86400 * 10**6, 1),
+}
+PERIOD_ORIGIN = -3 * 86400 * 10**6  # monday 1969-12-29 in us since EPOCH
+MAX_TILED_INTERVALS = 2**16  # above, descriptions are evaluated on rows
+
 
 def check_method(instance, attr, reference):
     """Return whether value return by method matches reference"""
@@ -37,8 +57,497 @@ def check_value(val, reference):
     return val == reference
 
 
+def check_values(vals, reference):
+    """Return array of bool where values match reference
+
+    Vectorized counterpart of check_value
+
+    Args:
+        vals (np.ndarray)
+        reference (scalar|list|tuple): @see check_value
+    """
+    if isinstance(reference, list):
+        res = np.zeros(len(vals), dtype=bool)
+        for ref in reference:
+            res |= check_values(vals, ref)
+        return res
+    if isinstance(reference, tuple):
+        return (reference[0] <= vals) & (vals <= reference[1])
+    return np.asarray(vals == reference, dtype=bool)
+
+
+def datetime_attribute(dts, attr):
+    """Return array of given datetime attribute for each datetime in dts
+
+    Calendar attributes (@see DATETIME64_ATTRIBUTES) are computed with
+        vectorized passes on dts as numpy.datetime64, other attributes (or
+        timezone-aware datetimes) on python datetimes
+    """
+    if attr in DATETIME64_ATTRIBUTES:
+        dts64 = as_datetime64(dts)
+        if dts64 is not None:
+            return DATETIME64_ATTRIBUTES[attr](dts64)
+    if isinstance(dts, np.ndarray) and np.issubdtype(dts.dtype, np.datetime64):
+        dts = dts.astype('M8[us]').astype(object)
+    if callable(getattr(datetime, attr)):
+        return np.array([getattr(dt, attr)() for dt in dts])
+    return np.array([getattr(dt, attr) for dt in dts])
+
+
+def as_datetime64(dts):
+    """Return dts as numpy.datetime64 array, None if they can't be converted
+
+    Timezone-aware datetimes are not converted, numpy would shift them to UTC
+    """
+    if isinstance(dts, np.ndarray) and np.issubdtype(dts.dtype, np.datetime64):
+        return dts
+    if isinstance(dts, RegularTimeline):
+        return dts.to_array()
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        try:
+            return np.asarray(dts, dtype='M8[us]')
+        except (TypeError, ValueError, UserWarning, DeprecationWarning):
+            return None
+
+
+def _d64_diff(dts, unit, ref_unit):
+    """Return number of unit b/w dts floored on unit and on ref_unit"""
+    return (dts.astype(f'M8[{unit}]') - dts.astype(f'M8[{ref_unit}]')).astype(
+        np.int64
+    )
+
+
+def _d64_weekday(dts):
+    """Return weekday of datetime64 array (monday is 0)"""
+    days = dts.astype('M8[D]').astype(np.int64)
+    return (days - PERIOD_ORIGIN // (86400 * 10**6)) % 7
+
+
+DATETIME64_ATTRIBUTES = {
+    'year': lambda dts: dts.astype('M8[Y]').astype(np.int64) + 1970,
+    'month': lambda dts: dts.astype('M8[M]').astype(np.int64) % 12 + 1,
+    'day': lambda dts: _d64_diff(dts, 'D', 'M') + 1,
+    'hour': lambda dts: _d64_diff(dts, 'h', 'D'),
+    'minute': lambda dts: _d64_diff(dts, 'm', 'h'),
+    'second': lambda dts: _d64_diff(dts, 's', 'm'),
+    'microsecond': lambda dts: _d64_diff(dts, 'us', 's'),
+    'weekday': _d64_weekday,
+    'isoweekday': lambda dts: _d64_weekday(dts) + 1,
+}
+
+
+def to_us(value):
+    """Convert datetime (since EPOCH) or timedelta to integer microseconds
+
+    Timezone-aware datetimes are converted to UTC
+    """
+    if isinstance(value, np.datetime64):
+        return int(value.astype('M8[us]').astype(np.int64))
+    if isinstance(value, np.timedelta64):
+        return int(value.astype('m8[us]').astype(np.int64))
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return (value - EPOCH) // US
+    if isinstance(value, timedelta):
+        return value // US
+    raise TypeError(f"Can't convert {type(value)} to microseconds")
+
+
+# --------------------------------------------------------------------------- #
+# Periodic intervals
+#   Set of half-open intervals [a, b) within [0, period) as (k, 2)-np.ndarray
+
+
+def _interval_select(intervals_list, period, keep):
+    """Return intervals where number of covering intervals passes keep
+
+    Args:
+        intervals_list (list[np.ndarray]): sets of disjoint intervals
+        period (int): span of intervals
+        keep (callable): coverage array -> bool array of kept segments
+
+    Return:
+        (np.ndarray) merged intervals
+    """
+    bounds = [np.array([0, period])]
+    bounds += [intervals.ravel() for intervals in intervals_list]
+    points = np.unique(np.concatenate(bounds))
+    delta = np.zeros(len(points), dtype=np.int64)
+    for intervals in intervals_list:
+        np.add.at(delta, np.searchsorted(points, intervals[:, 0]), 1)
+        np.add.at(delta, np.searchsorted(points, intervals[:, 1]), -1)
+    selected = keep(np.cumsum(delta)[:-1])
+
+    # Merge consecutive selected segments
+    change = np.diff(np.concatenate([[0], selected.astype(np.int8), [0]]))
+    return np.stack(
+        [points[np.where(change == 1)[0]], points[np.where(change == -1)[0]]],
+        axis=1,
+    ).astype(np.int64)
+
+
+def _intervals_tile(intervals, period, new_period):
+    """Repeat intervals on a multiple of their period
+
+    Return None if more than MAX_TILED_INTERVALS intervals would be built
+    """
+    if new_period == period:
+        return intervals
+    if len(intervals) == 1 and tuple(intervals[0]) == (0, period):
+        return np.array([[0, new_period]])
+    if len(intervals) * (new_period // period) > MAX_TILED_INTERVALS:
+        return None
+    offsets = np.arange(0, new_period, period)
+    return (intervals[None, :, :] + offsets[:, None, None]).reshape(-1, 2)
+
+
+def _periodic_reference(attr, reference):
+    """Return (period, intervals) matching attribute reference
+
+    Return None when attribute is not periodic or reference not numerical
+    """
+    if attr not in PERIODIC_ATTRIBUTES:
+        return None
+    unit, period, first = PERIODIC_ATTRIBUTES[attr]
+
+    if isinstance(reference, list):
+        parts = [_periodic_reference(attr, ref) for ref in reference]
+        if any(part is None for part in parts):
+            return None
+        intervals = [intervals for _, intervals in parts]
+        return period, _interval_select(intervals, period, lambda c: c > 0)
+
+    if isinstance(reference, tuple):
+        low, high = reference
+    else:
+        low, high = reference, reference
+    if not all(
+        isinstance(val, numbers.Real) and not isinstance(val, bool)
+        for val in (low, high)
+    ):
+        return None
+    low, high = math.ceil(low), math.floor(high)
+    start = min(max((low - first) * unit, 0), period)
+    end = min(max((high - first + 1) * unit, 0), period)
+    if end <= start:
+        return period, np.empty((0, 2), dtype=np.int64)
+    return period, np.array([[start, end]], dtype=np.int64)
+
+
+# --------------------------------------------------------------------------- #
+# Timelines
+
+
+class RegularTimeline:
+    """Regular timeline described by start, step and size
+
+    Datetimes are only built when accessed, calendar descriptions on
+    periodic attributes (hour, weekday, ...) are matched arithmetically.
+    """
+
+    def __init__(self, start, step, size):
+        """Create a regular timeline
+
+        Args:
+            start (datetime|np.datetime64)  : first datetime
+            step (timedelta|np.timedelta64) : positive step b/w datetimes
+            size (int)                      : number of datetimes
+        """
+        if getattr(start, 'tzinfo', None) is not None:
+            raise ValueError(
+                "RegularTimeline needs naive datetimes, calendar attributes"
+                " of timezone-aware ones are local (@see regular_timeline)"
+            )
+        self._start_us = to_us(start)
+        self._step_us = to_us(step)
+        if self._step_us <= 0:
+            raise ValueError("step must be positive")
+        self._size = int(size)
+
+    @classmethod
+    def from_array(cls, X):
+        """Build timeline from a regular sorted array of datetimes"""
+        if isinstance(X, cls):
+            return X
+        if len(X) < 2:
+            raise ValueError("Can't deduce step from less than 2 datetimes")
+        return cls(X[0], X[1] - X[0], len(X))
+
+    @property
+    def start(self):
+        """First datetime"""
+        return EPOCH + self._start_us * US
+
+    @property
+    def step(self):
+        """Step b/w datetimes"""
+        return self._step_us * US
+
+    def index(self, dt):
+        """Return position of datetime in timeline (None if absent)"""
+        index, rest = divmod(to_us(dt) - self._start_us, self._step_us)
+        if rest or not 0 <= index < self._size:
+            return None
+        return index
+
+    def periodic_indexes(self, period, intervals):
+        """Return indexes of datetimes within periodic intervals
+
+        Intervals of each period spanned are converted to index ranges, unless
+        periods outnumber datetimes (step coarser than period): phase of each
+        datetime within period is then looked up in intervals. Cost is at
+        most proportional to timeline size.
+
+        Args:
+            period (int): period of intervals (us), starting on a monday
+            intervals (np.ndarray): (k, 2) half-open intervals within period
+        """
+        if self._size == 0 or len(intervals) == 0:
+            return np.array([], dtype=np.int64)
+        if intervals[0, 0] <= 0 and intervals[0, 1] >= period:  # all times
+            return np.arange(self._size, dtype=np.int64)
+        first = self._start_us - PERIOD_ORIGIN
+        last = first + (self._size - 1) * self._step_us
+        period_nb = last // period - first // period + 1
+        if period_nb * len(intervals) > self._size:
+            phases = (
+                first + np.arange(self._size, dtype=np.int64) * self._step_us
+            ) % period
+            pos = np.searchsorted(intervals[:, 0], phases, side='right') - 1
+            inside = (pos >= 0) & (phases < intervals[np.maximum(pos, 0), 1])
+            return np.where(inside)[0]
+        periods = np.arange(first // period, last // period + 1) * period
+
+        # Index ranges [lows, highs) of each interval of each period
+        bounds = periods[:, None, None] + intervals[None, :, :] - first
+        ranges = -(-bounds // self._step_us)
+        ranges = np.clip(ranges, 0, self._size).reshape(-1, 2)
+        lows, lengths = ranges[:, 0], ranges[:, 1] - ranges[:, 0]
+        kept = lengths > 0
+        lows, lengths = lows[kept], lengths[kept]
+
+        offsets = np.cumsum(lengths) - lengths
+        return (
+            np.arange(lengths.sum(), dtype=np.int64)
+            + np.repeat(lows - offsets, lengths)
+        )
+
+    def to_array(self):
+        """Return datetimes as a numpy.datetime64 array"""
+        return self[:]
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += self._size
+            if not 0 <= index < self._size:
+                raise IndexError("timeline index out of range")
+            return EPOCH + (self._start_us + index * self._step_us) * US
+        if isinstance(index, slice):
+            index = np.arange(self._size)[index]
+        us = self._start_us + np.asarray(index, dtype=np.int64) * self._step_us
+        return us.astype('M8[us]')
+
+    def __array__(self, dtype=None, copy=None):
+        res = self.to_array()
+        return res if dtype is None else res.astype(dtype)
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield self[index]
+
+    def __len__(self):
+        return self._size
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}"
+            f"[{self.start}, step={self.step}, size={self._size}]"
+        )
+
+
+def regular_timeline(X):
+    """Return RegularTimeline equivalent to regular sorted datetimes X
+
+    Timezone-aware datetimes are returned as they are: their calendar
+    attributes are local (not regular with DST), so they are matched on
+    datetimes themselves
+    """
+    if len(X) and getattr(X[0], 'tzinfo', None) is not None:
+        return X
+    return RegularTimeline.from_array(X)
+
+
+# --------------------------------------------------------------------------- #
+# Descriptions
+
 
-class DatetimeDescription:
+class _TimelineCache:
+    """Lazily computed values over a timeline, shared by expression nodes
+
+    Each value is only computed once per row, and only for requested rows
+    """
+
+    def __init__(self, dts):
+        self.dts = dts
+        self._array = None
+        self._attributes = {}
+        self._states = {}
+
+    def datetimes(self, rows):
+        """Return datetimes of given rows, as numpy.datetime64 if possible
+
+        Datetimes of a RegularTimeline are computed from start and step,
+        other timelines are converted once
+        """
+        if isinstance(self.dts, RegularTimeline):
+            return self.dts[rows]
+        if self._array is None:
+            self._array = as_datetime64(self.dts)
+            if self._array is None:
+                self._array = np.empty(len(self.dts), dtype=object)
+                self._array[:] = list(self.dts)
+        return self._array[rows]
+
+    def attribute(self, attr, rows):
+        """Return values of datetime attribute on given rows"""
+        if attr in self._attributes:
+            values, known = self._attributes[attr]
+        else:
+            values, known = None, np.zeros(len(self.dts), dtype=bool)
+        todo = rows[~known[rows]]
+        if len(todo):
+            computed = datetime_attribute(self.datetimes(todo), attr)
+            if values is None:
+                dtype = computed.dtype if computed.dtype.kind in 'biuf' else (
+                    object
+                )
+                values = np.empty(len(self.dts), dtype=dtype)
+                self._attributes[attr] = values, known
+            values[todo] = computed
+            known[todo] = True
+        if values is None:  # no rows
+            return np.array([], dtype=object)
+        return values[rows]
+
+    def state(self, key):
+        """Return match state of node over timeline (-1 when unknown)"""
+        try:
+            return self._states[key]
+        except KeyError:
+            state = np.full(len(self.dts), -1, dtype=np.int8)
+            self._states[key] = state
+            return state
+
+
+class _Description(abc.ABC):
+    """Base class for datetime descriptions
+
+    Descriptions can be combined with &, | and ~ into expressions evaluated
+    with a single boolean mask over the timeline.
+    """
+
+    @property
+    @abc.abstractmethod
+    def key(self):
+        """Hashable key identifying description (for sub-expression cache)"""
+
+    @abc.abstractmethod
+    def periodic(self):
+        """Return (period, intervals) of matching times (None if not periodic)
+
+        period (int) is in microseconds, periods start on mondays,
+        intervals (np.ndarray) are the (k, 2) half-open intervals within period
+        None too when combining attributes would tile more than
+        MAX_TILED_INTERVALS intervals (e.g. second within week)
+        """
+
+    def match(self, dt):
+        """Return whether datetime match description"""
+        return bool(self.mask(np.array([dt], dtype=object))[0])
+
+    def mask(self, dts):
+        """Return array of bool where dts match description"""
+        indexes = self._periodic_indexes(dts)
+        if indexes is not None:
+            res = np.zeros(len(dts), dtype=bool)
+            res[indexes] = True
+            return res
+        rows = np.arange(len(dts))
+        return self._mask(_TimelineCache(dts), rows)
+
+    def match_indexes(self, dts):
+        """Return indexes within dts where datetimes match description"""
+        indexes = self._periodic_indexes(dts)
+        if indexes is not None:
+            return indexes
+        return np.where(self.mask(dts))[0]
+
+    def _periodic_indexes(self, dts):
+        """Return matching indexes computed arithmetically when possible"""
+        if not isinstance(dts, RegularTimeline):
+            return None
+        periodic = self.periodic()
+        if periodic is None:
+            return None
+        return dts.periodic_indexes(*periodic)
+
+    def matches(self, dts):
+        """Return where dts match description
+
+        As bool-np.ndarray if dts is an array, list of bool otherwise
+        """
+        res = self.mask(dts)
+        if isinstance(dts, np.ndarray):
+            return res
+        return res.tolist()
+
+    def _mask(self, cache, rows):
+        """Return array of bool where rows match description
+
+        Results are stored in cache so a node is evaluated once per row
+        """
+        state = cache.state(self.key)
+        todo = rows[state[rows] < 0]
+        if len(todo):
+            state[todo] = self._evaluate(cache, todo)
+        return state[rows].astype(bool)
+
+    @abc.abstractmethod
+    def _evaluate(self, cache, rows):
+        """Return array of bool where rows match description (no cache)"""
+
+    def __and__(self, other):
+        return DatetimeExpression('&', self, _as_description(other))
+
+    def __rand__(self, other):
+        return DatetimeExpression('&', _as_description(other), self)
+
+    def __or__(self, other):
+        return DatetimeExpression('|', self, _as_description(other))
+
+    def __ror__(self, other):
+        return DatetimeExpression('|', _as_description(other), self)
+
+    def __invert__(self):
+        return DatetimeExpression('~', self)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}[{self}]"
+
+
+def _as_description(obj):
+    """Convert obj to a description"""
+    if isinstance(obj, _Description):
+        return obj
+    if isinstance(obj, dict):
+        return DatetimeDescription(**obj)
+    raise TypeError(f"Can't combine description with {type(obj)}")
+
+
+class DatetimeDescription(_Description):
     """Description of a datetime"""
 
     def __init__(self, **attributes):
@@ -64,51 +573,214 @@ class DatetimeDescription:
             func.__name__ = f"{attr}={repr(value)}"
             self._pipe.append(func)
 
+    @property
+    def key(self):
+        """Hashable key identifying description"""
+        return tuple(sorted(
+            (attr, repr(value)) for attr, value in self._attributes.items()
+        ))
+
+    def periodic(self):
+        """Return (period, intervals) of matching times (None if aperiodic)"""
+        parts = [
+            _periodic_reference(attr, value)
+            for attr, value in self._attributes.items()
+        ]
+        if not parts:  # no attribute: all times
+            period = PERIODIC_ATTRIBUTES['microsecond'][1]
+            return period, np.array([[0, period]])
+        if any(part is None for part in parts):
+            return None
+        period = max(part_period for part_period, _ in parts)
+        intervals = [
+            _intervals_tile(part_intervals, part_period, period)
+            for part_period, part_intervals in parts
+        ]
+        if any(part_intervals is None for part_intervals in intervals):
+            return None
+        return period, _interval_select(
+            intervals, period, lambda c: c == len(intervals)
+        )
+
     def match(self, dt):
         """Return whether datetime match timedescription"""
+        if isinstance(dt, np.datetime64):
+            dt = dt.astype('M8[us]').item()
         for func in self._pipe:
             if not func(dt):
                 return False
         return True
 
-    def match_indexes(self, dts):
-        """Return indexes within dts where datetimes match description"""
-        return np.where(self.matches(dts))[0]
-
-    def matches(self, dts):
-        """Return array of bool where dts match description"""
-        res = [self.match(dt) for dt in dts]
-        if isinstance(dts, np.ndarray):
-            return np.array(res)
+    def _evaluate(self, cache, rows):
+        """Check attributes one after the other on rows still matching"""
+        positions = np.arange(len(rows))
+        for attr, value in self._attributes.items():
+            values = cache.attribute(attr, rows[positions])
+            positions = positions[check_values(values, value)]
+        res = np.zeros(len(rows), dtype=bool)
+        res[positions] = True
         return res
 
-    def __repr__(self):
-        return f"{self.__class__.__name__}[{self}]"
-
     def __str__(self):
         return "|".join(func.__name__ for func in self._pipe)
 
 
+class DatetimeExpression(_Description):
+    """Combination of datetime descriptions
+
+    Built with operators on descriptions:
+        >> morning = DatetimeDescription(hour=(6, 11))
+        >> weekend = DatetimeDescription(weekday=(5, 6))
+        >> (morning & ~weekend) | {'hour': 12}
+    """
+
+    OPERATORS = ('&', '|', '~')
+
+    def __init__(self, operator, *operands):
+        """Create an expression
+
+        Args:
+            operator (str): one of '&' (and), '|' (or), '~' (not)
+            *operands (descriptions): 1 operand for '~', at least 2 otherwise
+                nested expressions with same operator are flattened
+        """
+        if operator not in self.OPERATORS:
+            raise ValueError(
+                f"Unknown operator '{operator}', must be in {self.OPERATORS}"
+            )
+        if operator == '~' and len(operands) != 1:
+            raise ValueError("'~' expects exactly one operand")
+        if operator != '~' and len(operands) < 2:
+            raise ValueError(f"'{operator}' expects at least two operands")
+
+        self._operator = operator
+        self._operands = []
+        for operand in operands:
+            operand = _as_description(operand)
+            if (
+                operator != '~'
+                and isinstance(operand, DatetimeExpression)
+                and operand.operator == operator
+            ):
+                self._operands.extend(operand.operands)
+            else:
+                self._operands.append(operand)
+
+    @property
+    def operator(self):
+        """Operator combining operands"""
+        return self._operator
+
+    @property
+    def operands(self):
+        """Combined descriptions"""
+        return list(self._operands)
+
+    @property
+    def key(self):
+        """Hashable key identifying expression"""
+        keys = [operand.key for operand in self._operands]
+        if self.operator != '~':
+            keys = sorted(keys, key=repr)
+        return (self.operator, tuple(keys))
+
+    def periodic(self):
+        """Return (period, intervals) of matching times (None if aperiodic)"""
+        parts = [operand.periodic() for operand in self._operands]
+        if any(part is None for part in parts):
+            return None
+        period = max(part_period for part_period, _ in parts)
+        intervals = [
+            _intervals_tile(part_intervals, part_period, period)
+            for part_period, part_intervals in parts
+        ]
+        if any(part_intervals is None for part_intervals in intervals):
+            return None
+        if self.operator == '&':
+            keep = lambda c: c == len(intervals)
+        elif self.operator == '|':
+            keep = lambda c: c > 0
+        else:
+            keep = lambda c: c == 0
+        return period, _interval_select(intervals, period, keep)
+
+    def match(self, dt):
+        """Return whether datetime match expression"""
+        if self.operator == '~':
+            return not self._operands[0].match(dt)
+        if self.operator == '&':
+            return all(operand.match(dt) for operand in self._operands)
+        return any(operand.match(dt) for operand in self._operands)
+
+    def _evaluate(self, cache, rows):
+        """Evaluate operands on rows whose result is still undetermined
+
+        '&' only evaluates next operand on rows still matching,
+        '|' only evaluates next operand on rows not matching yet
+        """
+        if self.operator == '~':
+            return ~self._operands[0]._mask(cache, rows)
+
+        positions = np.arange(len(rows))
+        res = np.full(len(rows), self.operator == '&')
+        for operand in self._operands:
+            if len(positions) == 0:
+                break
+            matching = operand._mask(cache, rows[positions])
+            if self.operator == '&':
+                res[positions[~matching]] = False
+                positions = positions[matching]
+            else:
+                res[positions[matching]] = True
+                positions = positions[~matching]
+        return res
+
+    def __str__(self):
+        if self.operator == '~':
+            return f"~({self._operands[0]})"
+        return f" {self.operator} ".join(
+            f"({operand})" for operand in self._operands
+        )
+
+
 def dtloc2pos(__object, timeline):
     """Convert a datetime location to an array of indexes within timeline
 
     In case object is slice, return slice at it is
+    In case object is an iterable of descriptions, they are combined with '|'
+        so timeline is evaluated once
+    In case timeline is a RegularTimeline, positions of datetimes and of
+        descriptions on periodic attributes are computed arithmetically
     """
 
     if isinstance(__object, slice):
         return __object
-    if isinstance(__object, datetime):
-        index = bisect.bisect_left(timeline, __object)
-        if timeline[index] != __object:
+    if isinstance(__object, (datetime, np.datetime64)) and isinstance(
+        timeline, RegularTimeline
+    ):
+        index = timeline.index(__object)
+        res = [] if index is None else [index]
+    elif isinstance(__object, (datetime, np.datetime64)):
+        if isinstance(timeline, np.ndarray):
+            index = np.searchsorted(timeline, np.datetime64(__object))
+        else:
+            index = bisect.bisect_left(timeline, __object)
+        if index == len(timeline) or timeline[index] != __object:
             res = []
         else:
             res = [index]
-    elif isinstance(__object, (DatetimeDescription, dict)):
+    elif isinstance(__object, (_Description, dict)):
         if isinstance(__object, dict):
             __object = DatetimeDescription(**__object)
         res = __object.match_indexes(timeline)
     elif isinstance(__object, int):
         res = [__object]
+    elif (
+        isinstance(__object, (list, tuple))
+        and len(__object) > 1
+        and all(isinstance(item, (_Description, dict)) for item in __object)
+    ):
+        res = DatetimeExpression('|', *__object).match_indexes(timeline)
     elif isinstance(__object, Iterable):
         res = []
         for item in __object:
@@ -1,29 +1,194 @@
+import math
 import matplotlib.pyplot as plt
 import numpy as np
-from datetime import timedelta
+from datetime import datetime, timedelta
 
-from olanalytics.dt import dtloc2pos
+from olanalytics.dt import (
+    EPOCH,
+    US,
+    dtloc2pos,
+    RegularTimeline,
+    regular_timeline,
+    to_us,
+)
+from olanalytics.tracking import RateMeter
 
 
+def _timeseries_args(start, end, step):
+    """Return start, step and number of values of timeseries
+
+    Naive datetimes are converted to numpy.datetime64[us] (timedelta64[us]
+    for step), timezone-aware ones are kept as they are
+    """
+    if isinstance(start, datetime) and start.tzinfo is not None:
+        if step <= timedelta(0):
+            raise ValueError("step must be positive")
+        number = -((start - end) // step)
+    elif isinstance(start, (datetime, np.datetime64)):
+        start = np.datetime64(start, 'us')
+        end = np.datetime64(end, 'us')
+        step = np.timedelta64(step, 'us')
+        if step <= np.timedelta64(0, 'us'):
+            raise ValueError("step must be positive")
+        number = -((start - end) // step)
+    else:
+        if step <= 0:
+            raise ValueError("step must be positive")
+        number = math.ceil((end - start) / step)
+    return start, step, max(int(number), 0)
+
+
+def _timeseries_values(start, step, first, last):
+    """Return values of indexes [first, last) of timeseries
+
+    Timezone-aware datetimes are built as objects (numpy drops timezones)
+    """
+    indexes = np.arange(first, last)
+    if isinstance(start, datetime):
+        indexes = indexes.astype(object)
+    return start + step * indexes
+
 
 def timeseries(start, end, step):
-    X = []
-    x = start
-    while x < end:
-        X.append(x)
-        x += step
-    return np.array(X)
+    """Return regular values from start (included) to end (excluded)
+
+    Args:
+        start (datetime|np.datetime64|number)
+        end (datetime|np.datetime64|number)
+        step (timedelta|np.timedelta64|number): positive step
+
+    Return:
+        (np.ndarray) numpy.datetime64[us] values if start is a naive
+            datetime, timezone-aware datetimes (objects) if start is aware
+    """
+    start, step, number = _timeseries_args(start, end, step)
+    return _timeseries_values(start, step, 0, number)
+
+
+def itimeseries(start, end, step, chunk=10**6):
+    """Iterate over timeseries by chunks of given size (last can be shorter)
+
+    Args:
+        start, end, step: @see timeseries
+        chunk (int): number of values in each chunk
+
+    Return:
+        (generator of np.ndarray) chunks of timeseries(start, end, step)
+    """
+    chunk = int(chunk)
+    if chunk < 1:
+        raise ValueError("Chunk size must >= 1, got %s" % chunk)
+    start, step, number = _timeseries_args(start, end, step)
+
+    def citerator():
+        for first in range(0, number, chunk):
+            last = min(first + chunk, number)
+            yield _timeseries_values(start, step, first, last)
+
+    return citerator()
+
+
+CHUNK_SIZE = 2**20  # max number of values in temporary arrays of curves
+
+
+def expand_ranges(lows, highs):
+    """Return indexes within ranges [lows[k], highs[k]) and their range k"""
+    lengths = np.maximum(highs - lows, 0)
+    offsets = np.cumsum(lengths) - lengths
+    indexes = (
+        np.arange(lengths.sum(), dtype=np.int64)
+        + np.repeat(lows - offsets, lengths)
+    )
+    return indexes, np.repeat(np.arange(len(lows)), lengths)
+
+
+def split_ranges(lows, highs, size):
+    """Split ranges [lows[k], highs[k]) into pieces of at most size indexes
+
+    Return:
+        owners (np.ndarray): range k of each piece
+        starts (np.ndarray): start of each piece
+        ends (np.ndarray): end (excluded) of each piece
+    """
+    lengths = np.maximum(highs - lows, 0)
+    numbers = -(-lengths // size)
+    first_pieces = np.cumsum(numbers) - numbers
+    owners = np.repeat(np.arange(len(lows)), numbers)
+    ranks = np.arange(numbers.sum()) - np.repeat(first_pieces, numbers)
+    starts = lows[owners] + ranks * size
+    ends = np.minimum(starts + size, highs[owners])
+    return owners, starts, ends
+
+
+def positions_number(pos, size):
+    """Return number of positions selected by pos (slice or indexes)"""
+    if isinstance(pos, slice):
+        return len(range(*pos.indices(size)))
+    return len(pos)
+
+
+def gaussian_supports(X, centers, stdevs, cutoff=6):
+    """Return index ranges [lows, highs) of gaussians support within sorted X
+
+    Args:
+        X (np.ndarray)          : sorted numerical X
+        centers (np.ndarray)    : centers of gaussians (on X)
+        stdevs (np.ndarray)     : standard deviations (same shape as centers)
+        cutoff (float)          : support is center +/- cutoff * stdev
+            (None for whole X)
+    """
+    if cutoff is None:
+        lows = np.zeros(len(centers), dtype=np.int64)
+        highs = np.full(len(centers), len(X), dtype=np.int64)
+    else:
+        lows = np.searchsorted(X, centers - cutoff * stdevs, side='left')
+        highs = np.searchsorted(X, centers + cutoff * stdevs, side='right')
+    return lows, highs
+
+
+def gaussian_kernels(X, centers, stdevs, cutoff=6):
+    """Return gaussian kernels evaluated on their support within sorted X
+
+    Args:
+        X, centers, stdevs, cutoff: @see gaussian_supports
+
+    Return:
+        indexes (np.ndarray)    : indexes in X of each kernel value
+        lengths (np.ndarray)    : number of values of each kernel
+        values (np.ndarray)     : kernels values (gaussians of height 1),
+            values of kernel k are after the ones of kernel k-1
+    """
+    lows, highs = gaussian_supports(X, centers, stdevs, cutoff=cutoff)
+    indexes, owners = expand_ranges(lows, highs)
+    values = np.exp(
+        -0.5 * (X[indexes] - centers[owners])**2 / stdevs[owners]**2
+    )
+    return indexes, highs - lows, values
 
 
 class CustomCurve:
 
-    def __init__(self, X):
+    def __init__(self, X, dtype=float, filename=None, chunk=CHUNK_SIZE):
         """Initiate a new curve (Y=zeros)
 
         assume x has regular step
+
+        Args:
+            X (array-like): numerical X
+            dtype (dtype): type of Y values (float32 halves Y footprint)
+            filename (str): file backing Y as a numpy.memmap (created or
+                overwritten), Y is kept in memory if None
+            chunk (int): max number of Y values operations work on at once,
+                operations don't build temporaries of the length of Y
         """
         self._Xnum = X
-        self.Y = np.zeros(len(X))
+        if filename is None:
+            self.Y = np.zeros(len(X), dtype=dtype)
+        else:
+            self.Y = np.memmap(filename, dtype=dtype, mode='w+', shape=len(X))
+        self.chunk = int(chunk)
+        if self.chunk < 1:
+            raise ValueError("Chunk size must >= 1, got %s" % chunk)
 
     @property
     def X(self):
@@ -35,28 +200,104 @@ class CustomCurve:
         """Numerical X vector"""
         return self._Xnum
 
+    @Xnum.setter
+    def Xnum(self, X):
+        """Replace numerical X vector (same length as Y)"""
+        if len(X) != len(self.Y):
+            raise ValueError(
+                f"X must have {len(self.Y)} values, got {len(X)}"
+            )
+        self._Xnum = X
+
+    def _xnum(self, indexes):
+        """Return numerical X at indexes"""
+        return self._Xnum[indexes]
+
+    def _xsearch(self, values, side='left'):
+        """Return indexes where to insert values in numerical X"""
+        return np.searchsorted(self._Xnum, values, side=side)
+
+    def _chunks(self, loc=None):
+        """Iterate over location by pieces of at most chunk positions"""
+        if loc is None:
+            loc = slice(None)
+        if isinstance(loc, slice):
+            positions = range(*loc.indices(len(self.Y)))
+            for first in range(0, len(positions), self.chunk):
+                sub = positions[first:first + self.chunk]
+                stop = None if sub.stop < 0 else sub.stop
+                yield slice(sub.start, stop, sub.step)
+            return
+        positions = np.asarray(loc)
+        if positions.dtype == bool:
+            positions = np.flatnonzero(positions)
+        positions = positions.reshape(-1)
+        for first in range(0, len(positions), self.chunk):
+            yield positions[first:first + self.chunk]
+
     def add_noise(self, low, high, loc=None):
         """Add uniform noise to Y"""
-        loc = slice(0, len(self.Y)) if loc is None else loc
-        self.Y[loc] += np.random.uniform(
-            low=low,
-            high=high,
-            size=len(self.Y[loc]),
-        )
+        for sub in self._chunks(loc):
+            self.Y[sub] += np.random.uniform(
+                low=low,
+                high=high,
+                size=len(self.Y[sub]),
+            )
 
-    def add_gaussian(self, high, center, stdev):
+    def add_gaussian(self, high, center, stdev, cutoff=6):
         """Add gaussian to Y
 
         center is based on numerical X
+        @see add_gaussians for cutoff
         """
-        if callable(high):
-            high = high()
-        assert stdev > 0
-        self.Y += high * np.exp(-0.5 * (self.Xnum-center)**2 / stdev**2)
+        self.add_gaussians(high, [center], stdev, cutoff=cutoff)
+
+    def add_gaussians(self, highs, centers, stdevs, cutoff=6):
+        """Add gaussians to Y
+
+        Each gaussian is only evaluated within cutoff * stdev of its center,
+        so cost is proportional to the total support of gaussians.
+
+        Args:
+            highs (float|callable|array-like): high of each peak
+                callable is called once per center
+            centers (array-like)        : centers based on numerical X
+            stdevs (float|array-like)   : standard deviations on numerical X
+            cutoff (float)  : number of stdevs on each side of center where
+                gaussian is evaluated (None to evaluate on whole X)
+        """
+        centers = np.asarray(centers, dtype=float).ravel()
+        if callable(highs):
+            highs = [highs() for _ in centers]
+        highs = np.broadcast_to(np.asarray(highs, float), centers.shape)
+        stdevs = np.broadcast_to(np.asarray(stdevs, float), centers.shape)
+        assert (stdevs > 0).all()
+
+        if cutoff is None:
+            lows = np.zeros(len(centers), dtype=np.int64)
+            ends = np.full(len(centers), len(self.Y), dtype=np.int64)
+        else:
+            lows = self._xsearch(centers - cutoff * stdevs, side='left')
+            ends = self._xsearch(centers + cutoff * stdevs, side='right')
+
+        # Evaluate kernels by batches of about chunk values
+        owners, starts, ends = split_ranges(lows, ends, self.chunk)
+        lengths = ends - starts
+        batches = (np.cumsum(lengths) - lengths) // self.chunk
+        bounds = np.flatnonzero(np.diff(batches)) + 1
+        for pieces in np.split(np.arange(len(owners)), bounds):
+            indexes, piece_i = expand_ranges(starts[pieces], ends[pieces])
+            kernel_i = owners[pieces][piece_i]
+            values = highs[kernel_i] * np.exp(
+                -0.5 * (self._xnum(indexes) - centers[kernel_i])**2
+                / stdevs[kernel_i]**2
+            )
+            np.add.at(self.Y, indexes, values)
 
     def set_zero(self, loc=None):
         """Set value to zero"""
-        self.Y[loc] -= self.Y[loc]
+        for sub in self._chunks(loc):
+            self.Y[sub] = 0
 
     def iterpoints(self):
         return zip(self.X, self.Y)
@@ -70,32 +311,67 @@ class CustomCurve:
 
 class CustomTimedCurve(CustomCurve):
 
-    def __init__(self, X):
+    def __init__(self, X, dtype=float, filename=None, chunk=CHUNK_SIZE):
         """Initiate timed curve (X are datetimes, Y set to zeros)
 
         assumes X has regular step and is sorted
+
+        Args:
+            X (datetime-array|RegularTimeline): timeline
+                locations are computed on equivalent RegularTimeline, so
+                datetimes are not walked through when locating periodic
+                descriptions (hour, weekday, ...)
+            dtype, filename, chunk: @see CustomCurve
         """
         self._T = X
+        self._timeline = regular_timeline(X)
         self._step = X[1] - X[0]
-        X = np.array(range(len(X)))
-        super().__init__(X)
+        super().__init__(
+            range(len(X)), dtype=dtype, filename=filename, chunk=chunk
+        )
 
     @property
     def X(self):
         """timeline vector (datetimes)"""
         return self._T
 
+    @property
+    def Xnum(self):
+        """Numerical X vector (index of datetimes)
+
+        A range, not materialized: operations work on indexes (@see _xnum),
+        use np.asarray(curve.Xnum) where an array is needed
+        """
+        return self._Xnum
+
     @property
     def step(self):
         """Step between to steps"""
         return self._step
 
+    def _xnum(self, indexes):
+        """Return numerical X at indexes"""
+        return indexes
+
+    def _xsearch(self, values, side='left'):
+        """Return indexes where to insert values in numerical X"""
+        if side == 'left':
+            indexes = np.ceil(values)
+        else:
+            indexes = np.floor(values) + 1
+        return np.clip(indexes, 0, len(self.Y)).astype(np.int64)
+
+    @property
+    def timeline(self):
+        """Timeline as a RegularTimeline (X if timezone-aware)"""
+        return self._timeline
+
     def add_noise(self, low, high, loc=None):
         """Add uniform noise to Y"""
-        loc = dtloc2pos(loc, self.X)
+        loc = None if loc is None else dtloc2pos(loc, self.timeline)
         return super().add_noise(low, high, loc=loc)
 
-    def add_gaussian(self, high, center, stdev):
+    def add_gaussian(self, high, center, stdev, cutoff=6):
         """Add gaussian to Y
 
         Args:
@@ -105,23 +381,450 @@ class CustomTimedCurve(CustomCurve):
                 float|int   > numerical x to center on
                 dict|DateDescription > description of datetimes to center on
             stdev (timedelta|int|float): standard deviation of gaussian
-                timedelta   > standard deviation on timed X
+                timedelta|np.timedelta64 > standard deviation on timed X
                 float|int   > standard deviation on numerical X
+            cutoff (float): @see CustomCurve.add_gaussians
         """
-        indexes = dtloc2pos(center, self.X)
+        indexes = dtloc2pos(center, self.timeline)
+        if isinstance(indexes, slice):
+            indexes = np.arange(len(self))[indexes]
 
-        if isinstance(stdev, timedelta):
-            stdev = stdev.total_seconds() / self.step.total_seconds()
+        if isinstance(stdev, (timedelta, np.timedelta64)):
+            stdev = to_us(stdev) / to_us(self.step)
         elif not isinstance(stdev, (float, int)):
             raise TypeError(f"Unknown type center {type(center)}")
 
-        for index in indexes:
-            super().add_gaussian(
-                high=high,
-                center=index,
-                stdev=stdev,
-            )
+        self.add_gaussians(high, indexes, stdev, cutoff=cutoff)
+
     def set_zero(self, loc=None):
         """Set value to zero"""
-        loc = dtloc2pos(loc, self.X)
+        loc = None if loc is None else dtloc2pos(loc, self.timeline)
         return super().set_zero(loc=loc)
+
+
+def spawn_seeds(seed, number):
+    """Return number independent seeds for CurveBatch (one per batch)
+
+    Seeds can be sent to worker processes: batch k generated from k-th seed
+    is bit-reproducible whatever the process it is generated in.
+
+    Args:
+        seed (None|int|np.random.SeedSequence): root seed
+        number (int): number of seeds to spawn
+
+    Return:
+        (list[np.random.SeedSequence])
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return seed.spawn(number)
+
+
+def _is_timed(X):
+    """Return whether X is a timeline (of datetimes)"""
+    if isinstance(X, RegularTimeline):
+        return True
+    if isinstance(X, np.ndarray) and np.issubdtype(X.dtype, np.datetime64):
+        return True
+    return len(X) > 0 and isinstance(X[0], (datetime, np.datetime64))
+
+
+class CurveBatch:
+    """Batch of n curves sharing X, backed by one (n x len(X)) array
+
+    Same operations as CustomCurve (CustomTimedCurve when X are datetimes)
+    applied to all curves at once. Random values are drawn from the batch
+    numpy.random.Generator, @see spawn_seeds for parallel generation.
+
+    Example:
+        >> batch = CurveBatch(X, 1000, seed=seed)
+        >> batch.add_noise(0, 1)
+        >> batch.add_gaussian(batch.rng.uniform(5, 10, 1000), {'hour': 9}, 2)
+    """
+
+    def __init__(self, X, n, seed=None):
+        """Initiate a batch of n curves (Y=zeros)
+
+        Args:
+            X (array-like|RegularTimeline): numerical X or timeline
+                timeline is assumed regular and sorted, @see CustomTimedCurve
+            n (int): number of curves
+            seed (None|int|np.random.SeedSequence|np.random.Generator):
+                seed of batch random stream
+        """
+        self._X = X
+        if _is_timed(X):
+            self._timeline = regular_timeline(X)
+            self._Xnum = np.arange(len(X))
+        else:
+            self._timeline = None
+            self._Xnum = np.asarray(X)
+        self.Y = np.zeros((int(n), len(X)))
+        self.rng = np.random.default_rng(seed)
+
+    @property
+    def X(self):
+        """X vector"""
+        return self._X
+
+    @property
+    def Xnum(self):
+        """Numerical X vector"""
+        return self._Xnum
+
+    @property
+    def timeline(self):
+        """Timeline as RegularTimeline (None if numerical, X if tz-aware)"""
+        return self._timeline
+
+    def _pos(self, loc):
+        """Return positions within X of given location"""
+        if loc is None:
+            return slice(None)
+        if self._timeline is None:
+            return loc
+        return dtloc2pos(loc, self._timeline)
+
+    def add_noise(self, low, high, loc=None):
+        """Add uniform noise to Y of each curve"""
+        pos = self._pos(loc)
+        self.Y[:, pos] += self.rng.uniform(
+            low=low,
+            high=high,
+            size=(len(self.Y), positions_number(pos, self.Y.shape[1])),
+        )
+
+    def add_gaussian(self, high, center, stdev, cutoff=6):
+        """Add gaussian(s) to Y of each curve
+
+        Args:
+            high (float|n-array-like): high of peak (for each curve)
+            center (location): center(s) of gaussian
+                numerical X     > numerical x(s) to center on
+                timeline        > @see CustomTimedCurve.add_gaussian
+            stdev (timedelta|int|float): standard deviation of gaussian
+            cutoff (float): @see CustomCurve.add_gaussians
+        """
+        if self._timeline is None:
+            centers = np.asarray(center, dtype=float).ravel()
+        else:
+            centers = self._pos(center)
+            if isinstance(centers, slice):
+                centers = np.arange(len(self._Xnum))[centers]
+            centers = centers.astype(float)
+            if isinstance(stdev, (timedelta, np.timedelta64)):
+                stdev = to_us(stdev) / to_us(self._X[1] - self._X[0])
+        stdevs = np.full(len(centers), stdev, dtype=float)
+        assert (stdevs > 0).all()
+
+        indexes, _, values = gaussian_kernels(
+            self._Xnum, centers, stdevs, cutoff=cutoff
+        )
+        support, inverse = np.unique(indexes, return_inverse=True)
+        kernel = np.bincount(inverse, weights=values, minlength=len(support))
+        highs = np.broadcast_to(np.asarray(high, dtype=float), len(self))
+        self.Y[:, support] += highs[:, None] * kernel[None, :]
+
+    def set_zero(self, loc=None):
+        """Set value to zero for each curve"""
+        self.Y[:, self._pos(loc)] = 0
+
+    def curve(self, index):
+        """Return curve at index as a CustomCurve sharing batch memory"""
+        if self._timeline is None:
+            curve = CustomCurve(self._Xnum)
+        else:
+            curve = CustomTimedCurve(self._X)
+        curve.Y = self.Y[index]
+        return curve
+
+    def __len__(self):
+        return len(self.Y)
+
+
+class CurveStream:
+    """Endless timed curve generated chunk by chunk
+
+    Operations (same as CustomTimedCurve) are recorded and applied to each
+    chunk, state is kept across chunks so patterns are continuous: a
+    gaussian centered near the end of a chunk spreads on the next one.
+
+    Yielded X and Y are buffers reused by the next chunk (copy them to keep
+    them), stream.meter measures the number of points produced per second
+    spent in the stream (time spent by consumer between chunks excluded).
+
+    Example:
+        >> stream = CurveStream(datetime(2020, 1, 1), timedelta(seconds=1))
+        >> stream.add_noise(0, 1)
+        >> stream.add_gaussian(8, {'hour': 12}, timedelta(hours=1))
+        >> for X, Y in stream:
+        ..     consume(X, Y)
+    """
+
+    def __init__(self, start, step, chunk=10**5, seed=None):
+        """Initiate stream
+
+        Args:
+            start (datetime|np.datetime64)  : first datetime of stream
+            step (timedelta|np.timedelta64) : step b/w datetimes
+            chunk (int)                     : number of points per chunk
+            seed (None|int|np.random.SeedSequence|np.random.Generator):
+                seed of stream random values
+        """
+        if not isinstance(start, (datetime, np.datetime64)):
+            raise TypeError(f"start must be a datetime, got {type(start)}")
+        chunk = int(chunk)
+        if chunk < 1:
+            raise ValueError("Chunk size must >= 1, got %s" % chunk)
+        self._start_us = to_us(start)
+        self._step_us = to_us(step)
+        if self._step_us <= 0:
+            raise ValueError("step must be positive")
+        self._chunk = chunk
+        self._position = 0
+        self._ops = []
+        self.rng = np.random.default_rng(seed)
+        self.meter = RateMeter()
+
+        # Buffers
+        self._Xnum = np.arange(chunk)
+        self._Xoffsets = self._Xnum * self._step_us
+        self._X = np.empty(chunk, dtype='M8[us]')
+        self._Y = np.empty(chunk)
+        self._noise = np.empty(chunk)
+
+    @property
+    def chunk(self):
+        """Number of points per chunk"""
+        return self._chunk
+
+    @property
+    def position(self):
+        """Index of first point of next chunk"""
+        return self._position
+
+    @property
+    def step(self):
+        """Step b/w datetimes"""
+        return self._step_us * US
+
+    def timeline(self, first, size):
+        """Return RegularTimeline of size points from index first"""
+        return RegularTimeline(
+            (self._start_us + first * self._step_us) * US + EPOCH,
+            self.step,
+            size,
+        )
+
+    def add_noise(self, low, high, loc=None):
+        """Add uniform noise to Y, @see CustomTimedCurve.add_noise"""
+        self._ops.append((self._apply_noise, (low, high, loc)))
+
+    def add_gaussian(self, high, center, stdev, cutoff=6):
+        """Add gaussian to Y, @see CustomTimedCurve.add_gaussian
+
+        high can be a callable, called once per center
+        cutoff can't be None as gaussians must have a finite support
+        """
+        if cutoff is None:
+            raise ValueError("cutoff must be finite for streams")
+        if isinstance(stdev, (timedelta, np.timedelta64)):
+            stdev = to_us(stdev) / self._step_us
+        elif not isinstance(stdev, (float, int)):
+            raise TypeError(f"Unknown type stdev {type(stdev)}")
+        assert stdev > 0
+        highs = {}  # high of each center by index (for callable high)
+        self._ops.append(
+            (self._apply_gaussian, (high, center, stdev, cutoff, highs))
+        )
+
+    def set_zero(self, loc=None):
+        """Set value to zero, @see CustomTimedCurve.set_zero"""
+        self._ops.append((self._apply_zero, (loc,)))
+
+    def _pos(self, loc, timeline):
+        """Return positions of loc within timeline"""
+        if loc is None:
+            return slice(None)
+        return dtloc2pos(loc, timeline)
+
+    def _apply_noise(self, timeline, low, high, loc):
+        pos = self._pos(loc, timeline)
+        noise = self._noise[:positions_number(pos, self._chunk)]
+        self.rng.random(out=noise)
+        noise *= (high - low)
+        noise += low
+        self._Y[pos] += noise
+
+    def _apply_gaussian(self, timeline, high, center, stdev, cutoff, highs):
+        margin = int(np.ceil(cutoff * stdev))
+        first = max(self._position - margin, 0)
+        size = self._position + self._chunk + margin - first
+        centers = self._pos(center, self.timeline(first, size))
+        if isinstance(centers, slice):
+            centers = np.arange(size)[centers]
+        centers = centers + first
+
+        if callable(high):
+            for index in centers:
+                if index not in highs:
+                    highs[index] = high()
+            for index in [index for index in highs if index < first]:
+                del highs[index]
+            heights = np.array([highs[index] for index in centers])
+        else:
+            heights = np.full(len(centers), high, dtype=float)
+
+        indexes, lengths, values = gaussian_kernels(
+            self._Xnum,
+            (centers - self._position).astype(float),
+            np.full(len(centers), stdev, dtype=float),
+            cutoff=cutoff,
+        )
+        np.add.at(self._Y, indexes, np.repeat(heights, lengths) * values)
+
+    def _apply_zero(self, timeline, loc):
+        self._Y[self._pos(loc, timeline)] = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        """Return (X, Y) of next chunk"""
+        self.meter.start()
+        np.add(
+            self._Xoffsets,
+            self._start_us + self._position * self._step_us,
+            out=self._X.view(np.int64),
+        )
+        self._Y.fill(0)
+        timeline = self.timeline(self._position, self._chunk)
+        for func, args in self._ops:
+            func(timeline, *args)
+        self._position += self._chunk
+        self.meter.add(self._chunk)
+        self.meter.stop()
+        return self._X, self._Y
+
+
+# --------------------------------------------------------------------------- #
+# Anomalies
+#   Each injection modifies curve in place and returns ground-truth labels
+
+
+def _spaced_indexes(rng, low, high, number, spacing=1):
+    """Return sorted random indexes in [low, high) distant of >= spacing"""
+    span = high - low - (number - 1) * (spacing - 1)
+    if number < 0 or span < number:
+        raise ValueError(
+            f"Can't pick {number} indexes spaced of {spacing}"
+            f" within [{low}, {high})"
+        )
+    indexes = np.sort(rng.choice(span, size=number, replace=False))
+    return low + indexes + np.arange(number) * (spacing - 1)
+
+
+def _labels(size, indexes):
+    """Return bool array of given size, True on indexes"""
+    labels = np.zeros(size, dtype=bool)
+    labels[indexes] = True
+    return labels
+
+
+def inject_leaps(curve, number, delta, spacing=2, rng=None):
+    """Inject leaps, as detected by detection.detect_leap
+
+    Y is shifted by delta from each leap index on, so that
+    Y[i] - Y[i-1] gains delta on leap indexes.
+
+    Args:
+        curve (CustomCurve)
+        number (int)    : number of leaps
+        delta (float)   : height of leaps (negative for drops)
+        spacing (int)   : min number of indexes b/w 2 leaps
+        rng (None|int|np.random.Generator): random generator or seed
+
+    Return:
+        (bool-np.ndarray) labels, True on leap indexes
+    """
+    rng = np.random.default_rng(rng)
+    indexes = _spaced_indexes(rng, 1, len(curve), number, spacing)
+    steps = np.zeros(len(curve))
+    steps[indexes] = delta
+    curve.Y += np.cumsum(steps)
+    return _labels(len(curve), indexes)
+
+
+def inject_isolated(curve, number, delta, spacing=3, rng=None):
+    """Inject isolated points, as detected by detection.detect_iso
+
+    delta is added to Y on isolated indexes, it must be high compared with
+    the level of Y so that the point is out of its neighbors range.
+
+    Args:
+        curve (CustomCurve)
+        number (int)    : number of isolated points
+        delta (float)   : value added on isolated points
+        spacing (int)   : min number of indexes b/w 2 isolated points
+            (below 3, a point b/w 2 isolated points is isolated as well)
+        rng (None|int|np.random.Generator): random generator or seed
+
+    Return:
+        (bool-np.ndarray) labels, True on isolated indexes
+    """
+    rng = np.random.default_rng(rng)
+    indexes = _spaced_indexes(rng, 0, len(curve), number, spacing)
+    curve.Y[indexes] += delta
+    return _labels(len(curve), indexes)
+
+
+def inject_elbow(curve, slope, index=None, margin=0.1, rng=None):
+    """Inject an elbow, as detected by detection.detect_elbow
+
+    Y gains slope * (x - x_elbow) after elbow index.
+
+    Args:
+        curve (CustomCurve)
+        slope (float)   : slope change at elbow (on numerical X)
+        index (int)     : index of elbow, random if None
+        margin (float)  : ratio of curve on each border without elbow
+            when index is random
+        rng (None|int|np.random.Generator): random generator or seed
+
+    Return:
+        (bool-np.ndarray) labels, True on elbow index
+    """
+    if index is None:
+        rng = np.random.default_rng(rng)
+        border = int(margin * len(curve))
+        index = rng.integers(border, len(curve) - border)
+    Xnum = np.asarray(curve.Xnum, dtype=float)
+    curve.Y += slope * np.maximum(Xnum - Xnum[index], 0)
+    return _labels(len(curve), [index])
+
+
+def inject_step_irregularities(curve, number, gap, spacing=2, rng=None):
+    """Inject step irregularities, as detected by detection.stepreg_bounds
+
+    X is shifted by gap from each irregularity index on, so that
+    X[i] - X[i-1] gains gap on irregularity indexes (gap < 0 for squeezes).
+
+    Args:
+        curve (CustomCurve): curve with numerical X (modified in place)
+        number (int)    : number of irregularities
+        gap (float)     : step added on irregularity indexes
+        spacing (int)   : min number of indexes b/w 2 irregularities
+        rng (None|int|np.random.Generator): random generator or seed
+
+    Return:
+        (bool-np.ndarray) labels, True on indexes i where step from i-1
+            is irregular
+    """
+    if isinstance(curve, CustomTimedCurve):
+        raise TypeError("Can't inject step irregularities in timed curves")
+    rng = np.random.default_rng(rng)
+    indexes = _spaced_indexes(rng, 1, len(curve), number, spacing)
+    shifts = np.zeros(len(curve))
+    shifts[indexes] = gap
+    curve.Xnum = curve.Xnum + np.cumsum(shifts)
+    return _labels(len(curve), indexes)
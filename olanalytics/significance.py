@@ -1,4 +1,8 @@
 import numpy as np
+import pandas as pd
+from collections import OrderedDict
+
+from olanalytics.sketches import MisraGries
 
 
 def best_values(series, nb=None, min_count=None):
@@ -10,7 +14,69 @@ def best_values(series, nb=None, min_count=None):
     return list(occurrences.index[:nb])
 
 
-def required_values(series, target_ratio):
+class BestValuesStream:
+    """Most frequent values of an unbounded stream, in fixed memory
+
+    Batches of values are summarized in a MisraGries sketch of k counters:
+    a value occurring more than n / (k + 1) times (n number of values) is
+    always tracked, and its count is under-estimated by at most error
+    (<= n / (k + 1)). Streams consumed by several workers can be merged.
+
+    Example:
+        ```
+        stream = BestValuesStream(counters=1024)
+        for batch in batches:
+            stream.update(batch)
+        stream.best_values(10)
+        ```
+
+    Args:
+        counters (int): number of counters (memory is O(counters))
+    """
+
+    def __init__(self, counters=1024):
+        self.sketch = MisraGries(k=counters)
+
+    @property
+    def n(self):
+        """Number of values consumed (nulls aside)"""
+        return self.sketch.n
+
+    @property
+    def error(self):
+        """Max under-estimation of counts"""
+        return self.sketch.error
+
+    def update(self, batch):
+        """Consume batch of values (array-like, pandas.Series), nulls aside"""
+        self.sketch.update(batch)
+        return self
+
+    def merge(self, other):
+        """Merge stream consumed by other (for instance by another worker)"""
+        self.sketch.merge(other.sketch)
+        return self
+
+    def best_values(self, nb=None, min_count=None):
+        """Return values ordered by most to less estimated occurrences
+
+        @see best_values, min_count applies on estimated counts
+        """
+        values, counts = self.sketch.top(nb)
+        if min_count:
+            values = values[counts > min_count]
+        return list(values)
+
+    def bounds(self, nb=None):
+        """Return [(value, min count, max count)] of nb best values"""
+        values, counts = self.sketch.top(nb)
+        return [
+            (value, int(count), int(count) + self.error)
+            for value, count in zip(values, counts)
+        ]
+
+
+def required_values(series, target_ratio, verbose=True):
     """Return unique values required to cover ratio of usage in series
 
     Args:
@@ -18,55 +84,292 @@ def required_values(series, target_ratio):
         target_ratio (float): ratio of total usage to reach
             nans are not counted as 'usage'
             for instance in [1, numpy.nan, 2], 1 represents 50% of usage
+        verbose (bool): print number of required values
     """
-    item_occurrences = series.value_counts()
-    total_occurrences = sum(item_occurrences)
-    target = target_ratio * total_occurrences
-    items, usage = [], 0
-    for item, occurrences in item_occurrences.iteritems():
-        usage += occurrences
-        items.append(item)
-        if usage > target:
-            break
-    prc = 100 * len(items) / len(item_occurrences)
-    t_prc = 100 * (usage / total_occurrences)
-    print(
-        f". {len(items)} / {len(item_occurrences)} ({prc:0.2f}%)"
-        f" items required to reach {t_prc:0.2f}% of usage"
-    )
+    curve = CoverageCurve.from_series(series)
+    items = list(curve.items_for(target_ratio))
+    if verbose:
+        curve.display(len(items), "items", "of usage")
     return items
 
 
-def required_weights(weights, target_ratio, as_ratio=False):
+def grouped_occurrences(data, key, column):
+    """Return occurrences of values of column in each group of key
+
+    Counts of all groups are computed at once, values are ranked in each
+    group by decreasing count (first seen first on ties, as value_counts).
+    Null values are not counted as usage, rows with null key are ignored.
+
+    Args:
+        data (pandas.DataFrame)
+        key (str): column defining groups
+        column (str): column of values
+
+    Return:
+        (pandas.DataFrame) one row per group and value, sorted by group
+            (first seen first) and rank, with columns:
+            key, column, 'count', 'rank' (from 0), 'cumul' (usage of group
+            up to value), 'total' (usage of group)
+    """
+    occurrences = data.groupby([key, column], sort=False).size()
+    groups = occurrences.index.get_level_values(0)
+    values = occurrences.index.get_level_values(1)
+    codes, _ = pd.factorize(groups)
+    counts = occurrences.to_numpy()
+    order = np.lexsort((-counts, codes))  # stable
+    codes, counts = codes[order], counts[order]
+
+    # Cumulated operations within groups of consecutive codes
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    sizes = np.diff(np.r_[starts, len(codes)])
+    cumul = np.cumsum(counts)
+    group_cumul = cumul - np.repeat(cumul[starts] - counts[starts], sizes)
+    ends = np.r_[starts[1:], len(codes)] - 1
+    totals = group_cumul[ends] if len(codes) else counts
+    return pd.DataFrame({
+        key: groups[order],
+        column: values[order],
+        'count': counts,
+        'rank': np.arange(len(codes)) - np.repeat(starts, sizes),
+        'cumul': group_cumul,
+        'total': np.repeat(totals, sizes),
+    })
+
+
+def grouped_best_values(data, key, column, nb=None, min_count=None,
+                        as_dict=False):
+    """Return best values (@see best_values) of column in each group of key
+
+    Args:
+        data, key, column: @see grouped_occurrences
+        nb (int): max number of values per group
+        min_count (int): min count (excluded) of values
+        as_dict (bool): get result as {group: list of values}
+
+    Return:
+        (pandas.DataFrame) rows of grouped_occurrences of best values
+    """
+    occurrences = grouped_occurrences(data, key, column)
+    kept = np.ones(len(occurrences), dtype=bool)
+    if min_count:
+        kept &= occurrences['count'].to_numpy() > min_count
+    if nb is not None:
+        kept &= occurrences['rank'].to_numpy() < nb
+    return _grouped_result(occurrences[kept], key, column, as_dict)
+
+
+def grouped_required_values(data, key, column, target_ratio, as_dict=False):
+    """Return values required to cover ratio of usage in each group of key
+
+    @see required_values, a value is required while usage of values ranked
+    before does not exceed target_ratio.
+
+    Args:
+        data, key, column: @see grouped_occurrences
+        target_ratio (float): ratio of group usage to reach
+        as_dict (bool): get result as {group: list of values}
+
+    Return:
+        (pandas.DataFrame) rows of grouped_occurrences of required values
+    """
+    occurrences = grouped_occurrences(data, key, column)
+    usage_before = occurrences['cumul'] - occurrences['count']
+    kept = (usage_before <= target_ratio * occurrences['total']).to_numpy()
+    return _grouped_result(occurrences[kept], key, column, as_dict)
+
+
+def _grouped_result(occurrences, key, column, as_dict):
+    """Return grouped occurrences, as {group: values} if as_dict"""
+    occurrences = occurrences.reset_index(drop=True)
+    if not as_dict:
+        return occurrences
+    return OrderedDict(
+        (group, list(values))
+        for group, values in occurrences.groupby(key, sort=False)[column]
+    )
+
+
+def required_weights(weights, target_ratio, as_ratio=False, verbose=True):
     """Return weights required to reach target_ratio"""
     res = weights[required_weights_i(weights, target_ratio, as_ratio=as_ratio)]
-    prc = 100 * len(res) / len(weights)
-    if as_ratio:
-        t_prc = 100 * sum(res)
-    else:
-        t_prc = 100 * (sum(res) /sum(weights))
-    print(
-        f". {len(res)} / {len(weights)} ({prc:0.2f}%)"
-        f" {'ratio' if as_ratio else 'weight'}s required to reach {t_prc:0.2f}%"
-        + ("" if as_ratio else " of total weight")
-    )
+    if verbose:
+        prc = 100 * len(res) / len(weights)
+        if as_ratio:
+            t_prc = 100 * res.sum()
+        else:
+            t_prc = 100 * (res.sum() / weights.sum())
+        print(
+            f". {len(res)} / {len(weights)} ({prc:0.2f}%)"
+            f" {'ratio' if as_ratio else 'weight'}s required to reach"
+            f" {t_prc:0.2f}%" + ("" if as_ratio else " of total weight")
+        )
     return res
 
 
-def required_weights_i(weights, target_ratio, as_ratio=False):
-    """Return indexes of weights required to reach target_ratio"""
+class CoverageCurve:
+    """Cumulated usage of items sorted by decreasing usage
+
+    Built once with a single sort, then answers any number of coverage
+    queries by binary search:
+        ```
+        curve = CoverageCurve.from_series(series)
+        curve.items_for(0.9)                  # values covering 90% of usage
+        curve.counts_for([0.5, 0.8, 0.9])     # number of values for each
+        curve.ratio_for(10)                   # usage of the 10 top values
+        ```
+
+    Args:
+        items (np.ndarray): items sorted by decreasing usage
+        cumul (np.ndarray): cumulated usage of sorted items
+        total (number): total usage
+        strict (bool): a target is reached once usage is strictly above it
+            (@see required_values), else once usage is equal or above
+            (@see required_weights_i)
+    """
+
+    def __init__(self, items, cumul, total, strict=False):
+        self.items = items
+        self.cumul = cumul
+        self.total = total
+        self.strict = strict
+        # Usage of k top items at index k, computed once for ratio_for
+        cumul = np.asarray(cumul)
+        self._usages = np.concatenate([np.zeros(1, dtype=cumul.dtype), cumul])
+
+    @classmethod
+    def from_series(cls, series):
+        """Build curve of unique values of series (nans are not usage)"""
+        occurrences = series.value_counts()
+        counts = occurrences.to_numpy()
+        return cls(
+            occurrences.index.to_numpy(), np.cumsum(counts), counts.sum(),
+            strict=True,
+        )
+
+    @classmethod
+    def from_weights(cls, weights, as_ratio=False):
+        """Build curve of indexes of weights (lowest index first on ties)"""
+        weights = np.asarray(weights)
+        assert (weights >= 0).all()
+        ratios = weights if as_ratio else weights / weights.sum()
+        order = _argsort_desc(ratios, np.arange(len(ratios)))
+        return cls(order, np.cumsum(ratios[order]), 1)
+
+    def __len__(self):
+        return len(self.items)
+
+    def counts_for(self, ratios):
+        """Return number of items required to reach each ratio of usage"""
+        targets = np.asarray(ratios, dtype=float) * self.total
+        side = 'right' if self.strict else 'left'
+        counts = np.searchsorted(self.cumul, targets, side=side) + 1
+        counts = np.minimum(counts, len(self))
+        if not self.strict:  # nothing required to reach a null target
+            counts = np.where(targets <= 0, 0, counts)
+        return counts
+
+    def count_for(self, ratio):
+        """Return number of items required to reach ratio of usage"""
+        return int(self.counts_for(ratio))
+
+    def items_for(self, ratio):
+        """Return items required to reach ratio of usage"""
+        return self.items[:self.count_for(ratio)]
+
+    def ratio_for(self, k):
+        """Return ratio of usage of k (int or int-array) top items"""
+        k = np.minimum(k, len(self))
+        cumul = self._usages[k]
+        return cumul / self.total if self.total else np.zeros_like(cumul)
+
+    def report(self, ratios, verbose=False):
+        """Return number of items required for each ratio of usage
+
+        Return:
+            (list[OrderedDict]) one row for each ratio:
+                {
+                    'target_ratio': (float),
+                    'items_nb': (int),
+                    'items_ratio': (float),
+                    'reached_ratio': (float),
+                }
+        """
+        counts = self.counts_for(ratios)
+        reached = self.ratio_for(counts)
+        rows = []
+        for ratio, count, reached_ratio in zip(ratios, counts, reached):
+            rows.append(OrderedDict([
+                ('target_ratio', ratio),
+                ('items_nb', int(count)),
+                ('items_ratio', count / len(self) if len(self) else 0),
+                ('reached_ratio', float(reached_ratio)),
+            ]))
+            if verbose:
+                self.display(int(count), "items", "of usage")
+        return rows
+
+    def display(self, count, name, suffix=""):
+        """Print number of items required to reach their ratio of usage"""
+        prc = 100 * count / len(self) if len(self) else 0
+        t_prc = 100 * self.ratio_for(count)
+        print(
+            f". {count} / {len(self)} ({prc:0.2f}%)"
+            f" {name} required to reach {t_prc:0.2f}% {suffix}".rstrip()
+        )
+
+
+def required_weights_i(weights, target_ratio, as_ratio=False, block=2**16):
+    """Return indexes of weights required to reach target_ratio
+
+    Indexes are taken by decreasing weight (lowest index first among equal
+    weights) until their cumulated ratio reaches target_ratio.
+
+    Top weights are selected by partition on blocks growing from given
+    size, so that cost is O(n) when few weights are required and
+    O(n log n) at worst (full sort).
+
+    Args:
+        weights (np.ndarray): positive weights
+        target_ratio (float): ratio of total weight to reach
+        as_ratio (bool): weights are ratios of total weight
+        block (int): size of first block of top weights
+    """
+    weights = np.asarray(weights)
     assert (weights >= 0).all()
-    if as_ratio:
-        ratios = weights
-    else:
-        ratios = weights / sum(weights)
-    sindexes = np.argsort(-ratios)
-    rindexes = []
-    total_r = 0
-    for i in sindexes:
-        if total_r >= target_ratio:
-            break
-        total_r += ratios[i]
-        rindexes.append(i)
-
-    return np.array(rindexes)
+    ratios = weights if as_ratio else weights / weights.sum()
+    n = len(ratios)
+    if target_ratio <= 0 or n == 0:
+        return np.array([], dtype=np.intp)
+
+    size = block
+    while True:
+        if 2 * size >= n:
+            order = _argsort_desc(ratios, np.arange(n))
+        else:
+            # Weights above n-size th one are the first in sorted order
+            threshold = np.partition(ratios, n - size)[n - size]
+            order = _argsort_desc(ratios, np.flatnonzero(ratios >= threshold))
+        cumul = np.cumsum(ratios[order])
+        if cumul[-1] >= target_ratio or len(order) == n:
+            nb = np.searchsorted(cumul, target_ratio, side='left') + 1
+            return order[:nb]
+        size *= 8
+
+
+def _argsort_desc(values, indexes):
+    """Return indexes sorted by decreasing values, lowest index first on ties
+
+    Equivalent to a stable sort on sorted indexes, but when few values are
+    equal only them are sorted again after a quicksort.
+    """
+    order = indexes[np.argsort(-values[indexes])]
+    sorted_values = values[order]
+    equal = sorted_values[1:] == sorted_values[:-1]
+    if np.count_nonzero(equal) > len(order) // 8:
+        return indexes[np.argsort(-values[indexes], kind='stable')]
+    if equal.any():
+        tied = np.flatnonzero(np.r_[False, equal] | np.r_[equal, False])
+        tied_values = sorted_values[tied]
+        groups = np.cumsum(np.r_[True, tied_values[1:] != tied_values[:-1]])
+        order[tied] = order[tied][np.lexsort((order[tied], groups))]
+    return order
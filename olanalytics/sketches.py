@@ -0,0 +1,215 @@
+"""Mergeable approximate summaries of value streams in fixed memory
+
+Example:
+    ```
+    from olanalytics.sketches import HyperLogLog, MisraGries
+
+    hll, mg = HyperLogLog(p=12), MisraGries(k=256)
+    for chunk in chunks:
+        hll.update(chunk)
+        mg.update(chunk)
+    hll.count()     # number of distinct values, std error 1.04 / 2**(p/2)
+    mg.top(10)      # most frequent values, counts under by at most mg.error
+    ```
+"""
+import numpy as np
+import pandas as pd
+
+BLOCK_SIZE = 2**16  # values counted at once when updating MisraGries
+
+
+def hash_values(values):
+    """Return 64 bits hashes of values as uint64-np.ndarray
+
+    Integers are hashed as 64 bits integers, integral floats as the same
+    integer (so that 2 and 2.0 have same hash), other floats as float64.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind == 'i':
+        return pd.util.hash_array(values.astype(np.int64, copy=False))
+    if values.dtype.kind == 'u':
+        return pd.util.hash_array(values.astype(np.uint64, copy=False))
+    if values.dtype.kind == 'f':
+        values = values.astype(np.float64, copy=False)
+        hashes = pd.util.hash_array(values)
+        # Floats are exact integers below 2**63 (nan and inf aside)
+        integral = (values == np.floor(values)) & (np.abs(values) < 2.0**63)
+        if integral.any():
+            hashes[integral] = pd.util.hash_array(
+                values[integral].astype(np.int64)
+            )
+        return hashes
+    return pd.util.hash_array(values)
+
+
+def bit_length(values):
+    """Return bit length of each uint64 value as int-np.ndarray"""
+    values = np.asarray(values, dtype=np.uint64)
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # 32 bits integers are exact in float64, so frexp exponent is exact
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+class HyperLogLog:
+    """Distinct count estimator on 2**p registers of 1 byte
+
+    Relative standard error of count is about 1.04 / 2**(p/2)
+    (1.6% with p=12, for 4KB of memory), whatever the number of values.
+
+    Args:
+        p (int): precision, number of bits of hash indexing registers (4-18)
+    """
+
+    def __init__(self, p=12):
+        if not 4 <= p <= 18:
+            raise ValueError(f"precision p must be in [4, 18], got {p}")
+        self.p = p
+        self.registers = np.zeros(2**p, dtype=np.uint8)
+
+    @property
+    def m(self):
+        """Number of registers"""
+        return len(self.registers)
+
+    def update(self, values):
+        """Add values (array-like) to estimator, null values are ignored"""
+        values = np.asarray(values)
+        hashes = hash_values(values[~pd.isna(values)])
+        if len(hashes) == 0:
+            return self
+        width = 64 - self.p
+        indexes = (hashes >> np.uint64(width)).astype(np.intp)
+        rests = hashes & np.uint64(2**width - 1)
+        # Position of first 1 bit in the width bits after index
+        ranks = (width - bit_length(rests) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, indexes, ranks)
+        return self
+
+    def merge(self, other):
+        """Merge other estimator (of same precision) in self"""
+        if other.p != self.p:
+            raise ValueError(
+                f"can't merge HyperLogLog of precision {other.p} in {self.p}"
+            )
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        """Return estimated number of distinct values (int)"""
+        m = self.m
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(
+            m, 0.7213 / (1 + 1.079 / m)
+        )
+        estimate = alpha * m**2 / np.sum(2.0 ** -self.registers.astype(float))
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)  # linear counting
+        return int(round(estimate))
+
+    def __len__(self):
+        return self.count()
+
+
+class MisraGries:
+    """Heavy hitters summary keeping at most k counters
+
+    Each counter under-estimates the count of its value by at most
+    error <= (n - sum of counters) / (k + 1), values with no counter have
+    a count <= error. Any value occurring more than n / (k + 1) times has
+    a counter. As long as error is 0, counters are exact and complete.
+    Null values are ignored.
+
+    Args:
+        k (int): max number of counters
+    """
+
+    def __init__(self, k=256):
+        if k < 1:
+            raise ValueError(f"number of counters k must be >= 1, got {k}")
+        self.k = k
+        self.n = 0
+        self.error = 0
+        self.values = np.array([], dtype=object)
+        self.counts = np.array([], dtype=np.int64)
+
+    def update(self, values):
+        """Add values (array-like) to summary, by blocks of BLOCK_SIZE
+
+        Blocks of numbers are counted on their typed array, other values as
+        objects
+        """
+        values = np.asarray(values)
+        typed = values.dtype.kind in 'biuf'
+        if not typed:
+            values = pd.Series(values.astype(object, copy=False))
+        for start in range(0, len(values), BLOCK_SIZE):
+            if typed:
+                self.update_counts(
+                    *_typed_counts(values[start:start + BLOCK_SIZE])
+                )
+            else:
+                counts = values.iloc[start:start + BLOCK_SIZE].value_counts(
+                    sort=False
+                )
+                self.update_counts(
+                    counts.index.to_numpy(), counts.to_numpy()
+                )
+        return self
+
+    def update_counts(self, values, counts):
+        """Add values with given counts (unique values) to summary"""
+        counts = np.asarray(counts, dtype=np.int64)
+        self.n += int(counts.sum())
+        self._add(values, counts)
+        return self
+
+    def merge(self, other):
+        """Merge other summary in self (error bound stays valid)"""
+        self.n += other.n
+        self.error += other.error
+        self._add(other.values, other.counts)
+        return self
+
+    def _add(self, values, counts):
+        """Add counts to counters then keep at most k of them"""
+        values = np.asarray(values, dtype=object)
+        index = pd.Index(np.concatenate([self.values, values]), dtype=object)
+        occurrences = pd.Series(
+            np.concatenate([self.counts, counts]), index=index
+        ).groupby(level=0, sort=False).sum()
+        self.values = occurrences.index.to_numpy()
+        self.counts = occurrences.to_numpy().astype(np.int64)
+        self._reduce()
+
+    def _reduce(self):
+        """Keep at most k counters by decreasing all of (k+1)-th count"""
+        if len(self.counts) <= self.k:
+            return
+        cut = np.partition(self.counts, -(self.k + 1))[-(self.k + 1)]
+        self.counts = self.counts - cut
+        kept = self.counts > 0
+        self.values, self.counts = self.values[kept], self.counts[kept]
+        self.error += int(cut)
+
+    def top(self, n=None):
+        """Return (values, counts) of the n most frequent values
+
+        Values with same count are ordered by first appearance
+        """
+        order = np.argsort(-self.counts, kind='stable')[:n]
+        return self.values[order], self.counts[order]
+
+    def __len__(self):
+        return len(self.counts)
+
+
+def _typed_counts(values):
+    """Return (unique values, counts) of numbers by order of appearance"""
+    if values.dtype.kind == 'f':
+        values = values[~np.isnan(values)]
+    uniques, first, counts = np.unique(
+        values, return_index=True, return_counts=True
+    )
+    order = np.argsort(first)
+    return uniques[order], counts[order]
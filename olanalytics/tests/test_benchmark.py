@@ -0,0 +1,36 @@
+import numpy as np
+
+from olanalytics import benchmark
+
+
+def test_match_labels():
+    assert benchmark.match_labels([1, 5, 9], [1, 6]) == (1 / 3, 1 / 2)
+    assert benchmark.match_labels([1, 5, 9], [1, 6], tolerance=1) == (
+        2 / 3, 1
+    )
+    precision, recall = benchmark.match_labels([], [3])
+    assert np.isnan(precision) and recall == 0
+    precision, recall = benchmark.match_labels([3], [])
+    assert precision == 0 and np.isnan(recall)
+
+
+def test_step_bounds():
+    labels = np.zeros(10, dtype=bool)
+    labels[[1, 4, 9]] = True
+    assert benchmark.step_bounds(labels) == [1, 3, 4, 8]
+
+
+def test_benchmark_detection():
+    rows = benchmark.benchmark_detection(
+        sizes=[500, 3000], repeat=2, seed=0,
+    )
+    assert [(row['detector'], row['size']) for row in rows] == [
+        (name, size)
+        for name in benchmark.DETECTORS
+        for size in [500, 3000]
+    ]
+    for row in rows:
+        assert row['points_per_s'] > 0
+        assert row['peak_memory'] > 0
+        assert row['precision'] >= 0.9
+        assert row['recall'] >= 0.9
@@ -0,0 +1,107 @@
+import numpy as np
+import os
+import pandas as pd
+
+from olanalytics import cache as cachemod, colstats
+from olanalytics.detection import detect_elbow
+from olanalytics.smoothing import savgol_smooth
+
+
+def test_content_hash():
+    array = np.arange(10)
+    assert cachemod.content_hash(array) == cachemod.content_hash(array.copy())
+    assert cachemod.content_hash(array[::2]) == cachemod.content_hash(
+        array[::2].copy()
+    )
+    assert cachemod.content_hash(array) != cachemod.content_hash(
+        array.astype(float)
+    )
+    assert cachemod.content_hash(array) != cachemod.content_hash(
+        array.reshape(2, 5)
+    )
+    objects = pd.Series([1, 'a', None])
+    assert cachemod.content_hash(objects) == cachemod.content_hash(
+        objects.copy()
+    )
+    assert cachemod.content_hash({'a': 1, 'b': [2]}) == cachemod.content_hash(
+        {'b': [2], 'a': 1}
+    )
+    assert cachemod.content_hash(1, 2) != cachemod.content_hash((1, 2))
+    # Object values of different types with same string
+    assert cachemod.content_hash(pd.Series([1, 2], dtype=object)) != (
+        cachemod.content_hash(pd.Series(['1', '2'], dtype=object))
+    )
+    assert cachemod.content_hash(np.array([1, 'a'], dtype=object)) != (
+        cachemod.content_hash(np.array(['1', 'a'], dtype=object))
+    )
+
+
+def test_DiskCache(tmp_path):
+    cache = cachemod.DiskCache(tmp_path / "cache", max_size=10**6)
+    assert cache.get('a') is None
+    cache.set('a', np.arange(10))
+    assert 'a' in cache
+    assert list(cache.get('a')) == list(range(10))
+    assert (cache.hits, cache.misses) == (1, 1)
+    size = cache.stats()['size']
+    assert str(cache) == f"1 hits, 1 misses (50.0%), 1 values in {size} bytes"
+    cache.set('a', np.arange(10))  # overwritten value is not counted twice
+    assert cache.stats()['size'] == size
+
+    # LRU eviction: 'b' is the least recently used
+    cache = cachemod.DiskCache(tmp_path / "lru", max_size=3 * 8500)
+    for i, key in enumerate(['b', 'c', 'd']):
+        cache.set(key, np.zeros(1000))
+        # Distinct modification times, whatever the filesystem resolution
+        os.utime(cache.path(key), (i, i))
+    cache.get('b')
+    cache.set('e', np.zeros(1000))
+    assert 'b' in cache and 'c' not in cache and 'e' in cache
+    assert cache.stats()['size'] <= cache.max_size
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_cached(tmp_path):
+    cache = cachemod.DiskCache(tmp_path)
+    X = np.arange(100, dtype=float)
+    Y = np.sin(X / 10)
+
+    smooth = cachemod.cached(cache)(savgol_smooth)
+    assert np.array_equal(smooth(X, Y, 11), savgol_smooth(X, Y, 11))
+    assert np.array_equal(smooth(X, Y, 11), savgol_smooth(X, Y, 11))
+    smooth(X, Y, 11, polyorder=2)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    elbow = cachemod.cached(cache)(detect_elbow)
+    Y = np.concatenate([np.zeros(50), np.arange(50)])
+    assert elbow(Y) == detect_elbow(Y) == elbow(Y.copy())
+    assert (cache.hits, cache.misses) == (2, 3)
+
+
+def test_cached_colstats(tmp_path):
+    cache = cachemod.DiskCache(tmp_path)
+    data = pd.DataFrame({'a': [1, 2, 2], 'b': ['x', 'y', None]})
+    expected = colstats.compute_colstats(data)
+    assert colstats.compute_colstats(data, cache=cache) == expected
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert colstats.compute_colstats(data, cache=cache) == expected
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    # Only changed column is computed
+    data['b'] = ['x', 'x', 'x']
+    assert colstats.compute_colstats(data, cache=cache) == (
+        colstats.compute_colstats(data)
+    )
+    assert (cache.hits, cache.misses) == (3, 3)
+
+    # Same strings of values, different types
+    data = pd.DataFrame({
+        'a': pd.Series([1, 1, 2], dtype=object),
+        'b': pd.Series(['1', '1', '2'], dtype=object),
+    })
+    colstats.compute_colstats(data[['a']], cache=cache)
+    stats_by_col = colstats.compute_colstats(data[['b']], cache=cache)
+    assert stats_by_col['b']['max_value'] == '2'
+    assert cache.hits == 3
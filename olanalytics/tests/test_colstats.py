@@ -0,0 +1,463 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+try:
+    import pyarrow as pa
+except ModuleNotFoundError:
+    pa = None
+
+from olanalytics import colstats
+
+
+@pytest.fixture
+def data():
+    return pd.DataFrame({
+        'id': [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+        'grp': ['a', 'a', 'a', 'a', 'b', 'b', 'b', 'c', 'c', 'd'],
+        'val': [1.5, np.nan, np.nan, 2, 2, 2, np.nan, 3.5, np.nan, np.nan],
+        'cst': [0] * 10,
+        'empty': [None] * 10,
+        'mixed': [1, 'a', 1, 'a', 2, None, None, None, None, None],
+    })
+
+
+def test_compute_colstats(data):
+    with pytest.warns(UserWarning, match="column 'mixed'"):
+        stats = colstats.compute_colstats(data, fill_thld=0.5)
+    assert list(stats) == list(data.columns)
+    assert list(stats['grp']) == [
+        'empty_row_nb', 'total_usage', 'filling_ratio', 'uniq_val_nb',
+        '95prc_usage_val_nb', 'sufficient_quality', 'comment',
+        'max_occurrences_value', 'max_occurrences_count',
+        'min_occurrences_value', 'min_occurrences_count',
+        'max_value', 'min_value',
+    ]
+
+    def check(column, **expected):
+        for indicator, value in expected.items():
+            assert stats[column][indicator] == value, (column, indicator)
+
+    check(
+        'id', empty_row_nb=0, total_usage=10, filling_ratio=1,
+        uniq_val_nb=10, sufficient_quality=1, comment=None,
+        max_occurrences_count=1, min_occurrences_count=1,
+        max_value=10, min_value=1,
+    )
+    # 95% of 10 usages requires all values as they have same usage
+    check('id', **{'95prc_usage_val_nb': 10})
+    check(
+        'grp', total_usage=10, uniq_val_nb=4,
+        max_occurrences_value='a', max_occurrences_count=4,
+        min_occurrences_value='d', min_occurrences_count=1,
+        max_value='d', min_value='a', **{'95prc_usage_val_nb': 4},
+    )
+    check(
+        'val', empty_row_nb=5, filling_ratio=0.5, uniq_val_nb=3,
+        max_occurrences_value=2, max_occurrences_count=3,
+        max_value=3.5, min_value=1.5, **{'95prc_usage_val_nb': 3},
+    )
+    check(
+        'cst', uniq_val_nb=1, sufficient_quality=0, comment="only one value",
+        **{'95prc_usage_val_nb': 1},
+    )
+    check(
+        'empty', empty_row_nb=10, total_usage=0, filling_ratio=0,
+        uniq_val_nb=0, sufficient_quality=0, comment="filling_ratio < 0.5",
+        max_occurrences_value=None, max_occurrences_count=0,
+        max_value=None, min_value=None, **{'95prc_usage_val_nb': 0},
+    )
+    check('mixed', uniq_val_nb=3, max_value=None, min_value=None)
+
+    rows = colstats.compute_colstats(data[['id', 'grp']], as_list=True)
+    assert [(row['order'], row['column']) for row in rows] == [
+        (1, 'id'), (2, 'grp')
+    ]
+
+
+def test_usage_val_nb():
+    counts = np.array([50, 20, 10, 10, 5, 5])
+    assert colstats.usage_val_nb(counts, 0.5) == 1
+    assert colstats.usage_val_nb(counts, 0.7) == 2
+    assert colstats.usage_val_nb(counts, 0.75) == 4
+    assert colstats.usage_val_nb(counts, 0.95) == 6
+    assert colstats.usage_val_nb(counts, 0) == 0
+    assert colstats.usage_val_nb(np.array([], dtype=int), 0.95) == 0
+
+
+def test_compute_colstats_workers(data):
+    pytest.importorskip("pyarrow")
+    data = data.copy()
+    data['cat'] = pd.Categorical(['x', 'y'] * 5)
+    big = [2**53, 2**53 + 1, None, 2**53 + 3] * 2 + [None, 2**53]
+    data['nullable'] = pd.array(big, dtype='Int64')
+    data['big'] = pd.Series(big, dtype=object)
+    data['flag'] = pd.array([True, None] * 5, dtype='boolean')
+    with pytest.warns(UserWarning):
+        expected = colstats.compute_colstats(data)
+    assert expected['nullable']['uniq_val_nb'] == 3
+    with pytest.warns(UserWarning):
+        stats = colstats.compute_colstats(data, workers=2)
+    assert list(stats) == list(data.columns)
+    for column in data.columns:
+        assert stats[column] == expected[column], column
+
+
+@pytest.mark.parametrize('ext', ['csv', 'parquet'])
+def test_compute_file_colstats(tmp_path, ext):
+    data = pd.DataFrame({
+        'id': list(range(10)),
+        'grp': ['c', 'a', 'b', 'b', 'a', 'c', 'd', 'a', None, 'b'],
+        'val': [1.5, np.nan, np.nan, 2, 2, 2, np.nan, 3.5, np.nan, 0.5],
+        'empty': [np.nan] * 10,
+    })
+    path = tmp_path / f"data.{ext}"
+    if ext == 'csv':
+        data.to_csv(path, index=False)
+        data = pd.read_csv(path)
+    else:
+        pytest.importorskip('pyarrow')
+        data.to_parquet(path, index=False)
+        data = pd.read_parquet(path)
+
+    expected = colstats.compute_colstats(data)
+    for chunksize in [1, 3, 10, 100]:
+        stats = colstats.compute_file_colstats(path, chunksize=chunksize)
+        assert list(stats) == list(expected)
+        for column, col_stats in expected.items():
+            for indicator, value in col_stats.items():
+                result = stats[column][indicator]
+                assert result == value or (
+                    pd.isna(result) and pd.isna(value)
+                ), (chunksize, column, indicator)
+    # Ties ordered by first appearance as in value_counts
+    assert stats['grp']['max_occurrences_value'] == 'a'
+    assert stats['grp']['min_occurrences_value'] == 'd'
+
+    rows = colstats.compute_file_colstats(path, chunksize=4, as_list=True)
+    assert [row['column'] for row in rows] == list(data.columns)
+
+
+def test_compute_file_colstats_dtypes(tmp_path):
+    # Chunks of 2 rows would infer different dtypes
+    path = tmp_path / "data.csv"
+    path.write_text(
+        "mixed,num,flag\n"
+        "1,1,True\n"
+        "2,2,False\n"
+        "1,2.0,\n"
+        "a,01,true\n"
+    )
+    expected = colstats.compute_colstats(pd.read_csv(path))
+    stats = colstats.compute_file_colstats(path, chunksize=2)
+    assert stats == expected
+    assert stats['mixed']['max_occurrences_value'] == '1'
+    assert stats['mixed']['max_occurrences_count'] == 2
+    assert stats['num']['uniq_val_nb'] == 2
+    assert stats['flag']['uniq_val_nb'] == 2
+    sampled = colstats.compute_file_colstats(path, chunksize=3, sample=1.0)
+    for col, col_stats in sampled.items():
+        del col_stats['filling_ratio_ci'], col_stats['estimated']
+        assert col_stats == stats[col]
+
+
+def test_compute_colstats_approx(data, tmp_path):
+    # Few distinct values: sketches are exact
+    with pytest.warns(UserWarning, match="column 'mixed'"):
+        expected = colstats.compute_colstats(data)
+    with pytest.warns(UserWarning, match="column 'mixed'"):
+        stats = colstats.compute_colstats(data, approx=True)
+    for column, col_stats in expected.items():
+        for indicator, value in col_stats.items():
+            assert stats[column][indicator] == value, (column, indicator)
+
+    # Many distinct values, read by chunks
+    rng = np.random.default_rng(0)
+    size = 10**5
+    data = pd.DataFrame({
+        'uniq': np.arange(size),
+        'zipf': rng.zipf(1.5, size),
+    })
+    path = tmp_path / "data.csv"
+    data.to_csv(path, index=False)
+    expected = colstats.compute_colstats(data)
+    stats = colstats.compute_file_colstats(
+        path, chunksize=10**4, approx=True
+    )
+    for column in data.columns:
+        exp, res = expected[column], stats[column]
+        assert res['total_usage'] == exp['total_usage']
+        assert res['min_value'] == exp['min_value']
+        assert res['max_value'] == exp['max_value']
+        assert res['uniq_val_nb'] == pytest.approx(exp['uniq_val_nb'], 0.05)
+        assert res['95prc_usage_val_nb'] == pytest.approx(
+            exp['95prc_usage_val_nb'], 0.3
+        )
+        assert res['min_occurrences_count'] is None
+    res, exp = stats['zipf'], expected['zipf']
+    assert res['max_occurrences_value'] == exp['max_occurrences_value']
+    bound = size / (colstats.MG_COUNTERS + 1)
+    assert 0 <= exp['max_occurrences_count'] - res['max_occurrences_count']
+    assert exp['max_occurrences_count'] - res['max_occurrences_count'] <= bound
+
+
+def test_RootColstats(data, tmp_path):
+    data = data.drop(columns='mixed')
+    expected = colstats.compute_colstats(data)
+
+    root = colstats.RootColstats()
+    for start in range(0, len(data), 3):
+        root.update(data.iloc[start:start + 3])
+    assert root.row_n == len(data)
+    assert root.enrich() == expected
+
+    # Columns added then removed
+    parts = [
+        data.iloc[:4][['id', 'grp']], data.iloc[4:], pd.DataFrame({'id': [11]})
+    ]
+    root = colstats.RootColstats.from_data(parts[0])
+    for part in parts[1:]:
+        root.update(part)
+    full = pd.concat(parts)
+    assert root.enrich() == colstats.compute_colstats(full)
+
+    # Serialization
+    root = colstats.RootColstats.from_bytes(root.to_bytes())
+    assert root.enrich() == colstats.compute_colstats(full)
+    root.save(tmp_path / "state.bin")
+    loaded = colstats.RootColstats.load(tmp_path / "state.bin")
+    assert loaded.enrich(as_list=True) == colstats.compute_colstats(
+        full, as_list=True
+    )
+
+    approx = colstats.RootColstats(approx=True).update(data)
+    approx = colstats.RootColstats.from_bytes(approx.to_bytes())
+    assert approx.enrich() == expected
+    with pytest.raises(ValueError):
+        root.merge(approx)
+
+
+def test_series_occurrences():
+    rng = np.random.default_rng(0)
+    size = 1000
+    ints = rng.integers(-50, 50, size)
+    floats = rng.choice([np.nan, 0.5, -1, 2], size)
+    series_list = [
+        pd.Series(ints),
+        pd.Series(ints + 50, dtype=np.uint8),
+        pd.Series(ints * 2**40),  # span too wide for bincount
+        pd.Series(ints > 0),
+        pd.Series(np.zeros(size, dtype=bool)),
+        pd.Series(floats),
+        pd.Series(pd.Categorical.from_codes(
+            rng.integers(-1, 3, size), ['z', 'x', 'y', 'unused']
+        )),
+        pd.Series(pd.Categorical.from_codes(
+            rng.integers(-1, 3, size), ['z', 'x', 'y', 'w'], ordered=True
+        )),
+        pd.Series([], dtype=np.int64),
+        pd.Series([], dtype=bool),
+        pd.Series([-128, 127, 0, 127], dtype=np.int8),
+        pd.Series(ints * 600, dtype=np.int16),
+        pd.Series([3, None, -1, 3], dtype='Int64'),
+        pd.Series([3, 2, -1, 3], dtype='Int64'),
+        pd.Series([True, None, False, True], dtype='boolean'),
+        pd.Series([2.5, None, 2.5], dtype='Float64'),
+    ]
+    if pa is not None:
+        series_list.append(
+            pd.Series([5, None, -7, 5], dtype='int64[pyarrow]')
+        )
+    for series in series_list:
+        occ_values, occ_counts, bounds = colstats.series_occurrences(series)
+        expected = series.astype(object).value_counts(sort=False)
+        assert list(occ_values) == list(expected.index), series.dtype
+        assert list(occ_counts) == list(expected), series.dtype
+        if not len(expected):
+            assert bounds == (None, None)
+        elif getattr(series.dtype, 'ordered', True):
+            assert bounds == (series.min(), series.max()), series.dtype
+        else:
+            assert bounds == (min(expected.index), max(expected.index))
+
+
+def test_colstats_frame(data, tmp_path):
+    with pytest.warns(UserWarning, match="column 'mixed'"):
+        rows = colstats.compute_colstats(data, as_list=True)
+    with pytest.warns(UserWarning, match="column 'mixed'"):
+        frame = colstats.compute_colstats(data, as_frame=True)
+    assert list(frame.columns) == list(colstats.FRAME_DTYPES)
+    assert list(frame.columns) == list(rows[0])
+    assert frame['uniq_val_nb'].dtype == np.int64
+    assert frame['max_occurrences_count'].dtype == 'Int64'
+    assert frame.astype(object).where(frame.notna(), None).to_dict(
+        orient='records'
+    ) == rows
+
+    approx = colstats.RootColstats(approx=True).update(
+        pd.DataFrame({'uniq': np.arange(1000)})
+    ).enrich(as_frame=True)
+    assert approx['min_occurrences_count'].isna().all()
+
+    # Extra indicators of sampled stats after FRAME_DTYPES ones
+    sampled = colstats.compute_colstats(
+        data.drop(columns='mixed'), sample=100, as_frame=True
+    )
+    assert list(sampled.columns) == list(colstats.FRAME_DTYPES) + [
+        'filling_ratio_ci', 'estimated'
+    ]
+
+    pytest.importorskip('pyarrow')
+    for name in ["stats.parquet", "stats.arrow"]:
+        path = tmp_path / name
+        colstats.write_colstats(frame, path)
+        if name.endswith('.parquet'):
+            loaded = pd.read_parquet(path)
+        else:
+            loaded = pd.read_feather(path)
+        assert list(loaded['column']) == list(data.columns)
+        assert loaded['uniq_val_nb'].tolist() == frame['uniq_val_nb'].tolist()
+        # Values of several types written as strings
+        assert [
+            None if pd.isna(value) else value for value in loaded['max_value']
+        ] == ['10', 'd', '3.5', '0', None, None]
+
+
+def test_compute_colstats_sample(data, tmp_path):
+    data = data.drop(columns='mixed')
+
+    # Sample covering all rows: exact stats
+    expected = colstats.compute_colstats(data)
+    stats = colstats.compute_colstats(data, sample=100)
+    for column, col_stats in expected.items():
+        assert stats[column]['estimated'] == ()
+        ratio = col_stats['filling_ratio']
+        assert stats[column]['filling_ratio_ci'] == (ratio, ratio)
+        for indicator, value in col_stats.items():
+            assert stats[column][indicator] == value, (column, indicator)
+
+    rng = np.random.default_rng(0)
+    size = 10**5
+    data = pd.DataFrame({
+        'id': np.arange(size),
+        'val': np.where(
+            rng.random(size) < 0.3, np.nan, rng.integers(0, 5, size)
+        ),
+    })
+    expected = colstats.compute_colstats(data)
+    stats = colstats.compute_colstats(data, sample=0.05, seed=0)
+    assert stats == colstats.compute_colstats(data, sample=0.05, seed=0)
+    assert stats['val']['estimated'] == colstats.SAMPLED_INDICATORS
+    low, high = stats['val']['filling_ratio_ci']
+    assert low <= expected['val']['filling_ratio'] <= high
+    assert stats['val']['total_usage'] == pytest.approx(
+        expected['val']['total_usage'], rel=0.05
+    )
+    assert stats['val']['uniq_val_nb'] == 5
+    assert stats['id']['uniq_val_nb'] == size
+    assert stats['id']['95prc_usage_val_nb'] == 0.95 * size
+    assert stats['val']['max_occurrences_count'] == pytest.approx(
+        expected['val']['max_occurrences_count'], rel=0.1
+    )
+    with pytest.raises(ValueError):
+        colstats.compute_colstats(data, sample=10, approx=True)
+
+    # Reservoir and Bernoulli sampling of file
+    path = tmp_path / "data.csv"
+    data.to_csv(path, index=False)
+    for sample in [1000, 0.01]:
+        stats = colstats.compute_file_colstats(
+            path, chunksize=3000, sample=sample, seed=1
+        )
+        assert stats['val']['uniq_val_nb'] == 5
+        low, high = stats['val']['filling_ratio_ci']
+        assert low <= expected['val']['filling_ratio'] <= high
+
+
+def test_sample_chunks():
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({'x': np.arange(1000)})
+    chunks = [data.iloc[start:start + 70] for start in range(0, 1000, 70)]
+    sample, row_n = colstats.sample_chunks(chunks, 100, rng)
+    assert row_n == 1000
+    assert len(sample) == 100 == sample['x'].nunique()
+    assert sample['x'].is_monotonic_increasing
+    # Uniform: each row kept with probability 0.1
+    counts = np.zeros(1000)
+    for _ in range(200):
+        sample, _ = colstats.sample_chunks(chunks, 100, rng)
+        counts[sample['x']] += 1
+    assert counts[:500].sum() == pytest.approx(counts[500:].sum(), rel=0.05)
+
+
+def test_optimize_dtypes():
+    rng = np.random.default_rng(0)
+    size = 1000
+    data = pd.DataFrame({
+        'id': np.arange(size),
+        'small': rng.integers(-100, 100, size),
+        'float_int': np.where(
+            rng.random(size) < 0.2, np.nan, rng.integers(0, 1000, size)
+        ),
+        'quarters': rng.integers(0, 100, size) / 4,
+        'floats': rng.random(size),
+        'grp': rng.choice(['aa', 'bb', 'cc'], size).astype(object),
+        'cst': 1,
+        'empty': np.nan,
+        'sparse': np.where(rng.random(size) < 0.02, 1.5, np.nan),
+    })
+    report = colstats.optimize_dtypes(data)
+    assert list(report) == list(data.columns)
+    new_dtypes = {col: row['new_dtype'] for col, row in report.items()}
+    assert new_dtypes['id'] == np.uint16
+    assert new_dtypes['small'] == np.int8
+    assert new_dtypes['float_int'] == 'UInt16'
+    assert new_dtypes['quarters'] == np.float32
+    assert new_dtypes['floats'] == np.float64
+    assert new_dtypes['grp'] == 'category'
+    assert new_dtypes['cst'] is None and new_dtypes['empty'] is None
+    assert isinstance(new_dtypes['sparse'], pd.SparseDtype)
+    assert report['floats']['action'] == 'keep'
+    assert report['cst']['action'] == 'drop'
+    for row in report.values():
+        assert row['new_bytes'] <= row['bytes']
+
+    new_data, new_report = colstats.optimize_dtypes(data, apply=True)
+    assert new_report == report
+    assert list(new_data.columns) == [
+        col for col in data.columns if col not in ['cst', 'empty']
+    ]
+    for col in new_data.columns:
+        assert new_data[col].dtype == report[col]['new_dtype']
+        # Lossless
+        pd.testing.assert_series_equal(
+            new_data[col].astype(data[col].dtype), data[col]
+        )
+
+
+def test_optimize_dtypes_checked_on_data():
+    size = 1000
+    data = pd.DataFrame({
+        'inf': np.where(np.arange(size) == 5, np.inf, 1.0),
+        'outlier': np.where(np.arange(size) == 999, 10**6, 1),
+        'nullable': pd.Series([1, None] * (size // 2), dtype='Int64'),
+        'nullable_full': pd.Series(np.arange(size) - 300, dtype='Int64'),
+        'rare': np.where(np.arange(size) == 3, 2, 1),
+    })
+    # Sampled stats miss the outlier and the rare value
+    stats_by_col = colstats.compute_colstats(data, sample=10, seed=0)
+    assert stats_by_col['outlier']['max_value'] == 1
+    assert stats_by_col['rare']['uniq_val_nb'] == 1
+    new_data, report = colstats.optimize_dtypes(
+        data, stats_by_col, apply=True
+    )
+    new_dtypes = {col: row['new_dtype'] for col, row in report.items()}
+    assert new_dtypes['inf'] == np.float32
+    assert new_dtypes['outlier'] == np.uint32
+    assert new_dtypes['nullable'] == 'UInt8'
+    assert new_dtypes['nullable_full'] == 'Int16'
+    assert new_dtypes['rare'] == np.uint8
+    for col in data.columns:
+        pd.testing.assert_series_equal(
+            new_data[col].astype(data[col].dtype), data[col]
+        )
@@ -1,3 +1,8 @@
+import functools
+import numpy as np
+import pytest
+import random
+
 import olanalytics.combinations as lib
 
 
@@ -7,3 +12,136 @@ def test_combinations_ij():
     for index, ij in enumerate(lib.combinations_ij(n)):
         assert lib.S(*ij, n) == index
         assert lib.S_inv(index, n) == ij
+
+
+@pytest.mark.parametrize('n', [2, 3, 10, 1000, 10**8 + 7, 2**31, 2**40])
+def test_S_inv_array(n):
+    rng = random.Random(n)
+    total = lib.combinations_nb(n)
+    cindexes = [0, 1, total - 2, total - 1]
+    cindexes += [rng.randrange(total) for _ in range(1000)]
+    cindexes = [cindex for cindex in cindexes if 0 <= cindex < total]
+    # Indexes around row bounds
+    for i in [0, 1, n // 3, n - 3, n - 2]:
+        if 0 <= i < n - 1:
+            cindexes += [
+                cindex for cindex in [lib.S(i, i + 1, n) + d for d in (-1, 0)]
+                if 0 <= cindex < total
+            ]
+
+    I, J = lib.S_inv_array(cindexes, n)
+    assert ((0 <= I) & (I < J) & (J < n)).all()
+    assert list(lib.S_array(I, J, n)) == cindexes
+    for cindex, i, j in zip(cindexes[:50], I, J):
+        assert lib.S_inv(cindex, n) == (i, j)
+        assert lib.S(i, j, n) == cindex
+
+
+def test_combinations_ij_sample():
+    n = 50
+    sample = list(lib.combinations_ij_sample(n, 100))
+    assert len(sample) == len(set(sample)) == 100
+    assert sample == sorted(sample)
+    assert all(0 <= i < j < n for i, j in sample)
+    assert len(list(lib.combinations_ij_sample(4, 100))) == 6
+
+
+def _dot_block(X, rows, cols):
+    return X[rows] @ X[cols].T
+
+
+@pytest.mark.parametrize('block', [1, 7, 1000])
+@pytest.mark.parametrize('top_k, threshold', [
+    (10, None), (None, 4), (15, 3), (0, None), (10**4, None),
+])
+def test_pairwise_reduce(block, top_k, threshold):
+    n = 53
+    X = np.random.default_rng(0).integers(0, 3, (n, 4))  # with ties
+    func = functools.partial(_dot_block, X)
+    pairs = [(int(X[i] @ X[j]), i, j) for i, j in lib.combinations_ij(n)]
+    if threshold is not None:
+        pairs = [pair for pair in pairs if pair[0] >= threshold]
+    if top_k is not None:
+        pairs = sorted(pairs, key=lambda pair: (-pair[0], pair[1:]))[:top_k]
+    else:
+        pairs = sorted(pairs, key=lambda pair: pair[1:])
+
+    I, J, V = lib.pairwise_reduce(
+        func, n, top_k=top_k, threshold=threshold, block=block
+    )
+    assert list(zip(V.tolist(), I.tolist(), J.tolist())) == pairs
+
+
+def test_pairwise_reduce_workers():
+    n = 100
+    X = np.random.default_rng(1).normal(size=(n, 5))
+    X[3] = np.nan
+    func = functools.partial(_dot_block, X)
+    expected = lib.pairwise_reduce(func, n, top_k=20, block=16)
+    result = lib.pairwise_reduce(func, n, top_k=20, block=16, workers=2)
+    for array, expected_array in zip(result, expected):
+        np.testing.assert_array_equal(array, expected_array)
+    assert 3 not in expected[0] and 3 not in expected[1]
+    assert len(list(lib.pairwise_tiles(n, 16))) == 7 * 8 // 2
+
+    with pytest.raises(ValueError):
+        lib.pairwise_reduce(func, n)
+    I, J, V = lib.pairwise_reduce(func, 1, top_k=5)
+    assert len(I) == len(J) == len(V) == 0
+
+
+@pytest.mark.parametrize('total, number, batch', [
+    (10**6, 10**4, 100), (10**6, 10**6, 2**16), (2**62, 1000, 64),
+    (10, 0, 1), (10, 20, 3),
+])
+def test_sample_indexes(total, number, batch):
+    batches = list(lib.sample_indexes(
+        total, number, rng=np.random.default_rng(0), batch=batch
+    ))
+    assert all(0 < len(indexes) <= batch for indexes in batches)
+    indexes = np.concatenate(batches) if batches else np.array([])
+    assert len(np.unique(indexes)) == len(indexes) == min(number, total)
+    assert (np.diff(indexes) > 0).all()
+    assert len(indexes) == 0 or 0 <= indexes[0] and indexes[-1] < total
+
+
+def test_sample_indexes_uniform():
+    total, number, reps = 10, 3, 4000
+    rng = np.random.default_rng(1)
+    frequencies = np.zeros(total)
+    for _ in range(reps):
+        for indexes in lib.sample_indexes(total, number, rng=rng, batch=1):
+            frequencies[indexes] += 1
+    frequencies /= reps
+    std = np.sqrt(0.3 * 0.7 / reps)
+    assert np.abs(frequencies - number / total).max() < 4 * std
+
+
+def test_sample_indexes_parts():
+    total, number, parts = 10**7, 10**4, 3
+
+    def part_indexes(part):
+        return np.concatenate(list(lib.sample_indexes(
+            total, number, rng=np.random.default_rng(7), batch=500,
+            part=part, parts=parts,
+        )))
+
+    indexes = np.concatenate([part_indexes(part) for part in range(parts)])
+    assert len(np.unique(indexes)) == len(indexes) == number
+    assert (np.diff(indexes) > 0).all()
+    np.testing.assert_array_equal(part_indexes(1), part_indexes(1))
+    with pytest.raises(ValueError):
+        next(lib.sample_indexes(total, number, part=3, parts=parts))
+
+
+@pytest.mark.parametrize('n', [5, 1000, 2**31, 3 * 10**9])
+def test_combinations_sample(n):
+    batches = list(lib.combinations_sample(
+        n, 2000, rng=np.random.default_rng(0), batch=300
+    ))
+    I = np.concatenate([I for I, _ in batches])
+    J = np.concatenate([J for _, J in batches])
+    assert len(I) == min(2000, lib.combinations_nb(n))
+    assert ((0 <= I) & (I < J) & (J < n)).all()
+    cindexes = np.array(lib.S_array(I, J, n), dtype=np.int64)
+    assert (np.diff(cindexes) > 0).all()
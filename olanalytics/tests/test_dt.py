@@ -1,6 +1,7 @@
 import numpy as np
 import pytest
-from datetime import datetime
+import tracemalloc
+from datetime import datetime, timedelta, timezone
 
 import olanalytics.dt as lib
 
@@ -82,3 +83,219 @@ def test_dtloc2pos():
         lib.dtloc2pos([{'hour': 7}, {'hour': 9}], timeline),
         [1, 2, 4],
     )
+
+
+def test_DatetimeExpression():
+    timeline = np.array([
+        datetime(2020, 1, 6, 7),    # monday
+        datetime(2020, 1, 6, 8),
+        datetime(2020, 1, 7, 7),    # tuesday
+        datetime(2020, 1, 11, 8),   # saturday
+        datetime(2020, 1, 12, 9),   # sunday
+    ])
+    morning = lib.DatetimeDescription(hour=(7, 8))
+    weekend = lib.DatetimeDescription(weekday=(5, 6))
+
+    expr = morning & ~weekend
+    np.testing.assert_equal(expr.mask(timeline), [1, 1, 1, 0, 0])
+    assert expr.match(datetime(2020, 1, 6, 7))
+    assert not expr.match(datetime(2020, 1, 11, 8))
+
+    expr = (morning & weekend) | {'weekday': 1}
+    np.testing.assert_equal(expr.match_indexes(timeline), [2, 3])
+    assert isinstance(expr, lib.DatetimeExpression)
+    assert str(expr) == "((hour=(7, 8)) & (weekday=(5, 6))) | (weekday=1)"
+
+    # Nested expressions with same operator are flattened
+    expr = morning & weekend & {'hour': 8}
+    assert len(expr.operands) == 3
+    np.testing.assert_equal(expr.match_indexes(timeline), [3])
+
+    # Common sub-expressions share key whatever the order
+    assert (morning | weekend).key == (weekend | morning).key
+    expr = (morning | weekend) & ~(weekend | morning)
+    np.testing.assert_equal(expr.match_indexes(timeline), [])
+
+    # Empty timeline
+    np.testing.assert_equal(expr.mask(np.array([])), [])
+
+    # Plain bools on lists, bool array on arrays
+    expr = morning & ~weekend
+    assert expr.matches(list(timeline)) == [True, True, True, False, False]
+    assert all(type(res) is bool for res in expr.matches(list(timeline)))
+    assert expr.matches(timeline).dtype == bool
+    with pytest.raises(TypeError):
+        lib._Description()
+
+    with pytest.raises(TypeError):
+        morning & 5
+    with pytest.raises(ValueError):
+        lib.DatetimeExpression('^', morning, weekend)
+
+    # dtloc2pos
+    np.testing.assert_equal(
+        lib.dtloc2pos(morning & ~weekend, timeline),
+        [0, 1, 2],
+    )
+
+
+def test_RegularTimeline():
+    timeline = lib.RegularTimeline(
+        datetime(2020, 1, 6, 23, 30), timedelta(minutes=20), 10
+    )
+    assert len(timeline) == 10
+    assert timeline[0] == datetime(2020, 1, 6, 23, 30)
+    assert timeline[-1] == datetime(2020, 1, 7, 2, 30)
+    assert list(timeline)[2] == datetime(2020, 1, 7, 0, 10)
+    assert timeline.index(datetime(2020, 1, 7, 0, 10)) == 2
+    assert timeline.index(datetime(2020, 1, 7, 0, 15)) is None
+    assert timeline.index(datetime(2020, 1, 8)) is None
+    np.testing.assert_equal(
+        timeline[1:3],
+        np.array(['2020-01-06T23:50', '2020-01-07T00:10'], dtype='M8[us]'),
+    )
+    with pytest.raises(IndexError):
+        timeline[10]
+    with pytest.raises(ValueError):
+        lib.RegularTimeline(datetime(2020, 1, 1), timedelta(0), 10)
+
+    assert lib.RegularTimeline.from_array(list(timeline)).step == (
+        timedelta(minutes=20)
+    )
+
+
+@pytest.mark.parametrize("start, step, size", [
+    (datetime(2020, 1, 1), timedelta(hours=1), 24 * 15),
+    (datetime(2020, 1, 3, 5, 17), timedelta(minutes=7), 4000),
+    (datetime(2019, 12, 31, 23), timedelta(minutes=90), 500),
+    (datetime(2020, 1, 1, 0, 0, 3), timedelta(seconds=17), 5000),
+    (datetime(2020, 1, 1), timedelta(days=1), 30),
+    (datetime(2020, 1, 1, 0, 0, 1, 5), timedelta(hours=1, seconds=1), 500),
+])
+def test_periodic_matching(start, step, size):
+    timeline = lib.RegularTimeline(start, step, size)
+    dts = list(timeline)
+    DD = lib.DatetimeDescription
+    descriptions = [
+        DD(hour=5),
+        DD(weekday=(0, 4)),
+        DD(hour=[(0, 8), (18, 24)]),
+        DD(hour=(6.5, 8), minute=(10, 40)),
+        DD(isoweekday=7, hour=3),
+        DD(second=[1, (30, 45)]),
+        DD(second=0),
+        DD(microsecond=(0, 10)),
+        DD(hour=25),
+        DD(),
+        DD(weekday=(0, 4)) & ~DD(hour=(9, 17)) | DD(minute=0),
+        ~(DD(weekday=5) | DD(weekday=6)),
+    ]
+    for dd in descriptions:
+        assert dd.periodic() is not None
+        expected = np.where([dd.match(dt) for dt in dts])[0]
+        np.testing.assert_equal(dd.match_indexes(timeline), expected)
+        np.testing.assert_equal(lib.dtloc2pos(dd, timeline), expected)
+        np.testing.assert_equal(
+            np.where(dd.mask(timeline))[0], expected
+        )
+
+    # Non periodic attributes use datetimes
+    dd = DD(day=(1, 2), hour=1)
+    assert dd.periodic() is None
+    expected = np.where([dd.match(dt) for dt in dts])[0]
+    np.testing.assert_equal(dd.match_indexes(timeline), expected)
+
+
+def test_periodic_coarse_step():
+    # 5 years of hours: cost must not depend on the number of seconds
+    timeline = lib.RegularTimeline(
+        datetime(2015, 1, 1), timedelta(hours=1), 5 * 8760
+    )
+    DD = lib.DatetimeDescription
+    tracemalloc.start()
+    try:
+        assert len(lib.dtloc2pos({}, timeline)) == len(timeline)
+        assert len(DD(second=0).match_indexes(timeline)) == len(timeline)
+        assert len(DD(microsecond=5).match_indexes(timeline)) == 0
+        dd = DD(microsecond=0) & DD(weekday=2)
+        assert dd.periodic() is None  # too many tiled intervals
+        indexes = dd.match_indexes(timeline)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 20 * 2**20
+    np.testing.assert_equal(
+        indexes, np.where([dt.weekday() == 2 for dt in timeline])[0]
+    )
+
+
+def test_datetime64_matching():
+    timeline = np.arange(
+        np.datetime64('2019-12-30T22:00'),
+        np.datetime64('2020-03-02T03:00'),
+        np.timedelta64(37, 'm'),
+    )
+    dts = timeline.astype(object)
+    for attr in [
+        'year', 'month', 'day', 'hour', 'minute', 'second', 'microsecond',
+        'weekday', 'isoweekday',
+    ]:
+        expected = [
+            getattr(dt, attr)() if callable(getattr(dt, attr))
+            else getattr(dt, attr)
+            for dt in dts
+        ]
+        np.testing.assert_equal(
+            lib.datetime_attribute(timeline, attr), expected
+        )
+        np.testing.assert_equal(lib.datetime_attribute(dts, attr), expected)
+        np.testing.assert_equal(
+            lib.datetime_attribute(list(dts), attr), expected
+        )
+
+    # Timezone-aware datetimes keep their local attributes
+    tz = timezone(timedelta(hours=5))
+    aware = [datetime(2020, 1, 6, 23, tzinfo=tz)]
+    assert lib.as_datetime64(aware) is None
+    np.testing.assert_equal(lib.datetime_attribute(aware, 'hour'), [23])
+    np.testing.assert_equal(lib.datetime_attribute(aware, 'weekday'), [0])
+
+    dd = lib.DatetimeDescription(month=2, day=(1, 10)) | {'hour': 3}
+    np.testing.assert_equal(dd.mask(timeline), dd.mask(dts))
+    assert dd.match(np.datetime64('2020-02-05T10:00'))
+
+    assert_eq = np.testing.assert_equal
+    assert_eq(lib.dtloc2pos(np.datetime64('2019-12-30T22:37'), timeline), [1])
+    assert_eq(lib.dtloc2pos(datetime(2019, 12, 30, 22, 37), timeline), [1])
+    assert_eq(lib.dtloc2pos(datetime(2021, 1, 1), timeline), [])
+
+
+def test_timeline_cache():
+    timeline = lib.RegularTimeline(
+        datetime(2020, 1, 30, 22), timedelta(minutes=90), 100
+    )
+    cache = lib._TimelineCache(timeline)
+    rows = np.arange(0, 100, 3)
+    days = cache.attribute('day', rows)
+    assert days.dtype == np.int64
+    np.testing.assert_equal(days, [timeline[i].day for i in rows])
+    np.testing.assert_equal(
+        cache.attribute('day', np.arange(5)), [30, 30, 31, 31, 31]
+    )
+    assert len(cache.attribute('month', np.array([], dtype=np.int64))) == 0
+
+    dd = lib.DatetimeDescription(day=(1, 5))
+    np.testing.assert_equal(
+        dd.match_indexes(timeline),
+        [i for i in range(100) if 1 <= timeline[i].day <= 5],
+    )
+
+    # Timezone-aware datetimes: converted to UTC, rejected by timelines
+    tz = timezone(timedelta(hours=2))
+    assert lib.to_us(datetime(2020, 1, 1, 2, tzinfo=tz)) == lib.to_us(
+        datetime(2020, 1, 1)
+    )
+    aware = [datetime(2020, 1, 1, tzinfo=tz), datetime(2020, 1, 2, tzinfo=tz)]
+    assert lib.regular_timeline(aware) is aware
+    with pytest.raises(ValueError):
+        lib.RegularTimeline.from_array(aware)
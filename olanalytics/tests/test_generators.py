@@ -1,8 +1,23 @@
 import numpy as np
-from datetime import datetime, timedelta
+import pytest
+from datetime import datetime, timedelta, timezone
+from time import sleep
 
+from olanalytics import detection
 from olanalytics.dt import DatetimeDescription
-from olanalytics.generators import timeseries, CustomTimedCurve
+from olanalytics.generators import (
+    inject_elbow,
+    inject_isolated,
+    inject_leaps,
+    inject_step_irregularities,
+    itimeseries,
+    spawn_seeds,
+    timeseries,
+    CurveBatch,
+    CurveStream,
+    CustomCurve,
+    CustomTimedCurve,
+)
 
 
 def test_dt_generation():
@@ -47,3 +62,300 @@ def test_dt_generation():
             0.9338501433185797,
         ]
     )
+
+
+def test_aware_timed_curve():
+    tz = timezone(timedelta(hours=-5))
+    start = datetime(2020, 1, 1, tzinfo=tz)
+    X = [start + timedelta(hours=hour) for hour in range(24)]
+    curve = CustomTimedCurve(X)
+    assert curve.timeline is X
+    curve.add_gaussian(8, center=DatetimeDescription(hour=12), stdev=1)
+    curve.add_gaussian(
+        8, center=datetime(2020, 1, 1, 5, tzinfo=tz), stdev=timedelta(hours=1)
+    )
+    assert np.argmax(curve.Y[8:]) + 8 == 12  # local hour
+    assert curve.Y[5] == pytest.approx(8)
+    curve.set_zero(loc={'hour': 12})
+    assert curve.Y[12] == 0
+
+    # Timezone kept by timeseries: hours are local
+    X = timeseries(start, start + timedelta(days=2), timedelta(hours=1))
+    assert X.dtype == object and all(dt.tzinfo is tz for dt in X)
+    assert list(X[:24]) == [
+        start + timedelta(hours=hour) for hour in range(24)
+    ]
+    chunks = list(itimeseries(
+        start, start + timedelta(days=2), timedelta(hours=1), chunk=20
+    ))
+    assert list(np.concatenate(chunks)) == list(X)
+    curve = CustomTimedCurve(X)
+    curve.set_zero(loc={'hour': 8})
+    curve.add_noise(1, 2, loc={'hour': 8})
+    assert list(np.where(curve.Y)[0]) == [8, 32]
+
+
+def test_timeseries():
+    X = timeseries(
+        start=datetime(2020, 1, 1),
+        end=datetime(2020, 1, 1, 2),
+        step=timedelta(minutes=25),
+    )
+    assert X.dtype == np.dtype('M8[us]')
+    np.testing.assert_equal(
+        X,
+        np.array([
+            '2020-01-01T00:00', '2020-01-01T00:25', '2020-01-01T00:50',
+            '2020-01-01T01:15', '2020-01-01T01:40',
+        ], dtype='M8[us]'),
+    )
+    np.testing.assert_equal(
+        timeseries(
+            np.datetime64('2020-01-01'),
+            np.datetime64('2020-01-01T02'),
+            np.timedelta64(25, 'm'),
+        ),
+        X,
+    )
+    np.testing.assert_equal(timeseries(0, 10, 3), [0, 3, 6, 9])
+    np.testing.assert_almost_equal(timeseries(0, 1, 0.25), [0, .25, .5, .75])
+    assert len(timeseries(5, 0, 1)) == 0
+    with pytest.raises(ValueError):
+        timeseries(0, 10, 0)
+
+
+def test_itimeseries():
+    args = (datetime(2020, 1, 1), datetime(2020, 1, 2), timedelta(minutes=7))
+    chunks = list(itimeseries(*args, chunk=50))
+    assert [len(chunk) for chunk in chunks] == [50, 50, 50, 50, 6]
+    np.testing.assert_equal(np.concatenate(chunks), timeseries(*args))
+
+    chunks = list(itimeseries(0, 10, 1, chunk=5))
+    np.testing.assert_equal(chunks, [[0, 1, 2, 3, 4], [5, 6, 7, 8, 9]])
+    with pytest.raises(ValueError):
+        itimeseries(0, 10, 1, chunk=0)
+
+
+def test_add_gaussians():
+    X = np.linspace(-10, 30, 2001)
+    highs, centers, stdevs = [1, 2, -3], [0, 5.5, 20], [1, 0.5, 2]
+    expected = sum(
+        high * np.exp(-0.5 * (X - center)**2 / stdev**2)
+        for high, center, stdev in zip(highs, centers, stdevs)
+    )
+
+    curve = CustomCurve(X)
+    curve.add_gaussians(highs, centers, stdevs, cutoff=None)
+    np.testing.assert_almost_equal(curve.Y, expected, decimal=12)
+
+    curve = CustomCurve(X)
+    curve.add_gaussians(highs, centers, stdevs)
+    np.testing.assert_almost_equal(curve.Y, expected, decimal=7)
+    assert curve.Y[0] == 0  # out of truncated supports
+
+    curve = CustomCurve(X)
+    for high, center, stdev in zip(highs, centers, stdevs):
+        curve.add_gaussian(high, center, stdev)
+    np.testing.assert_almost_equal(curve.Y, expected, decimal=7)
+
+    # callable high is called once per center
+    heights = iter([1, 2])
+    curve = CustomCurve(X)
+    curve.add_gaussians(lambda: next(heights), [0, 20], 1)
+    np.testing.assert_almost_equal(curve.Y.max(), 2)
+
+    # Timed curve, daily peak
+    X = timeseries(
+        datetime(2020, 1, 1), datetime(2020, 1, 8), timedelta(minutes=1)
+    )
+    curve = CustomTimedCurve(X)
+    noon = DatetimeDescription(hour=12, minute=0)
+    curve.add_gaussian(1, noon, timedelta(hours=1))
+    peaks = np.where(np.isclose(curve.Y, 1))[0]
+    np.testing.assert_equal(peaks, 720 + 1440 * np.arange(7))
+
+
+def test_CurveBatch():
+    X = timeseries(
+        start=datetime(2020, 1, 1),
+        end=datetime(2020, 1, 3),
+        step=timedelta(hours=1),
+    )
+
+    def generate(seed, n=4):
+        batch = CurveBatch(X, n, seed=seed)
+        batch.add_noise(0, 1, loc=DatetimeDescription(hour=(8, 18)))
+        batch.add_gaussian(
+            batch.rng.uniform(5, 10, n),
+            center=DatetimeDescription(hour=12),
+            stdev=timedelta(hours=1),
+        )
+        batch.set_zero(loc={'hour': 14})
+        return batch
+
+    batch = generate(seed=1)
+    assert len(batch) == 4
+    assert batch.Y.shape == (4, 48)
+    assert (batch.Y[:, [0, 14, 38]] == 0).all()
+    assert (batch.Y[:, [8, 12, 32, 36]] > 0).all()
+    assert len(set(batch.Y[:, 12])) == 4
+
+    # Reproducible, also across spawned seeds
+    np.testing.assert_equal(generate(seed=1).Y, batch.Y)
+    seeds = spawn_seeds(1, 3)
+    batches = [generate(seed) for seed in seeds]
+    np.testing.assert_equal(generate(spawn_seeds(1, 3)[2]).Y, batches[2].Y)
+    assert not np.array_equal(batches[0].Y, batches[1].Y)
+
+    # Deterministic operations match CustomTimedCurve
+    batch = CurveBatch(X, 2)
+    batch.add_gaussian([1, 2], center={'hour': 12}, stdev=2)
+    batch.set_zero(loc={'hour': 13})
+    curve = CustomTimedCurve(X)
+    curve.add_gaussian(2, center={'hour': 12}, stdev=2)
+    curve.set_zero(loc={'hour': 13})
+    np.testing.assert_almost_equal(batch.Y[1], curve.Y)
+    np.testing.assert_almost_equal(batch.curve(0).Y, curve.Y / 2)
+
+    # Numerical X
+    batch = CurveBatch(np.arange(20), 3, seed=0)
+    batch.add_gaussian(1, center=[2, 15], stdev=1)
+    batch.set_zero(loc=slice(0, 2))
+    np.testing.assert_almost_equal(batch.Y[:, 15], [1, 1, 1])
+    assert (batch.Y[:, :2] == 0).all()
+
+
+def test_CurveStream():
+    start, step, chunk = datetime(2020, 1, 1), timedelta(minutes=10), 100
+    heights = iter(range(1, 100))
+
+    def setup(curve):
+        curve.add_gaussian(lambda: next(heights), {'hour': 12}, 2)
+        curve.add_gaussian(5, {'minute': 30, 'hour': (0, 3)}, 1)
+        curve.set_zero(loc={'hour': 2})
+
+    stream = CurveStream(start, step, chunk=chunk)
+    setup(stream)
+    chunks = []
+    for _ in range(2):
+        X, Y = next(stream)
+        chunks.append((X.copy(), Y.copy()))
+    assert stream.position == 2 * chunk
+    assert stream.meter.count == 2 * chunk
+    elapsed = stream.meter.elapsed  # consumer time not measured
+    sleep(1 / 100)
+    assert stream.meter.elapsed == elapsed
+
+    heights = iter(range(1, 100))
+    X = timeseries(start, start + 3 * chunk * step, step)
+    curve = CustomTimedCurve(X)
+    setup(curve)
+    np.testing.assert_equal(
+        np.concatenate([X for X, _ in chunks]), X[:2 * chunk]
+    )
+    np.testing.assert_almost_equal(
+        np.concatenate([Y for _, Y in chunks]), curve.Y[:2 * chunk]
+    )
+
+    # Noise is reproducible
+    def noisy(seed):
+        stream = CurveStream(start, step, chunk=chunk, seed=seed)
+        stream.add_noise(1, 2, loc={'hour': (8, 18)})
+        return next(stream)[1].copy()
+
+    Y = noisy(seed=3)
+    np.testing.assert_equal(Y, noisy(seed=3))
+    assert (Y[:48] == 0).all() and (Y[48:60] >= 1).all()
+
+    with pytest.raises(TypeError):
+        CurveStream(0, 1)
+    with pytest.raises(ValueError):
+        stream.add_gaussian(1, {'hour': 1}, 1, cutoff=None)
+
+
+def test_anomalies():
+    rng = np.random.default_rng(0)
+
+    curve = CustomCurve(np.arange(200, dtype=float))
+    labels = inject_leaps(curve, 5, delta=3, rng=rng)
+    assert labels.sum() == 5 and not labels[0]
+    np.testing.assert_equal(
+        detection.detect_leap(curve.X, curve.Y, thld=3), np.where(labels)[0]
+    )
+
+    curve = CustomCurve(np.arange(200, dtype=float))
+    curve.Y += 10
+    labels = inject_isolated(curve, 20, delta=5, rng=rng)
+    np.testing.assert_equal(
+        detection.detect_iso(curve.Y, lvlref=10.), np.where(labels)[0]
+    )
+
+    curve = CustomCurve(np.arange(200, dtype=float))
+    labels = inject_elbow(curve, slope=2, rng=rng)
+    assert labels[detection.detect_elbow(curve.Y)]
+    labels = inject_elbow(CustomCurve(np.arange(10)), slope=1, index=3)
+    assert np.where(labels)[0] == [3]
+
+    curve = CustomCurve(np.arange(200, dtype=float))
+    labels = inject_step_irregularities(curve, 3, gap=2, spacing=3, rng=rng)
+    irregular = np.where(labels)[0]
+    expected = sorted(set(irregular - 1) | set(irregular))
+    assert detection.stepreg_bounds(curve.X, top_thld=2) == expected
+
+    with pytest.raises(ValueError):
+        inject_leaps(CustomCurve(np.arange(10)), 6, delta=1, rng=rng)
+    with pytest.raises(TypeError):
+        inject_step_irregularities(
+            CustomTimedCurve(timeseries(0, 10, 1).astype('M8[h]')), 1, gap=1
+        )
+    with pytest.raises(ValueError):
+        curve.Xnum = np.arange(len(curve) + 1)
+    timed = CustomTimedCurve(timeseries(0, 10, 1).astype('M8[h]'))
+    assert timed.Xnum == range(10)  # not materialized
+
+
+def test_chunked_curves(tmp_path):
+    X = timeseries(
+        datetime(2020, 1, 1), datetime(2020, 1, 3), timedelta(minutes=30)
+    )
+
+    def generate(**kwargs):
+        np.random.seed(seed=5)
+        curve = CustomTimedCurve(X, **kwargs)
+        curve.add_noise(0, 1)
+        curve.add_noise(0, 3, loc=DatetimeDescription(hour=(8, 18)))
+        curve.add_gaussian(8, center={'hour': 12, 'minute': 0}, stdev=3)
+        curve.add_gaussian(2, center={'hour': 0, 'minute': 0}, stdev=40,
+                           cutoff=None)
+        curve.set_zero(loc={'hour': 14})
+        return curve
+
+    expected = generate().Y
+    assert expected.dtype == np.float64
+
+    curve = generate(chunk=7)
+    np.testing.assert_almost_equal(curve.Y, expected, decimal=12)
+
+    curve = generate(dtype=np.float32, chunk=5)
+    assert curve.Y.dtype == np.float32
+    np.testing.assert_allclose(curve.Y, expected, rtol=1e-6, atol=1e-6)
+
+    filename = str(tmp_path / "Y.dat")
+    curve = generate(dtype=np.float32, filename=filename, chunk=10)
+    assert isinstance(curve.Y, np.memmap)
+    curve.Y.flush()
+    np.testing.assert_allclose(
+        np.fromfile(filename, dtype=np.float32), expected,
+        rtol=1e-6, atol=1e-6,
+    )
+
+    # Slices by chunks
+    curve = CustomCurve(np.arange(20, dtype=float), chunk=3)
+    curve.Y += 1
+    curve.set_zero(loc=slice(15, 2, -2))
+    curve.set_zero(loc=np.arange(20) < 2)
+    np.testing.assert_equal(
+        np.where(curve.Y == 0)[0], [0, 1, 3, 5, 7, 9, 11, 13, 15]
+    )
+    with pytest.raises(ValueError):
+        CustomCurve(np.arange(3), chunk=0)
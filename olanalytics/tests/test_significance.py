@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from olanalytics import significance
+
+
+def loop_required_weights_i(weights, target_ratio):
+    """Reference: add weights by decreasing order until target is reached"""
+    ratios = weights / weights.sum()
+    rindexes, total_r = [], 0
+    for i in np.argsort(-ratios, kind='stable'):
+        if total_r >= target_ratio:
+            break
+        total_r += ratios[i]
+        rindexes.append(i)
+    return np.array(rindexes, dtype=np.intp)
+
+
+@pytest.mark.parametrize('block', [1, 4, 2**16])
+def test_required_weights_i(block):
+    rng = np.random.default_rng(0)
+    for weights in [
+        rng.random(1000),
+        rng.integers(0, 5, 1000).astype(float),  # many ties
+        rng.pareto(1, 10**4),
+        np.ones(10),
+        np.array([1., 2., 1., 0.]),
+    ]:
+        for target in [0, 0.001, 0.25, 0.5, 0.9, 1, 1.5]:
+            res = significance.required_weights_i(
+                weights, target, block=block
+            )
+            assert np.array_equal(
+                res, loop_required_weights_i(weights, target)
+            ), (target, weights[:5])
+
+    # Exact target: weight reaching it is the last required
+    weights = np.array([1., 2., 1., 0.])
+    assert list(significance.required_weights_i(weights, 0.5)) == [1]
+    assert list(significance.required_weights_i(weights, 0.75)) == [1, 0]
+    assert list(significance.required_weights_i(weights, 1)) == [1, 0, 2]
+    assert list(significance.required_weights_i(
+        np.array([0.5, 0.2, 0.3]), 0.7, as_ratio=True
+    )) == [0, 2]
+
+
+def test_CoverageCurve(capsys):
+    rng = np.random.default_rng(0)
+    series = pd.Series(rng.zipf(1.5, 1000)).where(rng.random(1000) > 0.1)
+    curve = significance.CoverageCurve.from_series(series)
+    occurrences = series.value_counts()
+    assert len(curve) == len(occurrences)
+
+    ratios = [0, 0.1, 0.5, 0.8, 0.9, 0.95, 0.99, 1]
+    for ratio in ratios:
+        # Reference: add values until usage is strictly above target
+        items, usage = [], 0
+        for item, count in occurrences.items():
+            usage += count
+            items.append(item)
+            if usage > ratio * occurrences.sum():
+                break
+        assert list(curve.items_for(ratio)) == items
+        assert significance.required_values(
+            series, ratio, verbose=False
+        ) == items
+    assert capsys.readouterr().out == ""
+    counts = curve.counts_for(ratios)
+    assert list(counts) == [curve.count_for(ratio) for ratio in ratios]
+    assert curve.ratio_for(0) == 0
+    assert curve.ratio_for(len(curve)) == 1
+    assert curve.ratio_for(1) == occurrences.iloc[0] / occurrences.sum()
+
+    rows = curve.report(ratios)
+    assert [row['items_nb'] for row in rows] == list(counts)
+    assert all(
+        row['reached_ratio'] > row['target_ratio'] or row['target_ratio'] == 1
+        for row in rows
+    )
+    significance.required_values(series, 0.5)
+    assert "items required to reach" in capsys.readouterr().out
+
+    weights = rng.pareto(1, 1000)
+    curve = significance.CoverageCurve.from_weights(weights)
+    for ratio in ratios:
+        assert np.array_equal(
+            curve.items_for(ratio),
+            significance.required_weights_i(weights, ratio),
+        )
+
+
+def test_grouped_values():
+    rng = np.random.default_rng(0)
+    size = 2000
+    data = pd.DataFrame({
+        'segment': rng.choice(['b', 'a', 'c', None], size),
+        'value': pd.Series(rng.zipf(1.5, size)).where(
+            rng.random(size) > 0.1
+        ),
+    })
+    groups = data.dropna(subset=['segment']).groupby('segment', sort=False)
+
+    occurrences = significance.grouped_occurrences(data, 'segment', 'value')
+    assert list(occurrences.columns) == [
+        'segment', 'value', 'count', 'rank', 'cumul', 'total'
+    ]
+    assert list(pd.unique(occurrences['segment'])) == list(groups.groups)
+
+    best = significance.grouped_best_values(
+        data, 'segment', 'value', nb=3, min_count=2, as_dict=True
+    )
+    required = significance.grouped_required_values(
+        data, 'segment', 'value', 0.8, as_dict=True
+    )
+    assert list(best) == list(required) == list(groups.groups)
+    for segment, group in groups:
+        assert best[segment] == significance.best_values(
+            group['value'], nb=3, min_count=2
+        )
+        assert required[segment] == significance.required_values(
+            group['value'], 0.8, verbose=False
+        )
+        assert list(significance.grouped_best_values(
+            data, 'segment', 'value', as_dict=True
+        )[segment]) == significance.best_values(group['value'])
+
+    frame = significance.grouped_required_values(
+        data, 'segment', 'value', 0.8
+    )
+    assert len(frame) == sum(len(values) for values in required.values())
+
+
+def test_BestValuesStream():
+    rng = np.random.default_rng(0)
+    values = rng.zipf(1.5, 10**5)
+    true = pd.Series(values).value_counts()
+
+    streams = [significance.BestValuesStream(counters=100) for _ in range(3)]
+    for i, batch in enumerate(np.array_split(values, 30)):
+        streams[i % 3].update(pd.Series(batch))
+    stream = streams[0].merge(streams[1]).merge(streams[2])
+    assert stream.n == len(values)
+    assert stream.error <= len(values) / 101
+
+    assert stream.best_values(5) == significance.best_values(
+        pd.Series(values), nb=5
+    )
+    for value, low, high in stream.bounds():
+        assert low <= true[value] <= high
+    assert len(stream.best_values(min_count=1000)) == (true > 1000).sum()
+
+    # Few distinct values: exact
+    stream = significance.BestValuesStream(counters=10)
+    stream.update(['a', 'b', None, 'b'])
+    assert stream.best_values() == ['b', 'a']
+    assert stream.bounds() == [('b', 2, 2), ('a', 1, 1)]
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from olanalytics import sketches
+
+
+def test_bit_length():
+    values = np.array([0, 1, 2, 3, 2**32, 2**53 - 1, 2**64 - 1], np.uint64)
+    assert list(sketches.bit_length(values)) == [
+        int(value).bit_length() for value in values
+    ]
+
+
+def test_hash_values():
+    big = 2**53
+    hashes = sketches.hash_values(np.array([big, big + 1, big + 2, -big - 1]))
+    assert len(set(hashes.tolist())) == 4
+    assert list(sketches.hash_values(np.array([2.0, float(big), 0.5]))) == (
+        list(sketches.hash_values(np.array([2, big, 0])))[:2]
+        + [sketches.hash_values(np.array([0.5]))[0]]
+    )
+    assert sketches.hash_values(np.array([0.5]))[0] != (
+        sketches.hash_values(np.array([0]))[0]
+    )
+    assert list(sketches.hash_values(np.array([3], np.int8))) == list(
+        sketches.hash_values(np.array([3], np.uint64))
+    )
+    ids = 2**60 + np.arange(10**4)  # sequential 64 bits ids
+    hll = sketches.HyperLogLog(p=12).update(ids)
+    assert hll.count() == pytest.approx(10**4, rel=0.05)
+
+
+def test_HyperLogLog():
+    rng = np.random.default_rng(0)
+    hll = sketches.HyperLogLog(p=12)
+    assert hll.count() == 0
+    hll.update([1, 2.0, 2, np.nan, None, 'a', 'a'])
+    assert hll.count() == 3
+
+    for n in [10**3, 10**5]:
+        hll = sketches.HyperLogLog(p=12)
+        values = rng.integers(0, 2**62, n)
+        for chunk in np.array_split(values, 3):
+            hll.update(chunk)
+        assert hll.count() == pytest.approx(n, rel=4 * 1.04 / 2**6)
+
+    # Merging same as updating with all values
+    values = rng.integers(0, 10**4, 10**4)
+    hll_a = sketches.HyperLogLog(10).update(values[:5000])
+    hll_b = sketches.HyperLogLog(10).update(values[5000:])
+    hll = sketches.HyperLogLog(10).update(values)
+    assert np.array_equal(hll_a.merge(hll_b).registers, hll.registers)
+    with pytest.raises(ValueError):
+        hll.merge(sketches.HyperLogLog(12))
+
+
+def test_MisraGries():
+    mg = sketches.MisraGries(k=3)
+    mg.update(['b', 'a', 'a', None, 'c'])
+    values, counts = mg.top()
+    assert list(values) == ['a', 'b', 'c']
+    assert list(counts) == [2, 1, 1]
+    assert (mg.n, mg.error) == (4, 0)
+
+    mg.update(['d'])  # 4 values for 3 counters
+    assert (mg.n, mg.error) == (5, 1)
+    assert list(mg.top()[0]) == ['a']
+
+    rng = np.random.default_rng(0)
+    values = rng.zipf(1.5, 10**5)
+    true = pd.Series(values).value_counts()
+    mg_a = sketches.MisraGries(k=100).update(values[:40000])
+    mg_b = sketches.MisraGries(k=100).update(values[40000:])
+    for mg in [sketches.MisraGries(k=100).update(values), mg_a.merge(mg_b)]:
+        assert len(mg) <= 100
+        assert mg.n == len(values)
+        assert mg.error <= len(values) / 101
+        errors = true[mg.values].to_numpy() - mg.counts
+        assert np.all(errors >= 0) and np.all(errors <= mg.error)
+        # Values above n / (k+1) are tracked
+        assert set(true[true > len(values) / 101].index) <= set(mg.values)
+        assert list(mg.top(3)[0]) == list(true.index[:3])
+
+    # Typed arrays are counted as objects would be, nulls aside
+    values = np.array([2.5, np.nan, 1.0, 2.5, 3.0, 1.0, 2.5])
+    mg = sketches.MisraGries(k=10).update(values)
+    expected = sketches.MisraGries(k=10).update(values.astype(object))
+    assert list(mg.top()[0]) == list(expected.top()[0]) == [2.5, 1.0, 3.0]
+    assert list(mg.top()[1]) == [3, 2, 1] and mg.n == 6
+    big = 2**53
+    mg = sketches.MisraGries(k=10).update(np.array([big + 1, big, big + 1]))
+    assert list(mg.top()[0]) == [big + 1, big]
@@ -1,3 +1,4 @@
+import numpy as np
 from time import sleep
 
 from olanalytics import tracking
@@ -32,3 +33,28 @@ def test_all():
 
     assert int(tracker1.exc_time/wait) == tracker1.n_calls
     assert int(tracker2.exc_time/wait) == tracker1.n_calls + tracker2.n_calls
+
+
+def test_RateMeter():
+    meter = tracking.RateMeter()
+    assert meter.elapsed == 0
+    assert np.isnan(meter.rate())
+
+    meter.start()
+    meter.add(10)
+    sleep(1 / 10)
+    meter.add(10)
+    assert meter.count == 20
+    assert 0 < meter.rate() <= 200
+
+    # Time out of start/stop is not measured
+    meter.stop()
+    elapsed = meter.elapsed
+    sleep(1 / 10)
+    assert meter.elapsed == elapsed
+    meter.start()
+    assert meter.elapsed >= elapsed
+
+    meter.reset()
+    assert meter.count == 0
+    assert meter.elapsed == 0
@@ -133,6 +133,66 @@ class CallTracker(object):
             tracker.reset()
 
 
+class RateMeter(object):
+    """Measure number of items produced per second
+
+    Only time between start and stop is measured, so time spent by consumer
+    of items (between two productions) is not counted.
+    """
+
+    def __init__(self):
+        """Init a stopped meter"""
+        self._count = 0
+        self._elapsed = 0
+        self._start = None
+
+    @property
+    def count(self):
+        """Number of items produced"""
+        return self._count
+
+    @property
+    def elapsed(self):
+        """Time (in seconds) spent producing items"""
+        if self._start is None:
+            return self._elapsed
+        return self._elapsed + clock() - self._start
+
+    def start(self):
+        """Start timer if not started yet"""
+        if self._start is None:
+            self._start = clock()
+
+    def stop(self):
+        """Stop timer, keeping time elapsed since start"""
+        if self._start is not None:
+            self._elapsed += clock() - self._start
+            self._start = None
+
+    def add(self, count):
+        """Count new produced items"""
+        self._count += count
+
+    def rate(self):
+        """Return number of items produced per second"""
+        try:
+            return self.count / self.elapsed
+        except ZeroDivisionError:
+            return np.nan
+
+    def reset(self):
+        """Reset count and timer"""
+        self._count = 0
+        self._elapsed = 0
+        self._start = None
+
+    def __str__(self):
+        return (
+            f"{self.count} items in {self.elapsed:.3e}s"
+            f" ({self.rate():.3e}/s)"
+        )
+
+
 def trackedfunc(func):
     """Decorator to track calls to func.
 